@@ -367,7 +367,7 @@ class EmailGenerator:
         
         # Remove Greeting line (e.g. "Hi Andrew," or "Good morning,")
         # Matches a greeting at the very start of the (now subject-less) draft
-        clean_draft = re.sub(r'^(?i)(?:Hi|Dear|Good|Hello).*?,\s*\n+', '', clean_draft).strip()
+        clean_draft = re.sub(r'(?i)^(?:Hi|Dear|Good|Hello).*?,\s*\n+', '', clean_draft).strip()
         
         # Strip Sign-off from bottom of draft
         # Markers: Best, Sincerely, etc. or the sender's own name
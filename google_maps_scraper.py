@@ -53,6 +53,8 @@ class GoogleMapsScraper:
     def __init__(self, headless: bool = True, sheet_name: str = None):
         self.headless = headless
         self.seen_leads: Set[str] = set()
+        # Accepted into the sheets client's buffer but not confirmed written yet
+        self.unflushed_leads: List[Dict] = []
         self.sheets_client = None
         self.csv_file = Path("scraped_leads.csv")
         
@@ -357,6 +359,15 @@ class GoogleMapsScraper:
         return {"valid": True, "reason": "DNS Valid (SMTP Skipped)"}
 
     async def run(self, specific_queries: List[str] = None):
+        try:
+            await self._run_queries(specific_queries)
+        finally:
+            # Buffered leads must reach the sheet even if the run dies mid-query
+            self._flush_leads()
+            if self.unflushed_leads:
+                logger.error(f"{len(self.unflushed_leads)} leads could not be written to the sheet and were not marked seen")
+
+    async def _run_queries(self, specific_queries: List[str] = None):
         async with async_playwright() as p:
             # Launch browser
             browser = await p.chromium.launch(headless=self.headless)
@@ -579,12 +590,16 @@ class GoogleMapsScraper:
                 except Exception as e:
                     logger.error(f"Error processing query {query}: {e}")
                 
+                self._flush_leads()
+                
             await browser.close()
 
     def _is_duplicate(self, name, phone, website):
-        if name and name.lower().strip() in self.seen_leads: return True
-        if phone and phone.strip() in self.seen_leads: return True
-        if website and self._clean_domain(website) in self.seen_leads: return True
+        # Leads still waiting in the buffer count too, or a repeat card would be queued twice
+        known = self.seen_leads.union(*(self._lead_keys(lead) for lead in self.unflushed_leads))
+        if name and name.lower().strip() in known: return True
+        if phone and phone.strip() in known: return True
+        if website and self._clean_domain(website) in known: return True
         return False
         
     def _extract_city(self, address):
@@ -608,9 +623,9 @@ class GoogleMapsScraper:
     def _save_lead(self, data):
         """Append to Google Sheet or CSV."""
         if self.sheets_client:
-            success = self.sheets_client.add_lead(data)
-            if success:
-                self._update_seen(data)
+            # Buffered: written in append_rows chunks at the end of each query, marked seen once written
+            if self.sheets_client.add_leads([data], flush=False) == 1:
+                self.unflushed_leads.append(data)
         else:
             # CSV Fallback
             try:
@@ -645,12 +660,30 @@ class GoogleMapsScraper:
             except Exception as e:
                 logger.error(f"Failed to save to CSV: {e}")
 
+    def _flush_leads(self):
+        """Write buffered leads to the sheet; only the ones that made it are marked seen."""
+        if not self.sheets_client:
+            return
+        self.sheets_client.flush_leads()
+        # A failed append leaves its chunk buffered for the next flush
+        buffered = {id(lead) for lead in self.sheets_client.buffered_leads()}
+        for lead in self.unflushed_leads:
+            if id(lead) not in buffered:
+                self._update_seen(lead)
+        self.unflushed_leads = [lead for lead in self.unflushed_leads if id(lead) in buffered]
+
     def _update_seen(self, data):
         """Add to seen set to prevent duplicates in same run."""
-        if data.get('email'): self.seen_leads.add(data['email'].lower().strip())
-        if data.get('business_name'): self.seen_leads.add(data['business_name'].lower().strip())
-        if data.get('phone'): self.seen_leads.add(data['phone'].strip())
-        if data.get('domain'): self.seen_leads.add(self._clean_domain(data['domain']))
+        self.seen_leads.update(self._lead_keys(data))
+
+    def _lead_keys(self, data) -> Set[str]:
+        """Identifiers (email, name, phone, domain) a lead is deduplicated by."""
+        keys = set()
+        if data.get('email'): keys.add(data['email'].lower().strip())
+        if data.get('business_name'): keys.add(data['business_name'].lower().strip())
+        if data.get('phone'): keys.add(data['phone'].strip())
+        if data.get('domain'): keys.add(self._clean_domain(data['domain']))
+        return keys
 
 if __name__ == "__main__":
     import argparse
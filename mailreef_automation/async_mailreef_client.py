@@ -0,0 +1,205 @@
+"""
+Async Mailreef client on a pooled httpx.AsyncClient.
+
+MailreefClient holds a thread for every request in flight. AsyncMailreefClient
+has the same surface (send_email, get_global_inbound, forward_email,
+get_inboxes, get_inbox_status) as coroutines over one keep-alive connection
+pool, so a single event loop can keep hundreds of requests in flight.
+
+HTTP/2 is used when MAILREEF_HTTP2=1 and the optional `h2` package is
+installed (pip install httpx[http2]); otherwise HTTP/1.1 with keep-alive.
+
+Usage:
+    async with AsyncMailreefClient(api_key) as client:
+        pages = await asyncio.gather(*(client.get_global_inbound(page=p) for p in range(1, 6)))
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+import httpx
+
+from mailreef_automation.circuit_breaker import (OPEN as BREAKER_OPEN, RETRYABLE_STATUS, SEND_RETRIES, CircuitBreaker,
+                                                 backoff_delay, retry_after_seconds)
+from mailreef_automation.logger_util import get_logger
+from mailreef_automation.mailreef_client import (INBOX_CRAWL_WORKERS, MailreefClient, build_send_payload,
+                                                 error_message, extract_message_id)
+
+logger = get_logger("ASYNC_MAILREEF_CLIENT")
+
+MAX_CONNECTIONS = int(os.environ.get("MAILREEF_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("MAILREEF_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY_SECONDS = 30
+REQUEST_TIMEOUT_SECONDS = 30
+HTTP2_ENABLED = os.environ.get("MAILREEF_HTTP2", "0") == "1"
+
+try:
+    import h2  # noqa: F401 (httpx only needs it importable)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncMailreefClient:
+    """Coroutine version of MailreefClient sharing one pooled httpx.AsyncClient."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.mailreef.com", http2: bool = HTTP2_ENABLED,
+                 max_connections: int = MAX_CONNECTIONS, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("⚠️ MAILREEF_HTTP2=1 but the 'h2' package is missing; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            auth=(api_key, ''),
+            headers={"Content-Type": "application/json"},
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=min(MAX_KEEPALIVE_CONNECTIONS, max_connections),
+                                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS),
+            http2=http2,
+            transport=transport, # Tests and the local fake server can plug in here
+        )
+        self.logger = logger
+        # Diagnostics run on a plain thread once per trip, never on the event loop
+        self.breaker = CircuitBreaker("mailreef-async", on_trip=MailreefClient._run_diagnostics)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    # ------------------------------------------------------------------ inboxes
+
+    async def get_inboxes(self) -> List[Dict]:
+        """
+        Fetch all available mailboxes by iterating through domains (mailbox pages concurrently).
+
+        Like MailreefClient.get_inboxes, any failure returns [] rather than a partial list.
+        """
+        try:
+            domains = await self._fetch_pages(f"{self.base_url}/domains", {})
+            domain_ids = [domain.get('id') for domain in domains if domain.get('id')]
+            limit = asyncio.Semaphore(INBOX_CRAWL_WORKERS)
+
+            async def fetch_domain(domain_id):
+                async with limit:
+                    # If 404/400, skip domain
+                    return await self._fetch_pages(f"{self.base_url}/mailboxes", {"domain": domain_id}, skip_on_error=True)
+
+            batches = await asyncio.gather(*(fetch_domain(domain_id) for domain_id in domain_ids))
+            return [inbox for batch in batches for inbox in batch]
+        except Exception as e:
+            logger.error(f"❌ Error fetching inboxes: {e}")
+            return []
+
+    async def _fetch_pages(self, url: str, params: Dict, skip_on_error: bool = False) -> List[Dict]:
+        items = []
+        page = 1
+        while True:
+            response = await self.client.get(url, params={**params, "page": page, "display": 100})
+            if skip_on_error and 400 <= response.status_code < 500:
+                break
+            response.raise_for_status()
+            data = response.json()
+            batch = data.get('data', data) if isinstance(data, dict) else data
+            if not batch:
+                break
+            items.extend(batch)
+            if len(batch) < 100:
+                break
+            page += 1
+        return items
+
+    async def get_inbox_status(self, inbox_id: str) -> Dict:
+        """Get current status of a specific inbox"""
+        response = await self.client.get(f"{self.base_url}/mailboxes/{inbox_id}")
+        response.raise_for_status()
+        return response.json()
+
+    # ------------------------------------------------------------------ sending
+
+    async def send_email(self, inbox_id: str, to_email: str, subject: str,
+                         body: str, reply_to: Optional[str] = None) -> Dict:
+        """Send a single email. Same payload, retries, breaker and errors (with status_code) as MailreefClient.send_email."""
+        payload = build_send_payload(inbox_id, to_email, subject, body, reply_to)
+        logger.debug(f"🚀 [API SEND] Sending email from {inbox_id} to {to_email}...")
+        for attempt in range(SEND_RETRIES + 1):
+            self.breaker.before_call()
+            try:
+                response = await self.client.post(f"{self.base_url}/email", json=payload)
+            except httpx.ConnectTimeout as e:
+                # Never reached the API: safe to retry
+                self.breaker.record_failure(e)
+                if attempt < SEND_RETRIES and self.breaker.state != BREAKER_OPEN:
+                    await self._wait_before_retry(attempt, f"connect timeout to {to_email}")
+                    continue
+                raise Exception(f"Mailreef API unreachable: {e}") from e
+            except httpx.HTTPError as e:
+                # Read timeouts etc. are not retried: the message may already be queued
+                self.breaker.record_failure(e)
+                raise Exception(f"Mailreef API unreachable: {e}") from e
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+
+            if response.status_code in [201, 200]:
+                self.breaker.record_success()
+                data = response.json()
+                msg_id = extract_message_id(data)
+                if not msg_id:
+                    self.logger.warning(f"⚠️ [API RESPONSE] Success but no ID found in: {data}")
+                self.logger.debug(f"✅ [API SUCCESS] Message queued as {msg_id}")
+                return {"status": "success", "message_id": msg_id}
+
+            error_msg = error_message(response)
+            error = Exception(f"Mailreef API Error: {error_msg}")
+            error.status_code = response.status_code
+            if response.status_code == 429 or response.status_code >= 500:
+                self.breaker.record_failure(error)
+            else:
+                self.breaker.record_success() # The API is up, it just rejected this message
+            if response.status_code in RETRYABLE_STATUS and attempt < SEND_RETRIES and self.breaker.state != BREAKER_OPEN:
+                await self._wait_before_retry(attempt, f"HTTP {response.status_code} for {to_email}",
+                                              retry_after_seconds(response))
+                continue
+            self.logger.error(f"❌ [API ERROR] Failed to send (HTTP {response.status_code}): {error_msg}")
+            raise error
+
+    async def _wait_before_retry(self, attempt: int, reason: str, retry_after: Optional[float] = None):
+        delay = backoff_delay(attempt, retry_after)
+        self.logger.warning(f"⚠️ [API RETRY] {reason}; retry {attempt + 1}/{SEND_RETRIES} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def forward_email(self, message_id: str, to_address: str) -> Dict:
+        """Forward an email (POST /email/forward/:message_id). Returns {"error": ...} on failure."""
+        logger.info(f"↪️ Forwarding message {message_id} to {to_address}...")
+        try:
+            response = await self.client.post(f"{self.base_url}/email/forward/{message_id}", json={"to": to_address})
+            if response.status_code in [200, 201]:
+                return response.json()
+            logger.error(f"❌ Error forwarding email: {response.status_code} - {response.text}")
+            return {"error": response.text}
+        except Exception as e:
+            logger.error(f"❌ Exception in forward_email: {e}")
+            return {"error": str(e)}
+
+    # ------------------------------------------------------------------ inbound
+
+    async def get_global_inbound(self, page: int = 1, display: int = 100) -> Dict:
+        """Fetch inbound emails across the entire account (empty result on failure)."""
+        try:
+            response = await self.client.get(f"{self.base_url}/mail/inbound", params={"page": page, "display": display})
+            if response.status_code == 200:
+                return response.json()
+            logger.error(f"❌ Error fetching global inbound: {response.status_code} - {response.text}")
+            return {"data": [], "total_count": 0}
+        except Exception as e:
+            logger.error(f"❌ Exception in get_global_inbound: {e}")
+            return {"data": [], "total_count": 0}
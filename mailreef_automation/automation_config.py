@@ -76,6 +76,8 @@ WEEKEND_DAY_INDICES = [5, 6]  # Sat-Sun
 
 # ==================== CAMPAIGN PROFILES ====================
 # Inbox Indices: Slicing logic [start, end)
+# Optional "input_shards": ["Sheet Name", "Sheet Name::Tab", ...] spreads a profile's leads over
+# several worksheets/spreadsheets (see ShardedSheetsClient); "input_sheet" is then only informational.
 CAMPAIGN_PROFILES = {
     "IVYBOUND": {
         "input_sheet": "Ivy Bound - Campaign Leads",
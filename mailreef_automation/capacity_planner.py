@@ -0,0 +1,253 @@
+"""
+Throughput capacity planner for the campaign profiles.
+
+Works out, from automation_config (CAMPAIGN_PROFILES, send windows) and the
+measured per-stage latencies, how many sends each window and each day can
+actually achieve, which stage is the bottleneck, and how much concurrency the
+pipeline needs to hit MONTHLY_EMAIL_TARGET.
+
+Stages (account-wide capacity in sends/hour):
+  generation    - GENERATION_WORKERS per profile, each doing scrape + LLM
+  dispatch      - SEND_DISPATCH_WORKERS per profile, each doing the Mailreef send
+                  (and the generation too when EMAIL_PIPELINE=0)
+  send_rate     - the send rate limiter's account-wide and per-inbox ceilings
+  sheets_writes - status writes are batched (SHEETS_FLUSH_MAX_PENDING rows per
+                  batch_update) under the shared SHEETS_WRITES_PER_MINUTE quota
+
+Usage:
+    python mailreef_automation/capacity_planner.py
+    python mailreef_automation/capacity_planner.py --latencies report.json --generation 12 --json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from mailreef_automation import automation_config
+from mailreef_automation.generation_pipeline import GENERATION_WORKERS
+from mailreef_automation.send_dispatcher import DISPATCH_WORKERS
+from mailreef_automation.send_rate_limiter import ACCOUNT_SENDS_PER_MINUTE, INBOX_SENDS_PER_MINUTE
+from mailreef_automation.sheets_write_queue import FLUSH_MAX_PENDING
+
+# Same env knobs the scheduler and quota governor read
+PIPELINE_ENABLED = os.environ.get("EMAIL_PIPELINE", "1") == "1"
+SHEETS_WRITES_PER_MINUTE = float(os.environ.get("SHEETS_WRITES_PER_MINUTE", "55"))
+
+# Seconds per item when nothing has been measured yet
+DEFAULT_LATENCIES = {
+    "generation": 8.0,    # LLM completion
+    "scraping": 4.0,      # Website scrape before generation
+    "sheets_write": 1.5,  # One batch_update call
+    "send": 0.8,          # Mailreef POST /email
+}
+# Paused inboxes per profile on business days (scheduler rotation, skipped for high-volume profiles)
+ROTATION_PAUSED_INBOXES = 2
+
+
+def _is_high_volume(profile_config: Dict[str, Any]) -> bool:
+    log_file = profile_config.get("log_file", "").upper()
+    return "WEB4GURU" in log_file or "STRATEGY_B" in log_file
+
+
+def active_inboxes(profile_config: Dict[str, Any], day_type: str, account_inboxes: int) -> int:
+    """Inboxes a profile sends from on a day, per its inbox_indices slice and the business-day rotation."""
+    start, end = profile_config.get("inbox_indices", (0, account_inboxes))
+    count = max(0, min(end, account_inboxes) - start)
+    if day_type == "business" and count and not _is_high_volume(profile_config):
+        count = max(0, count - ROTATION_PAUSED_INBOXES)
+    return count
+
+
+def load_latencies(path: Optional[str] = None, **overrides: Optional[float]) -> Dict[str, float]:
+    """
+    Stage latencies: defaults, then a measurements file, then explicit overrides.
+
+    The file is either {"generation": s, "scraping": s, "sheets_write": s, "send": s}
+    or a scripts/simulate_day.py report (pipeline and send-rate averages are used).
+    """
+    latencies = dict(DEFAULT_LATENCIES)
+    if path:
+        with open(path) as f:
+            measured = json.load(f)
+        if "pipeline" in measured or "send_rate" in measured:
+            pipeline = measured.get("pipeline") or {}
+            send_rate = measured.get("send_rate") or {}
+            if pipeline.get("avg_generation_seconds"):
+                # The pipeline times scrape + LLM together
+                latencies["generation"] = pipeline["avg_generation_seconds"]
+                latencies["scraping"] = 0.0
+            if send_rate.get("avg_latency_seconds"):
+                latencies["send"] = send_rate["avg_latency_seconds"]
+        else:
+            latencies.update({k: float(v) for k, v in measured.items() if k in DEFAULT_LATENCIES})
+    latencies.update({k: float(v) for k, v in overrides.items() if v is not None})
+    return latencies
+
+
+def stage_capacity(latencies: Dict[str, float], profiles: int, physical_inboxes: int,
+                   pipeline: bool = PIPELINE_ENABLED, generation_workers: int = GENERATION_WORKERS,
+                   dispatch_workers: int = DISPATCH_WORKERS) -> Dict[str, float]:
+    """Sends/hour each stage can sustain across the whole account."""
+    build_seconds = latencies["generation"] + latencies["scraping"]
+    slot_seconds = latencies["send"] + (0 if pipeline else build_seconds)
+    capacity = {
+        "dispatch": profiles * dispatch_workers * 3600 / max(slot_seconds, 1e-6),
+        "send_rate": min(ACCOUNT_SENDS_PER_MINUTE * 60, INBOX_SENDS_PER_MINUTE * 60 * physical_inboxes),
+        # One flush thread per profile worksheet, and the write quota is shared by every process
+        "sheets_writes": min(profiles * 3600 / max(latencies["sheets_write"], 1e-6),
+                             SHEETS_WRITES_PER_MINUTE * 60) * FLUSH_MAX_PENDING,
+    }
+    if pipeline:
+        capacity["generation"] = profiles * generation_workers * 3600 / max(build_seconds, 1e-6)
+    return capacity
+
+
+def plan_day(config=automation_config, day_type: str = "business", latencies: Optional[Dict[str, float]] = None,
+             account_inboxes: Optional[int] = None, pipeline: bool = PIPELINE_ENABLED,
+             profiles: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Planned vs achievable sends per window and for the day, with the bottleneck stage."""
+    latencies = latencies or dict(DEFAULT_LATENCIES)
+    profile_configs = {name: cfg for name, cfg in config.CAMPAIGN_PROFILES.items() if not profiles or name in profiles}
+    if account_inboxes is None:
+        # TOTAL_INBOXES predates the second Mailreef account; the profile slices are the real extent
+        account_inboxes = max([getattr(config, "TOTAL_INBOXES", 0)] +
+                              [cfg.get("inbox_indices", (0, 0))[1] for cfg in profile_configs.values()])
+    windows = config.BUSINESS_DAY_WINDOWS if day_type == "business" else config.WEEKEND_DAY_WINDOWS
+
+    inboxes = {name: active_inboxes(cfg, day_type, account_inboxes) for name, cfg in profile_configs.items()}
+    slices = {tuple(cfg.get("inbox_indices", (0, account_inboxes))) for cfg in profile_configs.values()}
+    physical = len(set().union(*(range(start, min(end, account_inboxes)) for start, end in slices))) if slices else 0
+    shared = [name for name, cfg in profile_configs.items()
+              if sum(1 for other in profile_configs.values()
+                     if other.get("inbox_indices") == cfg.get("inbox_indices")) > 1]
+
+    capacity = stage_capacity(latencies, len(profile_configs), physical, pipeline=pipeline)
+    bottleneck = min(capacity, key=capacity.get)
+    hourly_ceiling = capacity[bottleneck]
+
+    window_plans = []
+    for window in windows:
+        hours = window["end"] - window["start"]
+        planned = sum(window["emails_per_inbox"] * count for count in inboxes.values())
+        achievable = min(planned, int(hourly_ceiling * hours))
+        window_plans.append({
+            "window": f"{window['start']}:00-{window['end']}:00",
+            "planned": planned,
+            "achievable": achievable,
+            "planned_per_hour": round(planned / hours, 1),
+            "limited_by": bottleneck if achievable < planned else None,
+        })
+
+    return {
+        "day_type": day_type,
+        "profiles": {name: {"active_inboxes": inboxes[name],
+                            "emails_per_inbox": sum(w["emails_per_inbox"] for w in windows)} for name in inboxes},
+        "physical_inboxes": physical,
+        "shared_inbox_profiles": shared,
+        "pipeline": pipeline,
+        "latencies": latencies,
+        "stage_capacity_per_hour": {stage: round(value, 1) for stage, value in capacity.items()},
+        "bottleneck": bottleneck,
+        "windows": window_plans,
+        "planned": sum(w["planned"] for w in window_plans),
+        "achievable": sum(w["achievable"] for w in window_plans),
+    }
+
+
+def required_concurrency(business: Dict[str, Any], weekend: Dict[str, Any], config=automation_config) -> Dict[str, Any]:
+    """What it takes to hit MONTHLY_EMAIL_TARGET with today's window shape."""
+    target = config.MONTHLY_EMAIL_TARGET
+    business_days, weekend_days = config.BUSINESS_DAYS_PER_MONTH, config.WEEKEND_DAYS_PER_MONTH
+    planned_month = business["planned"] * business_days + weekend["planned"] * weekend_days
+    achievable_month = business["achievable"] * business_days + weekend["achievable"] * weekend_days
+    # Scale the plan's busiest window to the target (the windows keep their relative shape)
+    scale = target / planned_month if planned_month else 0.0
+    peak_per_hour = max([w["planned_per_hour"] for plan in (business, weekend) for w in plan["windows"]] or [0]) * scale
+    profiles = max(1, len(business["profiles"]))
+    latencies = business["latencies"]
+    build_seconds = latencies["generation"] + latencies["scraping"]
+    slot_seconds = latencies["send"] + (0 if business["pipeline"] else build_seconds)
+    needed = {
+        "peak_sends_per_hour": round(peak_per_hour, 1),
+        "dispatch_workers_per_profile": math.ceil(peak_per_hour * slot_seconds / 3600 / profiles),
+        "account_sends_per_minute": math.ceil(peak_per_hour / 60),
+        "sheets_writes_per_minute": math.ceil(peak_per_hour / 60 / FLUSH_MAX_PENDING),
+    }
+    if business["pipeline"]:
+        needed["generation_workers_per_profile"] = math.ceil(peak_per_hour * build_seconds / 3600 / profiles)
+    return {
+        "monthly_target": target,
+        "planned_per_month": planned_month,
+        "achievable_per_month": achievable_month,
+        "meets_target": achievable_month >= target,
+        # >1: the windows themselves don't schedule enough slots, concurrency alone won't close the gap
+        "schedule_scale_needed": round(scale, 2),
+        "needed": needed,
+        "configured": {
+            "generation_workers_per_profile": GENERATION_WORKERS,
+            "dispatch_workers_per_profile": DISPATCH_WORKERS,
+            "account_sends_per_minute": ACCOUNT_SENDS_PER_MINUTE,
+            "sheets_writes_per_minute": SHEETS_WRITES_PER_MINUTE,
+        },
+    }
+
+
+def format_plan(business: Dict[str, Any], weekend: Dict[str, Any], target: Dict[str, Any]) -> str:
+    lines = []
+    for plan in (business, weekend):
+        lines.append(f"=== {plan['day_type'].upper()} DAY ===")
+        for name, info in plan["profiles"].items():
+            lines.append(f"  {name}: {info['active_inboxes']} inboxes x {info['emails_per_inbox']} emails")
+        if plan["shared_inbox_profiles"]:
+            lines.append(f"  ⚠️ Profiles sharing an inbox slice: {', '.join(plan['shared_inbox_profiles'])}")
+        capacity = ", ".join(f"{stage}={value:.0f}/h" for stage, value in plan["stage_capacity_per_hour"].items())
+        lines.append(f"  Stage capacity: {capacity} -> bottleneck: {plan['bottleneck']}")
+        for w in plan["windows"]:
+            limit = f"  (limited by {w['limited_by']})" if w["limited_by"] else ""
+            lines.append(f"  {w['window']:>12}: {w['achievable']:>6} / {w['planned']:>6} planned{limit}")
+        lines.append(f"  Day total: {plan['achievable']} achievable / {plan['planned']} planned")
+    lines.append("=== MONTHLY TARGET ===")
+    lines.append(f"  Target {target['monthly_target']}: achievable {target['achievable_per_month']}, "
+                 f"planned {target['planned_per_month']} -> {'✅ met' if target['meets_target'] else '❌ short'}")
+    if target["schedule_scale_needed"] > 1:
+        lines.append(f"  ⚠️ Windows schedule too few slots: scale emails_per_inbox by {target['schedule_scale_needed']}x")
+    for key, value in target["needed"].items():
+        configured = target["configured"].get(key)
+        suffix = f" (configured {configured:g})" if configured is not None else ""
+        lines.append(f"  {key}: {value}{suffix}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sends per window/day, bottleneck stage and concurrency for the monthly target.")
+    parser.add_argument("--latencies", help="JSON of measured stage latencies or a simulate_day.py report")
+    for stage in DEFAULT_LATENCIES:
+        parser.add_argument(f"--{stage.replace('_', '-')}", type=float, help=f"Seconds per {stage.replace('_', ' ')}")
+    parser.add_argument("--profiles", help="Comma-separated profiles to plan (default: all)")
+    parser.add_argument("--account-inboxes", type=int, help="Inboxes on the Mailreef account(s)")
+    parser.add_argument("--no-pipeline", action="store_true", help="Plan for EMAIL_PIPELINE=0 (inline generation)")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    args = parser.parse_args()
+
+    latencies = load_latencies(args.latencies, **{stage: getattr(args, stage) for stage in DEFAULT_LATENCIES})
+    options = dict(latencies=latencies, account_inboxes=args.account_inboxes,
+                   pipeline=PIPELINE_ENABLED and not args.no_pipeline,
+                   profiles=[p.strip().upper() for p in args.profiles.split(",")] if args.profiles else None)
+    business = plan_day(day_type="business", **options)
+    weekend = plan_day(day_type="weekend", **options)
+    target = required_concurrency(business, weekend)
+    if args.json:
+        print(json.dumps({"business": business, "weekend": weekend, "target": target}, indent=2))
+    else:
+        print(format_plan(business, weekend, target))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Circuit breaker and retry backoff for Mailreef API calls.
+
+During a Mailreef outage every slot used to wait out its own timeouts and
+then run the blocking network diagnostics inline. The breaker counts
+consecutive outage-type failures (network errors, 429/5xx); after
+BREAKER_FAILURE_THRESHOLD of them it opens and calls fail fast with
+CircuitOpenError. After BREAKER_RESET_SECONDS one trial call is let through
+(half-open): success closes the breaker, failure re-opens it.
+
+on_trip runs on a background thread when the breaker opens from closed, i.e.
+once per outage, not on every failed send or failed half-open trial.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("CIRCUIT_BREAKER")
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("MAILREEF_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("MAILREEF_BREAKER_RESET_SECONDS", "60"))
+SEND_RETRIES = int(os.environ.get("MAILREEF_SEND_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 500 is left out on purpose: the message may have been queued before the error, and a retry could double-send
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the breaker is open."""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based), honouring Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if retry_after:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS))
+    return delay
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half_open -> closed)."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_SECONDS, on_trip: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_trip = on_trip
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+        # --- METRICS ---
+        self._trips = 0
+        self._rejected = 0
+        self._last_error = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # Called with the lock held
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out now."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True # This caller is the trial
+                return
+            self._rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"Mailreef circuit '{self.name}' is open (retry in {retry_in:.0f}s)")
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+        if recovered:
+            logger.info(f"✅ [BREAKER] {self.name}: API answering again, circuit closed")
+
+    def record_failure(self, error: Optional[Exception] = None):
+        """An outage-type failure (network error, 429/5xx). Opens the breaker at the threshold."""
+        with self._lock:
+            self._last_error = str(error).splitlines()[0] if error else None
+            self._failures += 1
+            was = self._state
+            if was == HALF_OPEN or (was == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+            tripped = was == CLOSED and self._state == OPEN
+            if tripped:
+                self._trips += 1
+        if tripped:
+            logger.error(f"🚨 [BREAKER] {self.name}: {self._failures} consecutive failures, failing fast for "
+                         f"{self.reset_timeout:.0f}s (last: {self._last_error})")
+            if self.on_trip:
+                threading.Thread(target=self._run_on_trip, name=f"breaker-{self.name}", daemon=True).start()
+
+    def _run_on_trip(self):
+        try:
+            self.on_trip()
+        except Exception as e:
+            logger.warning(f"⚠️ [BREAKER] {self.name}: trip handler failed: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+                "rejected_calls": self._rejected,
+                "open_for_seconds": round(time.monotonic() - self._opened_at, 1) if state != CLOSED else 0.0,
+                "last_error": self._last_error,
+            }
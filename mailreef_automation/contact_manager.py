@@ -242,19 +242,19 @@ class ContactManager:
     
     def calculate_daily_capacity(self) -> Dict:
         """Calculate how many emails we can send today"""
-        # This is a static calculation based on config, but could be dynamic based on DB status
-        return {
-            "business_day": {
-                "inboxes_active": 93,
-                "emails_per_inbox": 24,
-                "total": 2232
-            },
-            "weekend_day": {
-                "inboxes_active": 95,
-                "emails_per_inbox": 9,
-                "total": 855
+        # Derived from automation_config's profiles and windows (see capacity_planner.py for the full report)
+        from capacity_planner import plan_day
+        capacity = {}
+        for day_type in ("business", "weekend"):
+            plan = plan_day(day_type=day_type)
+            inboxes_active = sum(p["active_inboxes"] for p in plan["profiles"].values())
+            capacity[f"{day_type}_day"] = {
+                "inboxes_active": inboxes_active,
+                "emails_per_inbox": round(plan["planned"] / inboxes_active) if inboxes_active else 0,
+                "total": plan["achievable"],
+                "bottleneck": plan["bottleneck"]
             }
-        }
+        return capacity
 
     def bulk_import_leads(self, leads: List[Dict]) -> int:
         """
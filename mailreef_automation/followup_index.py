@@ -0,0 +1,85 @@
+"""
+Per-sender follow-up index for Stage 2 selection.
+
+One pass over the leads at status 'email_1_sent' parses every email_1_sent_at
+once and files the lead into a min-heap keyed by its follow-up due date, one
+heap per sender inbox. Picking the next follow-up for an inbox is then a heap
+pop instead of a sheet scan per inbox.
+"""
+
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("FOLLOWUP_INDEX")
+
+
+def _sender_key(sender_email) -> str:
+    return str(sender_email or '').lower().strip()
+
+
+class FollowupIndex:
+    """Due-date heaps of Email 1 recipients, keyed by the inbox that sent Email 1."""
+
+    def __init__(self, days_since_email_1: int = 3):
+        self.days_since_email_1 = days_since_email_1
+        self._heaps: Dict[str, List[tuple]] = {}
+        self._seq = itertools.count() # Tie-breaker: records themselves are not orderable
+        self._lock = threading.Lock()
+        self.built_at = datetime.min
+
+    def _entry(self, record: Dict[str, Any]) -> Optional[tuple]:
+        try:
+            sent_at = datetime.fromisoformat(str(record.get('email_1_sent_at', '')))
+        except (ValueError, TypeError):
+            return None
+        if sent_at.tzinfo is not None:
+            sent_at = sent_at.replace(tzinfo=None)
+        return (sent_at + timedelta(days=self.days_since_email_1), next(self._seq), record)
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Replace the index from one pass over the candidate leads. Returns the number indexed."""
+        heaps = {}
+        count = 0
+        for record in records:
+            if record.get('status') != 'email_1_sent':
+                continue
+            entry = self._entry(record)
+            sender = _sender_key(record.get('sender_email'))
+            if entry is None or not sender:
+                continue
+            heaps.setdefault(sender, []).append(entry)
+            count += 1
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        with self._lock:
+            self._heaps = heaps
+            self.built_at = datetime.now()
+        logger.debug(f"📚 Follow-up index rebuilt: {count} leads across {len(heaps)} senders")
+        return count
+
+    def pop_due(self, sender_email: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Next lead this sender owes a follow-up to, or None if nothing is due yet."""
+        now = now or datetime.now()
+        with self._lock:
+            heap = self._heaps.get(_sender_key(sender_email))
+            while heap and heap[0][0] <= now:
+                _, _, record = heapq.heappop(heap)
+                # Lazy deletion: the lead may have moved on (sent, replied, bounced) since indexing
+                if record.get('status') == 'email_1_sent':
+                    return record
+        return None
+
+    def due_count(self, sender_email: str, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        with self._lock:
+            return sum(1 for due, _, _ in self._heaps.get(_sender_key(sender_email), ()) if due <= now)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(heap) for heap in self._heaps.values())
@@ -0,0 +1,393 @@
+"""
+Ahead-of-time email generation for upcoming send slots.
+
+Generating an email (website scrape + LLM call) takes 5-30s, so doing it
+inline when a slot fires makes every send that slow and ties up a dispatcher
+worker. The pipeline instead looks LOOKAHEAD_MINUTES ahead in the send queue,
+selects a prospect for each upcoming (inbox) slot, generates the email and
+stores it in a persistent SQLite queue. When the slot fires it just takes the
+prepared email for its inbox and sends it.
+
+Backpressure:
+  * Producer side: at most MAX_READY prepared emails exist at once, and only
+    slots inside the lookahead window are prepared for.
+  * Consumer side: a slot with nothing ready waits up to SLOT_WAIT_SECONDS for
+    the generators (which serve waiting slots first), so when generation is
+    slower than sending, sends slow down to the generation rate. Only after
+    that wait does the slot fall back to generating inline.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("GEN_PIPELINE")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QUEUE_PATH = os.path.join(ROOT_DIR, "prepared_emails.db")
+
+LOOKAHEAD_MINUTES = int(os.environ.get("GENERATION_LOOKAHEAD_MINUTES", "30"))
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", "3"))
+MAX_READY = int(os.environ.get("GENERATION_MAX_READY", "300"))
+SLOT_WAIT_SECONDS = int(os.environ.get("GENERATION_SLOT_WAIT_SECONDS", "120"))
+# Prepared emails older than this are discarded and their leads released
+PREPARED_TTL = timedelta(hours=12)
+IDLE_POLL_SECONDS = 15
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class PreparedEmailQueue:
+    """Persistent FIFO of generated emails per (profile, inbox)."""
+
+    def __init__(self, profile: str, db_path: str = None):
+        self.profile = profile
+        self.db_path = db_path or DEFAULT_QUEUE_PATH
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize the prepared email table."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS prepared_emails (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile TEXT NOT NULL,
+                    inbox_id TEXT NOT NULL,
+                    sender_email TEXT,
+                    lead_email TEXT NOT NULL,
+                    sequence_number INTEGER NOT NULL,
+                    subject TEXT,
+                    body TEXT,
+                    lead TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_prepared_inbox ON prepared_emails(profile, inbox_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_prepared_lead ON prepared_emails(profile, lead_email)")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize prepared email queue: {e}")
+
+    def put(self, inbox_id, sender_email: str, lead: Dict[str, Any], sequence_number: int, subject: str, body: str):
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO prepared_emails (profile, inbox_id, sender_email, lead_email, sequence_number, subject, body, lead, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.profile, str(inbox_id), sender_email, str(lead.get('email', '')).lower().strip(), sequence_number,
+             subject, body, json.dumps(dict(lead), default=str), datetime.now().isoformat())
+        )
+        conn.commit()
+        conn.close()
+
+    def take(self, inbox_id) -> Optional[Dict[str, Any]]:
+        """Atomically remove and return the oldest prepared email for this inbox."""
+        conn = self._connect()
+        # Autocommit mode + explicit BEGIN IMMEDIATE: the SELECT and DELETE share one write
+        # transaction, so two workers firing slots for the same inbox can't both get the row.
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, sender_email, sequence_number, subject, body, lead FROM prepared_emails "
+                    "WHERE profile = ? AND inbox_id = ? ORDER BY id LIMIT 1",
+                    (self.profile, str(inbox_id))
+                ).fetchone()
+                taken = row is not None and conn.execute(
+                    "DELETE FROM prepared_emails WHERE id = ?", (row[0],)).rowcount == 1
+                conn.execute("COMMIT" if taken else "ROLLBACK")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        if not taken:
+            return None
+        return {
+            "inbox_id": inbox_id,
+            "sender_email": row[1],
+            "sequence_number": row[2],
+            "subject": row[3],
+            "body": row[4],
+            "lead": json.loads(row[5]),
+        }
+
+    def ready_counts(self) -> Dict[str, int]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT inbox_id, COUNT(*) FROM prepared_emails WHERE profile = ? GROUP BY inbox_id", (self.profile,)
+        ).fetchall()
+        conn.close()
+        return {inbox_id: count for inbox_id, count in rows}
+
+    def reserved_emails(self) -> set:
+        """Leads that already have a prepared email (must not be selected again)."""
+        conn = self._connect()
+        rows = conn.execute("SELECT lead_email FROM prepared_emails WHERE profile = ?", (self.profile,)).fetchall()
+        conn.close()
+        return {r[0] for r in rows}
+
+    def purge_older_than(self, age: timedelta) -> int:
+        cutoff = (datetime.now() - age).isoformat()
+        conn = self._connect()
+        cur = conn.execute("DELETE FROM prepared_emails WHERE profile = ? AND created_at < ?", (self.profile, cutoff))
+        conn.commit()
+        conn.close()
+        return cur.rowcount
+
+
+class GenerationPipeline:
+    """
+    Keeps a prepared email ready for every send slot in the lookahead window.
+
+    upcoming_fn(seconds)                 -> [(scheduled_time, inbox_id)] due within that many seconds
+    select_fn(inbox_id)                  -> (prospect, sequence_number) or (None, None)
+    generate_fn(inbox_id, prospect, seq) -> {"subject", "body", "sender_email"}
+    """
+
+    def __init__(self, profile: str,
+                 upcoming_fn: Callable[[float], List[Tuple[datetime, Any]]],
+                 select_fn: Callable[[Any], Tuple[Optional[Dict[str, Any]], Optional[int]]],
+                 generate_fn: Callable[[Any, Dict[str, Any], int], Dict[str, str]],
+                 workers: int = GENERATION_WORKERS,
+                 lookahead_minutes: int = LOOKAHEAD_MINUTES,
+                 max_ready: int = MAX_READY,
+                 db_path: str = None):
+        self.queue = PreparedEmailQueue(profile, db_path)
+        self.upcoming_fn = upcoming_fn
+        self.select_fn = select_fn
+        self.generate_fn = generate_fn
+        self.workers = workers
+        self.lookahead = lookahead_minutes * 60
+        self.max_ready = max_ready
+
+        self._cond = threading.Condition()
+        self._select_lock = threading.Lock()
+        self._threads = []
+        self._stopped = True
+        self._ready = {}       # inbox_id -> prepared count (mirror of the SQLite queue)
+        self._generating = {}  # inbox_id -> generations in progress
+        self._waiting = {}     # inbox_id -> slots currently blocked in take()
+        self._reserved = set() # lead emails with a prepared (or in-progress) email
+        self._taken = set()    # reserved leads handed to a slot and not yet release()d
+        self._no_prospects_until = {} # inbox_id -> monotonic time; don't retry selection before this
+        self._last_purge = 0.0
+
+        # --- METRICS ---
+        self._generated = 0
+        self._gen_failures = 0
+        self._gen_seconds = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._wait_seconds = 0.0
+        self._recent = deque()
+
+    @property
+    def running(self) -> bool:
+        return not self._stopped
+
+    def _purge_stale(self):
+        """Drop prepared emails past PREPARED_TTL (e.g. for inboxes paused by rotation) and release their leads."""
+        self._last_purge = time.monotonic()
+        purged = self.queue.purge_older_than(PREPARED_TTL)
+        if purged:
+            logger.info(f"🧹 Discarded {purged} stale prepared emails.")
+        with self._cond:
+            self._ready = {str(k): v for k, v in self.queue.ready_counts().items()}
+            self._reserved = self.queue.reserved_emails() | self._taken
+
+    def start(self):
+        if not self._stopped:
+            return
+        self._purge_stale()
+        self._stopped = False
+        recovered = sum(self._ready.values())
+        if recovered:
+            logger.info(f"♻️ Recovered {recovered} prepared emails from the persistent queue.")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"email-gen-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"🏭 Generation pipeline started ({self.workers} workers, {self.lookahead // 60} min lookahead)")
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+    def is_reserved(self, email: str) -> bool:
+        with self._cond:
+            return str(email or '').lower().strip() in self._reserved
+
+    def reserved_count(self) -> int:
+        with self._cond:
+            return len(self._reserved)
+
+    # ------------------------------------------------------------------ consumer
+
+    def take(self, inbox_id, wait_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Prepared email for this inbox, waiting up to wait_seconds (default SLOT_WAIT_SECONDS) for one (None -> generate inline)."""
+        if wait_seconds is None:
+            wait_seconds = SLOT_WAIT_SECONDS
+        key = str(inbox_id)
+        if self._stopped:
+            return None
+        started = time.monotonic()
+        deadline = started + wait_seconds
+        with self._cond:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            self._cond.notify_all() # Generators serve waiting slots first
+            try:
+                while True:
+                    if self._ready.get(key):
+                        prepared = self.queue.take(inbox_id)
+                        if prepared:
+                            self._ready[key] -= 1
+                            # Stays reserved until the slot release()s it (after the send holds its suppression lock)
+                            self._taken.add(str(prepared['lead'].get('email', '')).lower().strip())
+                            self._hits += 1
+                            self._wait_seconds += time.monotonic() - started
+                            return prepared
+                        self._ready[key] = 0
+                    remaining = deadline - time.monotonic()
+                    # Nothing coming: no generation running for us and no prospects to select
+                    if remaining <= 0 or self._stopped or (not self._generating.get(key) and self._no_prospects(key)):
+                        self._misses += 1
+                        return None
+                    self._cond.wait(timeout=min(remaining, 5))
+            finally:
+                self._waiting[key] -= 1
+                if not self._waiting[key]:
+                    del self._waiting[key]
+
+    def release(self, email: str):
+        """Lead from take() is sent (or dropped): selection may see it again, now through suppression/the sheet."""
+        email = str(email or '').lower().strip()
+        with self._cond:
+            self._taken.discard(email)
+            self._reserved.discard(email)
+
+    def _no_prospects(self, key: str) -> bool:
+        return self._no_prospects_until.get(key, 0) > time.monotonic()
+
+    # ------------------------------------------------------------------ producer
+
+    def _next_inbox(self) -> Optional[Any]:
+        """Inbox whose unmet demand is most urgent (caller holds the condition)."""
+        if sum(self._ready.values()) + sum(self._generating.values()) >= self.max_ready:
+            return None
+
+        def unmet(key, demand):
+            return demand - self._ready.get(key, 0) - self._generating.get(key, 0)
+
+        # 1. Slots already firing and waiting
+        for key, waiting in self._waiting.items():
+            if unmet(key, waiting) > 0 and not self._no_prospects(key):
+                return key
+        # 2. Upcoming slots inside the lookahead window, earliest first
+        demand = {}
+        for _, inbox_id in sorted(self.upcoming_fn(self.lookahead), key=lambda s: s[0]):
+            key = str(inbox_id)
+            demand[key] = demand.get(key, 0) + 1
+            if unmet(key, demand[key] + self._waiting.get(key, 0)) > 0 and not self._no_prospects(key):
+                return inbox_id
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                inbox_id = None
+                while not self._stopped:
+                    inbox_id = self._next_inbox()
+                    if inbox_id is not None:
+                        break
+                    self._cond.wait(timeout=IDLE_POLL_SECONDS)
+                    if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS and not self._generating:
+                        self._purge_stale()
+                if self._stopped:
+                    return
+                key = str(inbox_id)
+                self._generating[key] = self._generating.get(key, 0) + 1
+            try:
+                self._prepare_one(inbox_id)
+            finally:
+                with self._cond:
+                    self._generating[key] -= 1
+                    if not self._generating[key]:
+                        del self._generating[key]
+                    self._cond.notify_all()
+
+    def _prepare_one(self, inbox_id):
+        key = str(inbox_id)
+        try:
+            # Serialized so a lead is reserved before another worker can select it (may hit Sheets on refresh)
+            with self._select_lock:
+                prospect, sequence_number = self.select_fn(inbox_id)
+                with self._cond:
+                    if prospect is None:
+                        # Back off this inbox for a while instead of spinning on an empty lead list
+                        self._no_prospects_until[key] = time.monotonic() + IDLE_POLL_SECONDS * 4
+                        return
+                    email = str(prospect.get('email', '')).lower().strip()
+                    self._reserved.add(email)
+        except Exception as e:
+            logger.error(f"❌ [PIPELINE] Prospect selection failed for inbox {inbox_id}: {str(e).splitlines()[0]}")
+            return
+
+        started = time.monotonic()
+        try:
+            result = self.generate_fn(inbox_id, prospect, sequence_number)
+            self.queue.put(inbox_id, result.get('sender_email'), prospect, sequence_number, result['subject'], result['body'])
+        except Exception as e:
+            with self._cond:
+                self._reserved.discard(email)
+                self._gen_failures += 1
+            logger.error(f"❌ [PIPELINE] Generation failed for {email}: {str(e).splitlines()[0]}")
+            return
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._ready[key] = self._ready.get(key, 0) + 1
+            self._generated += 1
+            self._gen_seconds += elapsed
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > 300:
+                self._recent.popleft()
+        logger.info(f"🏭 [PIPELINE] Prepared Stage {sequence_number} email for {email} (inbox {inbox_id}) in {elapsed:.1f}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 300:
+                self._recent.popleft()
+            served = self._hits + self._misses
+            return {
+                "ready": sum(self._ready.values()),
+                "generating": sum(self._generating.values()),
+                "waiting_slots": sum(self._waiting.values()),
+                "generated": self._generated,
+                "generation_failures": self._gen_failures,
+                "avg_generation_seconds": round(self._gen_seconds / self._generated, 2) if self._generated else 0.0,
+                "generation_rate_per_minute": round(len(self._recent) / 5, 2),
+                "slot_hits": self._hits,
+                "slot_misses": self._misses,
+                "hit_rate": round(self._hits / served, 3) if served else 0.0,
+                "avg_slot_wait_seconds": round(self._wait_seconds / self._hits, 2) if self._hits else 0.0,
+            }
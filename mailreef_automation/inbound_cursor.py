@@ -0,0 +1,86 @@
+"""
+Per-consumer read position in the Mailreef inbound feed.
+
+MailreefClient.iter_inbound(consumer=...) starts from the consumer's cursor
+(the newest message it finished scanning) and stops as soon as it reaches it,
+so each run only downloads the pages that arrived since. Cursors live in
+SQLite next to the other stores, keyed by Mailreef account and consumer name.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("INBOUND_CURSOR")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CURSOR_PATH = os.path.join(ROOT_DIR, "inbound_cursors.db")
+
+
+class InboundCursorStore:
+    """Last fully scanned inbound message (ts, id) per account and consumer."""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DEFAULT_CURSOR_PATH
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize the cursor table."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inbound_cursors (
+                    account TEXT NOT NULL,
+                    consumer TEXT NOT NULL,
+                    last_ts REAL NOT NULL,
+                    last_id TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (account, consumer)
+                )
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize inbound cursor store: {e}")
+
+    def load(self, account: str, consumer: str) -> Optional[Tuple[float, Optional[str]]]:
+        """(last_ts, last_id) for the consumer, or None if it never completed a scan."""
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT last_ts, last_id FROM inbound_cursors WHERE account = ? AND consumer = ?",
+                               (account, consumer)).fetchone()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read inbound cursor for {consumer}: {e}")
+            return None
+        return (row[0], row[1]) if row else None
+
+    def save(self, account: str, consumer: str, last_ts: float, last_id: Optional[str]):
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO inbound_cursors (account, consumer, last_ts, last_id, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (account, consumer, last_ts, last_id, time.time()))
+            conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save inbound cursor for {consumer}: {e}")
+
+    def reset(self, account: str, consumer: str):
+        """Forget the consumer's position: its next scan starts from since_ts / max_pages again."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM inbound_cursors WHERE account = ? AND consumer = ?", (account, consumer))
+            conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reset inbound cursor for {consumer}: {e}")
@@ -0,0 +1,246 @@
+"""
+Shared, TTL-refreshed registry of Mailreef inboxes.
+
+MailreefClient.get_inboxes() crawls every domain and every mailbox page, so it
+must never run on a send slot's hot path. The registry keeps the last crawl in
+memory (sorted by id, the order the inbox_indices partitions are defined in)
+and refreshes it on a background thread every INBOX_REGISTRY_TTL_MINUTES.
+Only the very first lookup in a process waits for a crawl.
+
+One registry exists per API account and process, shared by the scheduler and
+the reply watcher. Each successful crawl is also snapshotted to SQLite, so a
+restarted process starts from the last list instead of crawling again; a
+snapshot older than the TTL is still served (up to MAX_SNAPSHOT_AGE) while the
+background thread refreshes it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("INBOX_REGISTRY")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SNAPSHOT_PATH = os.path.join(ROOT_DIR, "inbox_registry.db")
+
+INBOX_REGISTRY_TTL_SECONDS = int(os.environ.get("INBOX_REGISTRY_TTL_MINUTES", "60")) * 60
+# After a failed crawl, retry sooner than the full TTL
+RETRY_SECONDS = 300
+# An older snapshot is not trusted at startup: inboxes may have been added or removed since
+MAX_SNAPSHOT_AGE_SECONDS = 24 * 3600
+
+
+class InboxSnapshotStore:
+    """Last successful inbox crawl per Mailreef account, kept across restarts."""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DEFAULT_SNAPSHOT_PATH
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize the snapshot table."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inbox_snapshots (
+                    account TEXT PRIMARY KEY,
+                    inboxes TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize inbox snapshot store: {e}")
+
+    def load(self, account: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """(inboxes, fetched_at epoch seconds) of the last snapshot, or None."""
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT inboxes, fetched_at FROM inbox_snapshots WHERE account = ?", (account,)).fetchone()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read inbox snapshot: {e}")
+            return None
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def save(self, account: str, inboxes: List[Dict[str, Any]]):
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO inbox_snapshots (account, inboxes, fetched_at) VALUES (?, ?, ?)",
+                             (account, json.dumps(inboxes), time.time()))
+            conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save inbox snapshot: {e}")
+
+
+class InboxRegistry:
+    """In-memory inbox list and id -> email map, refreshed in the background."""
+
+    def __init__(self, mailreef_client, ttl_seconds: int = INBOX_REGISTRY_TTL_SECONDS,
+                 snapshots: Optional[InboxSnapshotStore] = None):
+        self.mailreef = mailreef_client
+        self.ttl = ttl_seconds
+        self.snapshots = snapshots
+        self.account = _account_key(mailreef_client)
+        self._inboxes: List[Dict[str, Any]] = []
+        self._emails: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._attempted_at = None
+        self._lock = threading.Lock()         # Guards the published snapshot
+        self._refresh_lock = threading.RLock() # Single-flight: one crawl at a time
+        self._wake = threading.Event()
+        self._thread = None
+
+    # ------------------------------------------------------------------ refresh
+
+    def refresh(self) -> bool:
+        """Crawl Mailreef now and publish the result. Returns False if the crawl failed or came back empty."""
+        with self._refresh_lock:
+            self._attempted_at = time.monotonic()
+            try:
+                inboxes = self.mailreef.get_inboxes()
+            except Exception as e:
+                logger.error(f"❌ Inbox registry refresh failed: {str(e).splitlines()[0]}")
+                return False
+            if not inboxes:
+                # get_inboxes() swallows API errors and returns []: keep serving the last good list
+                logger.warning("⚠️ Inbox registry refresh returned no inboxes; keeping previous list.")
+                return False
+
+            self._publish(inboxes, time.monotonic())
+            if self.snapshots:
+                self.snapshots.save(self.account, inboxes)
+            logger.info(f"✅ Inbox registry loaded {len(inboxes)} inboxes ({len(self._emails)} with addresses).")
+            return True
+
+    def _publish(self, inboxes: List[Dict[str, Any]], loaded_at: float):
+        inboxes = sorted(inboxes, key=lambda x: x['id'])
+        emails = {}
+        for ibx in inboxes:
+            # differnet schemas/fields sometimes
+            email = ibx.get('email') or ibx.get('address')
+            if email:
+                emails[str(ibx['id'])] = email
+        with self._lock:
+            self._inboxes = inboxes
+            self._emails = emails
+            self._loaded_at = loaded_at
+
+    def _load_snapshot(self) -> bool:
+        """Warm start from the last crawl on disk. Returns True if it was recent enough to serve."""
+        snapshot = self.snapshots.load(self.account) if self.snapshots else None
+        if not snapshot or not snapshot[0]:
+            return False
+        inboxes, fetched_at = snapshot
+        age = max(0.0, time.time() - fetched_at)
+        if age > MAX_SNAPSHOT_AGE_SECONDS:
+            return False
+        # Back-date loaded_at so the background thread refreshes when the snapshot's TTL runs out
+        self._publish(inboxes, (time.monotonic() - age) or 1e-6)
+        logger.info(f"💾 Inbox registry restored {len(inboxes)} inboxes from snapshot ({age / 60:.0f} min old).")
+        return True
+
+    def _refresh_loop(self):
+        while True:
+            self._wake.wait(timeout=self._next_refresh_in())
+            self._wake.clear()
+            self.refresh()
+
+    def _next_refresh_in(self) -> float:
+        age = self.age_seconds()
+        due = self.ttl - age if age is not None else 0.0
+        if self._attempted_at is not None:
+            # A failed crawl is retried after RETRY_SECONDS, not in a tight loop
+            due = max(due, RETRY_SECONDS - (time.monotonic() - self._attempted_at))
+        return max(0.0, due)
+
+    def _ensure_loaded(self):
+        """Only the first lookup in the process crawls inline; after that the background thread keeps it fresh."""
+        if not self._loaded_at:
+            with self._refresh_lock:
+                # A failed cold crawl is retried by the background thread, not by every caller
+                if not self._loaded_at and not self._load_snapshot() and self._may_retry():
+                    self.refresh()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._refresh_loop, name="inbox-registry", daemon=True)
+                    self._thread.start()
+
+    def request_refresh(self):
+        """Ask the background thread to crawl soon (e.g. an unknown inbox id was seen). Never blocks."""
+        if self._may_retry():
+            self._wake.set()
+
+    def _may_retry(self) -> bool:
+        return self._attempted_at is None or time.monotonic() - self._attempted_at > RETRY_SECONDS
+
+    # ------------------------------------------------------------------ lookups
+
+    def inboxes(self) -> List[Dict[str, Any]]:
+        """All inboxes sorted by id (consistent rotation/partition order)."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._inboxes)
+
+    def partition(self, indices: Optional[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """The slice of the sorted inbox list a campaign profile owns (inbox_indices)."""
+        inboxes = self.inboxes()
+        if not indices:
+            return inboxes
+        start, end = indices
+        return inboxes[start:end]
+
+    def email_for(self, inbox_id) -> Optional[str]:
+        """Sender address for an inbox id (or the id itself if it already is an address)."""
+        if '@' in str(inbox_id):
+            return str(inbox_id)
+        self._ensure_loaded()
+        with self._lock:
+            email = self._emails.get(str(inbox_id))
+        if email is None:
+            self.request_refresh()
+        return email
+
+    def email_map(self) -> Dict[str, str]:
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._emails)
+
+    def age_seconds(self) -> Optional[float]:
+        with self._lock:
+            return time.monotonic() - self._loaded_at if self._loaded_at else None
+
+
+def _account_key(mailreef_client) -> str:
+    """Stable id for a Mailreef account (the API key itself is never stored)."""
+    base_url = getattr(mailreef_client, 'base_url', '')
+    api_key = getattr(mailreef_client, 'api_key', '') or str(id(mailreef_client))
+    return hashlib.sha256(f"{base_url}|{api_key}".encode()).hexdigest()[:16]
+
+
+_registries: Dict[str, InboxRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_inbox_registry(mailreef_client) -> InboxRegistry:
+    """Process-wide registry for the client's Mailreef account."""
+    key = _account_key(mailreef_client)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = InboxRegistry(mailreef_client, snapshots=InboxSnapshotStore())
+        return registry
@@ -0,0 +1,168 @@
+"""
+Local indexed SQLite mirror of a campaign's lead sheet.
+
+The Google Sheet stays the human-facing source of truth; this mirror is kept in
+sync by GoogleSheetsClient (full/delta syncs and every status write) so the hot
+paths -- follow-up selection and email -> row lookups -- are indexed queries that never touch the Google API. It also lets a
+restarted process warm-start without downloading the sheet again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("LEAD_MIRROR")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIRROR_PATH = os.path.join(ROOT_DIR, "lead_mirror.db")
+
+
+def _norm(value) -> str:
+    return str(value if value is not None else '').lower().strip()
+
+
+class LeadMirror:
+    """SQLite copy of one input sheet, keyed by (sheet, row)."""
+
+    def __init__(self, sheet_key: str, db_path: str = None):
+        self.sheet_key = sheet_key
+        self.db_path = db_path or DEFAULT_MIRROR_PATH
+        # One long-lived connection: these queries run on every slot, so we avoid
+        # paying a connect() per lookup. Access is serialized by the lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize the mirror tables and the hot-path indexes."""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS leads (
+                    sheet TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    email TEXT,
+                    email_norm TEXT,
+                    email_domain TEXT,
+                    domain TEXT,
+                    status TEXT,
+                    sender_email TEXT,
+                    email_1_sent_at TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (sheet, row)
+                )
+            ''')
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_email ON leads(sheet, email_norm)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(sheet, status, row)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_sender ON leads(sheet, sender_email, status, email_1_sent_at)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_sent_at ON leads(sheet, email_1_sent_at)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_email_domain ON leads(sheet, email_domain)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads(sheet, domain)")
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    sheet TEXT PRIMARY KEY,
+                    headers TEXT,
+                    row_count INTEGER,
+                    modified TEXT,
+                    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self._conn.commit()
+
+    # ------------------------------------------------------------------ writes
+
+    def _row_tuple(self, record: Dict[str, Any]) -> tuple:
+        email_norm = _norm(record.get('email'))
+        domain = _norm(record.get('domain')).replace('https://', '').replace('http://', '').replace('www.', '').strip('/')
+        return (
+            self.sheet_key,
+            record['_row'],
+            str(record.get('email', '')),
+            email_norm,
+            email_norm.split('@')[-1] if '@' in email_norm else '',
+            domain,
+            _norm(record.get('status')),
+            str(record.get('sender_email', '') or ''),
+            str(record.get('email_1_sent_at', '') or ''),
+            json.dumps(dict(record), default=str),
+        )
+
+    def replace_all(self, records: Iterable[Dict[str, Any]], headers: List[str], row_count: int, modified: Optional[str]):
+        """Swap in a full sync result atomically."""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("DELETE FROM leads WHERE sheet = ?", (self.sheet_key,))
+            cur.executemany("INSERT INTO leads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [self._row_tuple(r) for r in records])
+            self._save_state(cur, headers, row_count, modified)
+            self._conn.commit()
+
+    def apply_delta(self, upserts: Iterable[Dict[str, Any]], deleted_rows: Iterable[int],
+                    headers: List[str], row_count: int, modified: Optional[str]):
+        """Apply a delta sync result atomically."""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.executemany("DELETE FROM leads WHERE sheet = ? AND row = ?",
+                            [(self.sheet_key, row) for row in deleted_rows])
+            cur.executemany("INSERT OR REPLACE INTO leads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [self._row_tuple(r) for r in upserts])
+            self._save_state(cur, headers, row_count, modified)
+            self._conn.commit()
+
+    def upsert(self, records: Iterable[Dict[str, Any]]):
+        """Insert or refresh individual records (e.g. after a status write)."""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO leads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [self._row_tuple(r) for r in records])
+            self._conn.commit()
+
+    def _save_state(self, cur, headers: List[str], row_count: int, modified: Optional[str]):
+        cur.execute(
+            "INSERT OR REPLACE INTO sync_state (sheet, headers, row_count, modified, synced_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            (self.sheet_key, json.dumps(headers), row_count, modified)
+        )
+
+    # ------------------------------------------------------------------- reads
+
+    def load(self) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """Warm start: every mirrored record (row order) plus the sync state, or None if never synced."""
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT headers, row_count, modified FROM sync_state WHERE sheet = ?", (self.sheet_key,)
+            ).fetchone()
+            if not state:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM leads WHERE sheet = ? ORDER BY row", (self.sheet_key,)
+            ).fetchall()
+        records = [json.loads(data) for (data,) in rows]
+        return records, {'headers': json.loads(state[0] or '[]'), 'row_count': state[1], 'modified': state[2]}
+
+    def followup_rows(self, cutoff_iso: str, sender_email: Optional[str] = None, limit: int = 100) -> List[int]:
+        """Rows at email_1_sent whose email_1_sent_at is on/before the cutoff (ISO strings sort chronologically)."""
+        query = '''
+            SELECT row FROM leads
+            WHERE sheet = ? AND status = 'email_1_sent' AND email_1_sent_at != '' AND email_1_sent_at <= ?
+        '''
+        params = [self.sheet_key, cutoff_iso]
+        if sender_email:
+            query += " AND sender_email = ?"
+            params.append(sender_email)
+        query += " ORDER BY row LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [r[0] for r in rows]
+
+    def rows_for_email(self, email: str) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row FROM leads WHERE sheet = ? AND email_norm = ? ORDER BY row", (self.sheet_key, _norm(email))
+            ).fetchall()
+        return [r[0] for r in rows]
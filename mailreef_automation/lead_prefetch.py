@@ -0,0 +1,182 @@
+"""
+Demand-sized Stage 1 lead prefetch.
+
+The scheduler used to cache a fixed 50 pending leads and re-read the sheet
+whenever they ran out, while a busy window fires hundreds of slots an hour.
+LeadPrefetcher sizes each fetch from the current send rate (slots per minute x
+PREFETCH_HORIZON_MINUTES), refills on a background thread as soon as the cache
+falls below a low-water mark, and only blocks a slot when the cache is empty.
+
+Hit/miss counts are kept per send window: a hit is a slot served straight from
+the cache, a miss is a slot that had to wait for a sheet read (or found none).
+"""
+
+import math
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("LEAD_PREFETCH")
+
+PREFETCH_HORIZON_MINUTES = int(os.environ.get("PREFETCH_HORIZON_MINUTES", "15"))
+PREFETCH_MIN = 50
+PREFETCH_MAX = int(os.environ.get("PREFETCH_MAX", "1000"))
+LOW_WATER_FRACTION = 0.25
+# A selected lead stays 'pending' in the sheet until its send is recorded; don't hand it out again meanwhile
+IN_FLIGHT_TTL = timedelta(minutes=30)
+# After a fetch finds no pending leads, slots don't re-read the sheet for this long
+EMPTY_BACKOFF = timedelta(minutes=1)
+
+
+class LeadPrefetcher:
+    """
+    Stage 1 lead cache refilled ahead of demand.
+
+    fetch_fn(limit)  -> pending leads, best first (e.g. sheets.get_pending_leads)
+    demand_fn()      -> expected Stage 1 sends per minute right now
+    window_fn()      -> label of the current send window (stats bucket), or None outside windows
+    """
+
+    def __init__(self, fetch_fn: Callable[[int], List[Dict[str, Any]]], demand_fn: Callable[[], float],
+                 window_fn: Callable[[], Optional[str]], horizon_minutes: int = PREFETCH_HORIZON_MINUTES,
+                 ttl: timedelta = timedelta(minutes=5), log: Any = None):
+        self.fetch_fn = fetch_fn
+        self.demand_fn = demand_fn
+        self.window_fn = window_fn
+        self.horizon_minutes = horizon_minutes
+        self.ttl = ttl
+        self.logger = log or logger
+
+        self._cache: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock() # Single-flight: one sheet read at a time
+        self._refilling = False
+        self._last_fetch = datetime.min
+        self._empty_until = datetime.min
+        self._in_flight: Dict[str, datetime] = {}
+        self._target = PREFETCH_MIN
+
+        # --- METRICS ---
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._window = None
+
+    def target_size(self) -> int:
+        """Leads needed to cover the next horizon at the current send rate."""
+        try:
+            demand = self.demand_fn()
+        except Exception:
+            demand = 0
+        return max(PREFETCH_MIN, min(PREFETCH_MAX, math.ceil(demand * self.horizon_minutes)))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    # ------------------------------------------------------------------ refill
+
+    def refill(self) -> int:
+        """Fetch a demand-sized batch now and replace the cache with it. Returns the cache size."""
+        seen = self._last_fetch
+        with self._fetch_lock:
+            with self._lock:
+                if self._last_fetch != seen and self._cache:
+                    return len(self._cache) # Another caller refilled while we waited
+            target = self.target_size()
+            try:
+                batch = self.fetch_fn(target)
+            except Exception as e:
+                # Log only the first line of the error to avoid 429 flood noise
+                self.logger.error(f"❌ Lead cache refresh failed: {str(e).splitlines()[0]}")
+                return len(self)
+            now = datetime.now()
+            with self._lock:
+                self._in_flight = {e: t for e, t in self._in_flight.items() if now - t < IN_FLIGHT_TTL}
+                fresh = [lead for lead in batch or []
+                         if str(lead.get('email', '')).lower().strip() not in self._in_flight]
+                self._target = target
+                self._last_fetch = now
+                if fresh:
+                    self._cache = fresh
+                else:
+                    self._empty_until = now + EMPTY_BACKOFF
+                size = len(self._cache)
+            if fresh:
+                self.logger.info(f"✅ Cached {len(fresh)} fresh Stage 1 leads (target {target}).")
+            else:
+                self.logger.warning("⚠️ No pending Stage 1 leads found!")
+            return size
+
+    def _refill_async(self):
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+
+        def run():
+            try:
+                self.refill()
+            finally:
+                with self._lock:
+                    self._refilling = False
+
+        threading.Thread(target=run, name="lead-prefetch", daemon=True).start()
+
+    def _needs_refill(self) -> bool:
+        # Called with the lock held
+        return (len(self._cache) < self._target * LOW_WATER_FRACTION
+                or datetime.now() - self._last_fetch > self.ttl)
+
+    # ------------------------------------------------------------------ take
+
+    def take(self, count: int, accept: Callable[[Dict[str, Any]], bool] = lambda lead: True) -> List[Dict[str, Any]]:
+        """Pop up to `count` leads that pass `accept` (e.g. suppression). Blocks only if the cache is empty."""
+        with self._lock:
+            hit = bool(self._cache)
+            backing_off = datetime.now() < self._empty_until
+        if not hit and not backing_off:
+            self.logger.info("🔄 Refreshing Stage 1 lead cache...")
+            self.refill()
+
+        selected = []
+        now = datetime.now()
+        with self._lock:
+            while len(selected) < count and self._cache:
+                candidate = self._cache.pop(0)
+                if accept(candidate):
+                    selected.append(candidate)
+                    self._in_flight[str(candidate.get('email', '')).lower().strip()] = now
+            refill = self._needs_refill() and datetime.now() >= self._empty_until
+        self._record(hit and bool(selected))
+        if refill:
+            self._refill_async()
+        return selected
+
+    # ------------------------------------------------------------------ stats
+
+    def _record(self, hit: bool):
+        window = self.window_fn() or "off-window"
+        with self._lock:
+            previous = self._window
+            self._window = window
+            bucket = self._stats.setdefault(window, {"hits": 0, "misses": 0})
+            bucket["hits" if hit else "misses"] += 1
+            closed = self._stats.get(previous) if previous and previous != window else None
+        if closed:
+            self.logger.info(f"📊 [PREFETCH] Window {previous}: {closed['hits']} hits, {closed['misses']} misses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per send window plus current cache size and target."""
+        with self._lock:
+            return {
+                "cache_size": len(self._cache),
+                "target": self._target,
+                "windows": {w: dict(c) for w, c in self._stats.items()},
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+            self._window = None
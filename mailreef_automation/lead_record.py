@@ -0,0 +1,134 @@
+"""
+Compact in-memory representation of one lead sheet row.
+
+A sheet with thousands of rows used to cost one dict per row, each holding its
+own copy of every normalized header key. LeadRecord stores only a values list
+plus a reference to a LeadSchema that is shared by every row of the sheet, so
+header names (interned) and their positions exist once per sheet.
+
+LeadRecord is a MutableMapping, so existing dict-style callers (record['email'],
+record.get('status'), .update(), 'x' in record, dict(record)) keep working.
+"""
+
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, List, Optional
+
+# Placeholder for a cell that was not downloaded (projected fetch); such keys are absent
+UNLOADED = object()
+
+
+class LeadSchema:
+    """Normalized header names of one sheet and their column positions."""
+
+    __slots__ = ('headers', 'index')
+
+    def __init__(self, headers: Iterable[str]):
+        self.headers = tuple(sys.intern(str(h)) for h in headers)
+        # Duplicate normalized headers (e.g. 'website' and 'domain'): the last column wins, as dict(zip()) did
+        self.index = {h: i for i, h in enumerate(self.headers)}
+
+    def __len__(self):
+        return len(self.headers)
+
+
+class LeadRecord(MutableMapping):
+    """One lead row: a values list addressed through a shared LeadSchema."""
+
+    __slots__ = ('_schema', '_values', '_row', '_extra')
+
+    def __init__(self, schema: LeadSchema, values: List[Any], row: Optional[int] = None):
+        self._schema = schema
+        self._values = values
+        self._row = row
+        self._extra = None # Keys that are not sheet columns (rare; allocated on first use)
+
+    @classmethod
+    def from_dict(cls, schema: LeadSchema, data: Dict[str, Any]) -> 'LeadRecord':
+        """Rebuild a record from its dict form (e.g. the SQLite mirror's JSON)."""
+        record = cls(schema, [data.get(h, UNLOADED) for h in schema.headers], data.get('_row'))
+        for key, value in data.items():
+            if key != '_row' and key not in schema.index:
+                record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        i = self._schema.index.get(key)
+        if i is not None:
+            value = self._values[i]
+            if value is not UNLOADED:
+                return value
+        elif key == '_row':
+            if self._row is not None:
+                return self._row
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        i = self._schema.index.get(key)
+        if i is not None:
+            self._values[i] = value
+        elif key == '_row':
+            self._row = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        i = self._schema.index.get(key)
+        if i is not None:
+            self._values[i] = UNLOADED
+        elif key == '_row':
+            self._row = None
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        i = self._schema.index.get(key)
+        if i is not None:
+            return self._values[i] is not UNLOADED
+        if key == '_row':
+            return self._row is not None
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        values = self._values
+        index = self._schema.index
+        for i, header in enumerate(self._schema.headers):
+            if index[header] == i and values[i] is not UNLOADED:
+                yield header
+        if self._row is not None:
+            yield '_row'
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        # Hot path (selection/indexing): avoid the KeyError round trip of Mapping.get
+        i = self._schema.index.get(key)
+        if i is not None:
+            value = self._values[i]
+            return default if value is UNLOADED else value
+        if key == '_row':
+            return default if self._row is None else self._row
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def clear(self):
+        self._values = [UNLOADED] * len(self._schema)
+        self._row = None
+        self._extra = None
+
+    def copy(self) -> Dict[str, Any]:
+        """Plain dict copy (callers mutate copies freely)."""
+        return dict(self)
+
+    def __repr__(self):
+        return f"LeadRecord({dict(self)!r})"
@@ -32,6 +32,11 @@ def get_logger(name: str, log_filename: str = None):
         # We will need to re-fetch logger inside the classes with the specific profile context.
         pass
 
+    # Profile-specific files get their own logger (e.g. SCHEDULER_STRATEGY_B) so several
+    # profiles hosted in one process never write into each other's log files.
+    if log_filename and log_filename != "automation.log":
+        name = f"{name}_{Path(log_filename).stem.upper()}"
+        
     logger = logging.getLogger(name)
     
     # If logger already has handlers, check if we need to add a new file handler?
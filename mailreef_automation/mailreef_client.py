@@ -2,14 +2,59 @@ import requests
 import time
 import os
 import re
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
 from mailreef_automation.logger_util import get_logger
+from mailreef_automation.inbound_cursor import InboundCursorStore
+from mailreef_automation.inbox_registry import _account_key
+from mailreef_automation.circuit_breaker import (OPEN as BREAKER_OPEN, RETRYABLE_STATUS, SEND_RETRIES, CircuitBreaker,
+                                                 backoff_delay, retry_after_seconds)
 
 # Mailreef API Config
 # Base URL and API Key are managed via automation_config or environment variables
 
 logger = get_logger("MAILREEF_CLIENT")
 
+# Domains whose mailboxes are listed in parallel during get_inboxes()
+INBOX_CRAWL_WORKERS = int(os.environ.get("MAILREEF_CRAWL_WORKERS", "8"))
+# Safety cap for iter_inbound when neither since_ts nor a cursor stops it earlier
+INBOUND_MAX_PAGES = int(os.environ.get("MAILREEF_INBOUND_MAX_PAGES", "50"))
+
+def build_send_payload(inbox_id: str, to_email: str, subject: str, body: str,
+                       reply_to: Optional[str] = None) -> Dict:
+    """POST /email payload (shared by the sync and async clients)."""
+    # 1. Strip HTML tags for text_body
+    text_body = re.sub('<[^<]+?>', '', body)
+    
+    # 2. Build payload according to Mailreef API documentation
+    payload = {
+        "from": inbox_id,
+        "to": [to_email],  # API expects a list
+        "subject": subject,
+        "text_body": text_body,
+        "html_body": body
+    }
+    
+    # Handle threading if references are provided (usually passed as reply_to in this system)
+    if reply_to:
+        # Based on user-provided doc, 'in_reply_to' is used for threading/reply
+        payload["in_reply_to"] = reply_to
+    return payload
+
+
+def extract_message_id(data: Dict) -> Optional[str]:
+    return data.get('id') or data.get('message_id') or data.get('data', {}).get('id')
+
+
+def error_message(response) -> str:
+    """Mailreef's error text from a requests or httpx response."""
+    try:
+        error_data = response.json()
+        return error_data.get('message') or error_data.get('error') or response.text
+    except:
+        return response.text
+
+
 class MailreefClient:
     """Client for interacting with Mailreef API"""
     
@@ -22,66 +67,61 @@ class MailreefClient:
             "Content-Type": "application/json"
         })
         self.logger = logger # Use the module-level logger consistently
+        # Shared by every caller of this client: an outage trips it once for all profiles
+        self.breaker = CircuitBreaker("mailreef", on_trip=self._run_diagnostics)
+        self.inbound_cursors = None # InboundCursorStore, opened on first iter_inbound(consumer=...)
     
     def get_inboxes(self) -> List[Dict]:
         """
         Fetch all available mailboxes by iterating through domains.
+
+        Domains' mailbox pages are fetched concurrently (INBOX_CRAWL_WORKERS). Any
+        failure returns [] rather than a partial list: callers partition inboxes by
+        index, and a missing domain would shift every profile's slice.
         """
-        inboxes = []
         try:
             # 1. Fetch all domains
-            domains = []
-            page = 1
-            while True:
-                response = self.session.get(
-                    f"{self.base_url}/domains", 
-                    params={"page": page, "display": 100}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                # Check structure
-                batch = data.get('data', data) if isinstance(data, dict) else data
-                if not batch:
-                    break
-                    
-                domains.extend(batch)
-                
-                # Simple pagination check: if less than display limit, we are done
-                if len(batch) < 100:
-                    break
-                page += 1
-            
+            domains = self._fetch_pages(f"{self.base_url}/domains", {})
+
             # 2. Fetch mailboxes for each domain
-            for domain in domains:
-                domain_id = domain.get('id')
-                if not domain_id: continue
-                
-                page = 1
-                while True:
-                    response = self.session.get(
-                        f"{self.base_url}/mailboxes",
-                        params={"domain": domain_id, "page": page, "display": 100}
-                    )
-                    # If 404/400, skip domain
-                    if response.status_code >= 400:
-                        break
-                        
-                    data = response.json()
-                    batch = data.get('data', data) if isinstance(data, dict) else data
-                    if not batch:
-                        break
-                        
-                    inboxes.extend(batch)
-                    
-                    if len(batch) < 100:
-                        break
-                    page += 1
-                    
+            domain_ids = [domain.get('id') for domain in domains if domain.get('id')]
+            if not domain_ids:
+                return []
+            with ThreadPoolExecutor(max_workers=min(INBOX_CRAWL_WORKERS, len(domain_ids)),
+                                    thread_name_prefix="inbox-crawl") as pool:
+                batches = list(pool.map(self._fetch_domain_mailboxes, domain_ids))
+            return [inbox for batch in batches for inbox in batch]
         except Exception as e:
             logger.error(f"❌ Error fetching inboxes: {e}")
-            
-        return inboxes
+            return []
+
+    def _fetch_domain_mailboxes(self, domain_id) -> List[Dict]:
+        # If 404/400, skip domain
+        return self._fetch_pages(f"{self.base_url}/mailboxes", {"domain": domain_id}, skip_on_error=True)
+
+    def _fetch_pages(self, url: str, params: Dict, skip_on_error: bool = False) -> List[Dict]:
+        """All pages of a list endpoint (display=100 per page)."""
+        items = []
+        page = 1
+        while True:
+            response = self.session.get(url, params={**params, "page": page, "display": 100}, timeout=30)
+            if skip_on_error and 400 <= response.status_code < 500:
+                break
+            response.raise_for_status()
+            data = response.json()
+
+            # Check structure
+            batch = data.get('data', data) if isinstance(data, dict) else data
+            if not batch:
+                break
+
+            items.extend(batch)
+
+            # Simple pagination check: if less than display limit, we are done
+            if len(batch) < 100:
+                break
+            page += 1
+        return items
     
     def get_inbox_status(self, inbox_id: str) -> Dict:
         """Get current status of a specific inbox"""
@@ -92,61 +132,72 @@ class MailreefClient:
     
     def send_email(self, inbox_id: str, to_email: str, subject: str, 
                    body: str, reply_to: Optional[str] = None) -> Dict:
-        """Send a single email through Mailreef using the direct HTTP API."""
-        
-        # 1. Strip HTML tags for text_body
-        text_body = re.sub('<[^<]+?>', '', body)
-        
-        # 2. Build payload according to Mailreef API documentation
-        payload = {
-            "from": inbox_id,
-            "to": [to_email],  # API expects a list
-            "subject": subject,
-            "text_body": text_body,
-            "html_body": body
-        }
-        
-        # Handle threading if references are provided (usually passed as reply_to in this system)
-        if reply_to:
-            # Based on user-provided doc, 'in_reply_to' is used for threading/reply
-            payload["in_reply_to"] = reply_to
+        """
+        Send a single email through Mailreef using the direct HTTP API.
+
+        429/502/503/504 and connect timeouts are retried with jittered backoff (the
+        message cannot have been accepted). While the circuit breaker is open the
+        call fails fast with CircuitOpenError.
+        """
+        payload = build_send_payload(inbox_id, to_email, subject, body, reply_to)
 
         # 3. Send via API (HTTPS Port 443)
         url = f"{self.base_url}/email"
         logger.debug(f"🚀 [API SEND] Sending email from {inbox_id} to {to_email}...")
         
-        try:
-            response = self.session.post(url, json=payload, timeout=30)
+        for attempt in range(SEND_RETRIES + 1):
+            self.breaker.before_call()
+            try:
+                response = self.session.post(url, json=payload, timeout=30)
+            except requests.exceptions.ConnectTimeout as e:
+                # Never reached the API: safe to retry
+                self.breaker.record_failure(e)
+                if attempt < SEND_RETRIES and self.breaker.state != BREAKER_OPEN:
+                    self._wait_before_retry(attempt, f"connect timeout to {to_email}")
+                    continue
+                raise
+            except Exception as e:
+                # Read timeouts etc. are not retried: the message may already be queued
+                self.breaker.record_failure(e)
+                raise
             
             if response.status_code in [201, 200]:
+                self.breaker.record_success()
                 data = response.json()
                 # DIAGNOSTIC: Log full response if id is missing
-                msg_id = data.get('id') or data.get('message_id') or data.get('data', {}).get('id')
+                msg_id = extract_message_id(data)
                 if not msg_id:
                     self.logger.warning(f"⚠️ [API RESPONSE] Success but no ID found in: {data}")
                 
                 self.logger.debug(f"✅ [API SUCCESS] Message queued as {msg_id}")
                 return {"status": "success", "message_id": msg_id}
+
+            error_msg = error_message(response)
+            error = Exception(f"Mailreef API Error: {error_msg}")
+            error.status_code = response.status_code # Lets the send rate limiter tell throttling from bad recipients
+            if response.status_code == 429 or response.status_code >= 500:
+                self.breaker.record_failure(error)
             else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('message') or error_data.get('error') or response.text
-                except:
-                    error_msg = response.text
-                
-                self.logger.error(f"❌ [API ERROR] Failed to send (HTTP {response.status_code}): {error_msg}")
-                raise Exception(f"Mailreef API Error: {error_msg}")
-                
-        except Exception as e:
-            # Trigger network diagnostics on unexpected errors
-            try:
-                from diagnose_network import run_diagnostics
-                run_diagnostics()
-            except ImportError:
-                pass
-            raise e
+                self.breaker.record_success() # The API is up, it just rejected this message
+            if response.status_code in RETRYABLE_STATUS and attempt < SEND_RETRIES and self.breaker.state != BREAKER_OPEN:
+                self._wait_before_retry(attempt, f"HTTP {response.status_code} for {to_email}", retry_after_seconds(response))
+                continue
+            self.logger.error(f"❌ [API ERROR] Failed to send (HTTP {response.status_code}): {error_msg}")
+            raise error
 
-    
+    def _wait_before_retry(self, attempt: int, reason: str, retry_after: Optional[float] = None):
+        delay = backoff_delay(attempt, retry_after)
+        self.logger.warning(f"⚠️ [API RETRY] {reason}; retry {attempt + 1}/{SEND_RETRIES} in {delay:.1f}s")
+        time.sleep(delay)
+
+    @staticmethod
+    def _run_diagnostics():
+        """Network diagnostics, run in the background once per breaker trip."""
+        try:
+            from diagnose_network import run_diagnostics
+        except ImportError:
+            return
+        run_diagnostics()
     
     def forward_email(self, message_id: str, to_address: str) -> Dict:
         """
@@ -196,19 +247,99 @@ class MailreefClient:
     def get_global_inbound(self, page: int = 1, display: int = 100) -> Dict:
         """Fetch inbound emails across the entire account."""
         try:
-            url = f"{self.base_url}/mail/inbound"
-            params = {"page": page, "display": display}
-            # Add timeout to prevent hanging on network issues
-            response = self.session.get(url, params=params, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"❌ Error fetching global inbound: {response.status_code} - {response.text}")
-                return {"data": [], "total_count": 0}
+            return self._fetch_inbound_page(page, display)
         except Exception as e:
             logger.error(f"❌ Exception in get_global_inbound: {e}")
             return {"data": [], "total_count": 0}
 
+    def _fetch_inbound_page(self, page: int, display: int) -> Dict:
+        """One page of GET /mail/inbound. Raises on failure, unlike get_global_inbound."""
+        url = f"{self.base_url}/mail/inbound"
+        params = {"page": page, "display": display}
+        # Add timeout to prevent hanging on network issues
+        response = self.session.get(url, params=params, timeout=30)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching global inbound: {response.status_code} - {response.text}")
+        return response.json()
+
+    def iter_inbound(self, since_ts: Optional[float] = None, stop_at_id: Optional[str] = None,
+                     consumer: Optional[str] = None, display: int = 100,
+                     max_pages: int = INBOUND_MAX_PAGES) -> Iterator[Dict]:
+        """
+        Yield inbound messages newest-first, downloading only as many pages as needed.
+
+        The scan stops at the first message with ts <= since_ts, at stop_at_id, or
+        at the consumer's saved cursor, whichever comes first. The next page is
+        fetched in the background while the current one is being consumed.
+
+        With a consumer name the cursor moves to the newest message once the scan
+        has run to completion, i.e. reached its stop point or the end of the feed.
+        A caller that breaks out early or raises, or a scan cut off by max_pages,
+        leaves the cursor where it was and sees those messages again next time.
+        API errors are raised, never read as the end of the feed.
+        """
+        cursor_id = stop_at_id
+        cursor_ts = None
+        account = None
+        if consumer:
+            account = _account_key(self)
+            if self.inbound_cursors is None:
+                self.inbound_cursors = InboundCursorStore()
+            saved = self.inbound_cursors.load(account, consumer)
+            if saved:
+                cursor_ts, saved_id = saved
+                cursor_id = cursor_id or saved_id
+
+        def is_stop(msg):
+            ts = msg.get("ts")
+            if cursor_id and (msg.get("id") or msg.get("message_id")) == cursor_id:
+                return True
+            return bool(ts) and ((since_ts is not None and ts <= since_ts) or (cursor_ts is not None and ts < cursor_ts))
+
+        newest = None
+        seen = set()
+        reached = False # Hit since_ts / stop_at_id / the cursor
+        capped = False  # Stopped at max_pages with older unscanned pages left
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inbound-prefetch")
+        try:
+            pending = pool.submit(self._fetch_inbound_page, 1, display)
+            page = 1
+            while pending is not None:
+                batch = pending.result().get("data", [])
+                pending = None
+                # Prefetch only if this page doesn't already end past the stop point
+                full = bool(batch) and len(batch) >= display
+                if full and page < max_pages and not any(is_stop(msg) for msg in batch):
+                    pending = pool.submit(self._fetch_inbound_page, page + 1, display)
+
+                for msg in batch:
+                    msg_id = msg.get("id") or msg.get("message_id")
+                    ts = msg.get("ts")
+                    if is_stop(msg):
+                        reached = True
+                        break
+                    # New mail arriving mid-scan shifts older messages onto the next page
+                    if msg_id is not None:
+                        if msg_id in seen:
+                            continue
+                        seen.add(msg_id)
+                    if newest is None and ts:
+                        newest = (ts, msg_id)
+                    yield msg
+                if reached:
+                    break
+                if pending is None and full:
+                    capped = True
+                    logger.warning(f"⚠️ Inbound scan stopped at the {max_pages}-page cap before reaching its cursor"
+                                   + (f"; cursor for {consumer} left unchanged" if consumer else ""))
+                page += 1
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        # Moving the cursor past a capped scan would skip the pages between the cap and the old cursor for good
+        if consumer and newest and not capped:
+            self.inbound_cursors.save(account, consumer, newest[0], newest[1])
+
     def get_reply_handling(self, inbox_id: str) -> List[Dict]:
         """Check for replies for a specific inbox (LEGACY - use get_global_inbound)"""
         return []
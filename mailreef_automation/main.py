@@ -33,42 +33,61 @@ from mailreef_client import MailreefClient
 from scheduler import EmailScheduler
 from contact_manager import ContactManager
 from monitor import DeliverabilityMonitor
+from mailreef_automation.inbox_registry import get_inbox_registry
 from logger_util import get_logger
 import lock_util
 
 # Configure logging
 logger = get_logger("SYSTEM_MAIN")
 
+def _load_config():
+    class ConfigWrapper:
+        pass
+    
+    cfg = ConfigWrapper()
+    # Loading attributes from automation_config module to cfg object
+    for name in dir(automation_config):
+        if not name.startswith("__"):
+            setattr(cfg, name, getattr(automation_config, name))
+    return cfg
+
 def main():
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("--profile", type=str, default="IVYBOUND", help="Campaign profile (IVYBOUND or STRATEGY_B)")
+    parser.add_argument("--profile", type=str, default="IVYBOUND",
+                        help="Campaign profile (IVYBOUND or STRATEGY_B), or several comma-separated "
+                             "(e.g. IVYBOUND,STRATEGY_B) to host them in one process with shared clients")
     args = parser.parse_args()
     
-    profile_name = args.profile.upper()
+    profile_names = [p.strip().upper() for p in args.profile.split(",") if p.strip()]
+    for profile_name in profile_names:
+        if profile_name not in automation_config.CAMPAIGN_PROFILES:
+            parser.error(f"Unknown profile: {profile_name}")
     
     # --- HARDENING: Configure Profile-Specific Logging ---
-    # We must access config here to get the log file name
-    log_file = automation_config.CAMPAIGN_PROFILES[profile_name].get("log_file", "automation.log")
-    logger = get_logger("SYSTEM_MAIN", log_filename=log_file)
+    # One profile: SYSTEM_MAIN logs to its file. Several: process-wide events go to automation.log
+    # and each profile's own events to its file (see profile_loggers).
+    profile_loggers = {
+        name: get_logger("SYSTEM_MAIN", log_filename=automation_config.CAMPAIGN_PROFILES[name].get("log_file", "automation.log"))
+        for name in profile_names
+    }
+    logger = profile_loggers[profile_names[0]] if len(profile_names) == 1 else get_logger("SYSTEM_MAIN")
     
-    lock_name = f'sender_{profile_name.lower()}'
-
-    # Safety first: Ensure only one instance runs per profile
-    lock_util.ensure_singleton(lock_name)
+    # Safety first: Ensure only one instance runs per profile (also across single- and multi-profile processes)
+    lock_names = []
+    for profile_name in profile_names:
+        lock_name = f'sender_{profile_name.lower()}'
+        lock_util.ensure_singleton(lock_name)
+        lock_names.append(lock_name)
     
+    schedulers, watchers = [], []
     try:
-        logger.info(f"Initializing Mailreef Email Automation System (Profile: {profile_name})")
-        logger.info(f"🔒 [HARDENING] Logging to isolated file: logs/{log_file}")
-        
-        class ConfigWrapper:
-            pass
+        logger.info(f"Initializing Mailreef Email Automation System (Profiles: {', '.join(profile_names)})")
+        for profile_name, profile_logger in profile_loggers.items():
+            log_file = automation_config.CAMPAIGN_PROFILES[profile_name].get("log_file", "automation.log")
+            profile_logger.info(f"🔒 [HARDENING] {profile_name} logging to isolated file: logs/{log_file}")
         
-        cfg = ConfigWrapper()
-        # Loading attributes from automation_config module to cfg object
-        for name in dir(automation_config):
-            if not name.startswith("__"):
-                setattr(cfg, name, getattr(automation_config, name))
+        cfg = _load_config()
                 
         # Check API key
         if not cfg.MAILREEF_API_KEY:
@@ -84,28 +103,43 @@ def main():
         except Exception as e:
             logger.error(f"Error running diagnostics: {e}")
         
+        # --- SHARED CLIENTS ---
+        # Every hosted profile reuses one Mailreef session (and its inbox registry), one Google
+        # auth, one OpenAI client and one suppression store. Partitions and logs stay per profile.
         mailreef = MailreefClient(
             api_key=cfg.MAILREEF_API_KEY,
             base_url=cfg.MAILREEF_API_BASE
         )
+        inbox_registry = get_inbox_registry(mailreef)
+        from suppression_manager import SuppressionManager
+        suppression = SuppressionManager()
+        sheets_client = None
+        openai_client = None
         
-        # Init Scheduler with Sheets
-        try:
-            scheduler = EmailScheduler(
-                mailreef_client=mailreef,
-                config=cfg,
-                campaign_profile=profile_name
-            )
-        except Exception as e:
-            logger.critical(f"Failed to initialize scheduler (likely Sheets Auth error): {e}")
+        # Init Schedulers with Sheets (the first one authenticates; the rest reuse its clients)
+        for profile_name in profile_names:
+            try:
+                scheduler = EmailScheduler(
+                    mailreef_client=mailreef,
+                    config=cfg,
+                    campaign_profile=profile_name,
+                    sheets_client=sheets_client,
+                    openai_client=openai_client,
+                    suppression=suppression
+                )
+            except Exception as e:
+                profile_loggers[profile_name].critical(f"Failed to initialize scheduler for {profile_name} (likely Sheets Auth error): {e}")
+                continue
+            sheets_client = sheets_client or scheduler.sheets.client
+            openai_client = openai_client or scheduler.generator.client
+            schedulers.append(scheduler)
+        if not schedulers:
             return
         
         # --- ZERO-DUPLICATE HYDRATION ---
         try:
-            from suppression_manager import SuppressionManager
-            sm = SuppressionManager()
             logger.info("📡 [NUCLEAR OPTION] Syncing suppression list from Google Sheets...")
-            sm.sync_from_sheets()
+            suppression.sync_from_sheets(client=sheets_client)
         except Exception as e:
             logger.error(f"⚠️ Failed to hydrate suppression list: {e}")
         
@@ -114,7 +148,7 @@ def main():
         # Validate setup
         logger.info("Validating inbox configuration...")
         try:
-            inboxes = mailreef.get_inboxes()
+            inboxes = inbox_registry.inboxes()
             
             if len(inboxes) < cfg.TOTAL_INBOXES:
                 logger.warning(f"Expected {cfg.TOTAL_INBOXES} inboxes, found {len(inboxes)}")
@@ -135,27 +169,34 @@ def main():
             logger.error(f"Failed to fetch inboxes: {e}")
             # Depending on severity, might exit or continue
         
-        # Start the scheduler
-        logger.info("Starting email scheduler...")
-        scheduler.start()
+        # Start the schedulers
+        for scheduler in schedulers:
+            logger.info(f"Starting email scheduler for {scheduler.campaign_profile}...")
+            scheduler.start()
         
         # Start monitoring
         logger.info("Starting deliverability monitoring...")
         monitor.start()
         
-        # Start Reply Watcher (Background Thread)
-        logger.info(f"Starting reply watcher for {profile_name}...")
+        # Start Reply Watchers (Background Threads)
         from reply_watcher import ReplyWatcher
-        watcher = ReplyWatcher(
-            mailreef_client=mailreef,
-            config=cfg,
-            profile_name=profile_name
-        )
         import threading
-        watcher_thread = threading.Thread(target=watcher.run_daemon, daemon=True)
-        watcher_thread.start()
+        for scheduler in schedulers:
+            profile_name = scheduler.campaign_profile
+            logger.info(f"Starting reply watcher for {profile_name}...")
+            watcher = ReplyWatcher(
+                mailreef_client=mailreef,
+                config=cfg,
+                profile_name=profile_name,
+                sheets_client=sheets_client,
+                openai_client=openai_client,
+                lead_sheets=scheduler.sheets # Same input sheet as the scheduler: share its cache and write journal
+            )
+            watchers.append(watcher)
+            watcher_thread = threading.Thread(target=watcher.run_daemon, name=f"reply-watcher-{profile_name.lower()}", daemon=True)
+            watcher_thread.start()
         
-        logger.info(f"Email automation system is now running (Sheets-First Mode: {profile_name})")
+        logger.info(f"Email automation system is now running (Sheets-First Mode: {', '.join(s.campaign_profile for s in schedulers)})")
         
         # Keep the main thread alive
         while True:
@@ -168,16 +209,14 @@ def main():
         import traceback
         logger.error(traceback.format_exc())
     finally:
-        if 'scheduler' in locals(): scheduler.stop()
+        for scheduler in schedulers:
+            scheduler.stop()
         if 'monitor' in locals(): monitor.stop()
-        lock_util.release_lock(lock_name)
-        # Watcher lock is handled by itself if run standalone, but here it's a thread.
-        # Since we use daemon thread, it dies with main.
-        # But we might want to release watcher lock if we acquired it?
-        # ReplyWatcher.__init__ acquires a lock!
-        # We should release it.
-        # watcher.lock_name is available if watcher initialized.
-        if 'watcher' in locals():
+        for lock_name in lock_names:
+            lock_util.release_lock(lock_name)
+        # ReplyWatcher.__init__ acquires a lock per profile; its daemon thread dies with main,
+        # so release the watcher locks here.
+        for watcher in watchers:
             lock_util.release_lock(watcher.lock_name)
 
 if __name__ == "__main__":
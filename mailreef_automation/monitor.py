@@ -7,6 +7,8 @@ import time
 from datetime import datetime
 from threading import Thread
 
+from mailreef_automation.inbox_registry import get_inbox_registry
+
 class DeliverabilityMonitor:
     """Monitors deliverability metrics and adjusts sending"""
     
@@ -54,7 +56,8 @@ class DeliverabilityMonitor:
     def check_all_inboxes(self):
         """Check all inboxes for health issues"""
         try:
-            inboxes = self.mailreef.get_inboxes()
+            # Shared inbox registry: no full domain/mailbox crawl per health check
+            inboxes = get_inbox_registry(self.mailreef).inboxes()
             
             for inbox in inboxes:
                 if not self.is_running: break
@@ -0,0 +1,228 @@
+"""
+Cross-process token-bucket governor for Google Sheets API calls.
+
+Every profile process and one-off script authenticates with the same service
+account, so they share one per-minute read/write quota. Instead of each thread
+discovering that by hitting 429s, every gspread HTTP request takes a token from
+a shared bucket first. Bucket state lives in SQLite so all processes on the
+host see the same budget.
+
+Usage:
+    client = gspread.authorize(creds, http_client=GovernedHTTPClient)
+
+    python mailreef_automation/quota_governor.py   # print current usage
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("QUOTA_GOVERNOR")
+
+DEFAULT_STATE_PATH = os.path.join(ROOT_DIR, "sheets_quota.db")
+
+# Google's default is 60 requests/min/user for each of read and write; stay just under it
+READS_PER_MINUTE = float(os.environ.get("SHEETS_READS_PER_MINUTE", "55"))
+WRITES_PER_MINUTE = float(os.environ.get("SHEETS_WRITES_PER_MINUTE", "55"))
+# How long every process pauses a bucket after Google still answers 429
+THROTTLE_BACKOFF_SECONDS = 30
+
+
+class QuotaGovernor:
+    """
+    Token buckets ("read", "write") whose state is shared through SQLite.
+
+    Each bucket refills continuously at its per-minute rate up to one minute's
+    worth of burst. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, db_path: str = None, reads_per_minute: float = READS_PER_MINUTE,
+                 writes_per_minute: float = WRITES_PER_MINUTE):
+        self.db_path = db_path or DEFAULT_STATE_PATH
+        self.rates = {"read": reads_per_minute, "write": writes_per_minute}
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize the bucket table (one row per bucket)."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    window_start REAL NOT NULL DEFAULT 0,
+                    window_calls INTEGER NOT NULL DEFAULT 0,
+                    total_calls INTEGER NOT NULL DEFAULT 0,
+                    total_wait REAL NOT NULL DEFAULT 0,
+                    last_wait REAL NOT NULL DEFAULT 0,
+                    throttled INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            now = time.time()
+            for name, rate in self.rates.items():
+                conn.execute("INSERT OR IGNORE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                             (name, rate, now))
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize quota governor DB: {e}")
+
+    def _take(self, conn, name: str) -> float:
+        """One attempt at taking a token. Returns 0 on success, else seconds to wait before retrying."""
+        rate = self.rates[name]
+        per_second = rate / 60.0
+        conn.execute("BEGIN IMMEDIATE") # Serializes all processes on this bucket
+        try:
+            tokens, updated_at, blocked_until = conn.execute(
+                "SELECT tokens, updated_at, blocked_until FROM buckets WHERE name = ?", (name,)
+            ).fetchone()
+            now = time.time()
+            if now < blocked_until:
+                conn.execute("COMMIT")
+                return blocked_until - now
+
+            tokens = min(rate, tokens + (now - updated_at) * per_second)
+            if tokens >= 1:
+                conn.execute('''
+                    UPDATE buckets SET tokens = ?, updated_at = ?,
+                        window_calls = CASE WHEN ? - window_start >= 60 THEN 1 ELSE window_calls + 1 END,
+                        window_start = CASE WHEN ? - window_start >= 60 THEN ? ELSE window_start END,
+                        total_calls = total_calls + 1
+                    WHERE name = ?
+                ''', (tokens - 1, now, now, now, now, name))
+                conn.execute("COMMIT")
+                return 0.0
+
+            conn.execute("UPDATE buckets SET tokens = ?, updated_at = ? WHERE name = ?", (tokens, now, name))
+            conn.execute("COMMIT")
+            return (1 - tokens) / per_second
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, name: str = "read") -> float:
+        """Block until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        try:
+            conn = self._connect()
+        except Exception as e:
+            logger.warning(f"⚠️ Quota governor unavailable, proceeding unpaced: {e}")
+            return 0.0
+        try:
+            while True:
+                wait = self._take(conn, name)
+                if wait <= 0:
+                    break
+                if waited == 0:
+                    logger.debug(f"⏳ [QUOTA] Pacing Sheets {name} call for {wait:.1f}s")
+                time.sleep(wait)
+                waited += wait
+            if waited:
+                conn.execute("UPDATE buckets SET total_wait = total_wait + ?, last_wait = ? WHERE name = ?",
+                             (waited, waited, name))
+        except sqlite3.Error as e:
+            # e.g. "database is locked": pacing is best-effort, the Sheets call itself must still go out
+            logger.warning(f"⚠️ Quota governor unavailable, proceeding unpaced: {e}")
+        finally:
+            conn.close()
+        return waited
+
+    def backoff(self, name: str, seconds: float = THROTTLE_BACKOFF_SECONDS) -> bool:
+        """
+        Google still throttled us: pause this bucket for every process and drop its burst.
+
+        Returns False if the pause could not be recorded (callers must then back off themselves).
+        """
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "UPDATE buckets SET blocked_until = MAX(blocked_until, ?), tokens = 0, updated_at = ?, throttled = throttled + 1 WHERE name = ?",
+                    (time.time() + seconds, time.time(), name)
+                )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ [QUOTA] Could not record Sheets {name} backoff: {e}")
+            return False
+        logger.warning(f"⚠️ [QUOTA] Sheets {name} quota hit; pausing all {name} calls for {seconds:.0f}s")
+        return True
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Current usage per bucket: calls this minute, tokens left, wait before the next call, totals."""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT name, tokens, updated_at, blocked_until, window_start, window_calls,
+                   total_calls, total_wait, last_wait, throttled
+            FROM buckets
+        ''').fetchall()
+        conn.close()
+
+        now = time.time()
+        result = {}
+        for name, tokens, updated_at, blocked_until, window_start, window_calls, total_calls, total_wait, last_wait, throttled in rows:
+            rate = self.rates.get(name, 60.0)
+            tokens = min(rate, tokens + (now - updated_at) * rate / 60.0)
+            wait = max(blocked_until - now, 0.0, (1 - tokens) * 60.0 / rate)
+            result[name] = {
+                "limit_per_minute": rate,
+                "calls_this_minute": window_calls if now - window_start < 60 else 0,
+                "tokens_available": round(tokens, 2),
+                "wait_seconds": round(wait, 2),
+                "total_calls": total_calls,
+                "total_wait_seconds": round(total_wait, 2),
+                "last_wait_seconds": round(last_wait, 2),
+                "throttled_count": throttled,
+            }
+        return result
+
+
+_governor = None
+
+
+def get_governor() -> QuotaGovernor:
+    """Process-wide governor instance (state itself is shared across processes)."""
+    global _governor
+    if _governor is None:
+        _governor = QuotaGovernor()
+    return _governor
+
+
+class GovernedHTTPClient(HTTPClient):
+    """gspread HTTP client that takes a read/write token before every request."""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        bucket = "read" if method.upper() == "GET" else "write"
+        get_governor().acquire(bucket)
+        try:
+            return super().request(method, endpoint, *args, **kwargs)
+        except APIError as e:
+            if e.code == 429:
+                # Tells retry_on_quota the shared pause is in place and acquire() will wait it out
+                e.quota_paused = get_governor().backoff(bucket)
+            raise
+
+
+if __name__ == "__main__":
+    for bucket, stats in get_governor().metrics().items():
+        print(f"{bucket.upper()}:")
+        for key, value in stats.items():
+            print(f"  {key}: {value}")
@@ -19,25 +19,47 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from generators.email_generator import EmailGenerator
 from logger_util import get_logger
 from suppression_manager import SuppressionManager
+from followup_index import FollowupIndex
+from send_dispatcher import SendDispatcher
+from lead_prefetch import LeadPrefetcher
+from slot_plan import SlotPlanStore, spread_overdue
+from generation_pipeline import GenerationPipeline
+from mailreef_automation.circuit_breaker import OPEN as BREAKER_OPEN, CircuitOpenError
+from mailreef_automation.send_rate_limiter import get_send_limiter # Package path: one limiter per account across profiles
+from mailreef_automation.inbox_registry import get_inbox_registry # Package path so every caller shares one registry
+
+# Pre-generate emails for upcoming slots instead of generating when the slot fires
+EMAIL_PIPELINE_ENABLED = os.environ.get("EMAIL_PIPELINE", "1") == "1"
+# Overdue slots found at startup are re-timed across this many minutes instead of firing at once
+RESUME_SPREAD_MINUTES = 20
 
 logger = get_logger("SCHEDULER")
 
 class EmailScheduler:
     """Manages the scheduling logic for all email sends"""
     
-    def __init__(self, mailreef_client, config, campaign_profile="IVYBOUND"):
+    def __init__(self, mailreef_client, config, campaign_profile="IVYBOUND", sheets_client=None, openai_client=None,
+                 suppression=None):
         self.mailreef = mailreef_client
         self.config = config
+        # APScheduler only runs the daily 5 AM prepare job; the day's slots go to the dispatcher
         self.scheduler = BackgroundScheduler(timezone=pytz.timezone('US/Eastern'))
+        # The day's slot plan and each slot's fired/sent state survive restarts (see _prepare_daily_queue)
+        self.slot_plan = SlotPlanStore(campaign_profile)
+        self.dispatcher = SendDispatcher(self._execute_slot, timezone='US/Eastern', name=campaign_profile.lower(),
+                                         state_fn=self.slot_plan.mark)
         
         # Cloud-Native: Sheets & Template Integration
+        self.campaign_profile = campaign_profile
         self.profile_config = config.CAMPAIGN_PROFILES[campaign_profile]
         
         # --- LOGGING ISOLATION ---
         log_file = self.profile_config.get("log_file", "automation.log")
         self.logger = get_logger("SCHEDULER", log_file)
         
+        # Shared clients (multi-profile runner): one gspread auth, one OpenAI client, one suppression store
         self.generator = EmailGenerator(
+            client=openai_client,
             templates_dir=self.profile_config.get("templates_dir", "templates"),
             log_file=log_file,
             archetypes=self.profile_config.get("archetypes")
@@ -45,32 +67,42 @@ class EmailScheduler:
         
         # Cloud-Native: Sheets Integration
         profile_config = config.CAMPAIGN_PROFILES[campaign_profile]
-        from sheets_integration import GoogleSheetsClient
-        self.sheets = GoogleSheetsClient(
-            input_sheet_name=profile_config["input_sheet"],
-            replies_sheet_name=profile_config["replies_sheet"]
-        )
+        from sheets_integration import sheets_client_for_profile
+        self.sheets = sheets_client_for_profile(profile_config, client=sheets_client)
         self.sheets.setup_sheets()
         
-        # Local Cache to prevent Sheets API Rate Limits
-        self._lead_cache = []
-        self._followup_cache = {} # inbox_id -> list
-        self._last_cache_update = datetime.min
+        # Local Cache to prevent Sheets API Rate Limits: sized from the send rate, refilled in the background
+        self.prefetch = LeadPrefetcher(
+            fetch_fn=self._fetch_pending_leads,
+            demand_fn=self._stage1_demand_per_minute,
+            window_fn=self._current_window_label,
+            log=self.logger
+        )
+        self._active_inbox_count = getattr(config, "INBOXES_PER_DAY_BUSINESS", 0)
+        # Stage 2: one index for ALL inboxes, rebuilt in a single pass (see _refresh_followup_index_if_needed)
+        self._followup_index = FollowupIndex(days_since_email_1=3)
+        self._followup_lock = threading.Lock()
         self._last_followup_update = datetime.min
-        self.CACHE_TTL = timedelta(minutes=5)
         self.FOLLOWUP_CACHE_TTL = timedelta(minutes=10)
         
-        # Inbox Identity Cache (ID -> Email)
-        self.inbox_map = {} 
-        self._last_inbox_refresh = datetime.min
-        self.INBOX_REFRESH_TTL = timedelta(minutes=60)
+        # Inbox Identity Cache (ID -> Email), shared with the reply watcher and refreshed in the background
+        self.inboxes = get_inbox_registry(mailreef_client)
+        # Account-wide and per-inbox send pacing, shared by every profile on the same API key
+        self.send_limiter = get_send_limiter(mailreef_client)
         
-        # Concurrency Lock
-        self._cache_lock = threading.Lock()
-        
-        self.suppression = SuppressionManager()
+        self.suppression = suppression or SuppressionManager()
         self.is_running = False
         
+        # Generation runs ahead of the dispatcher; slots just take a prepared email and send it
+        self.pipeline = None
+        if EMAIL_PIPELINE_ENABLED:
+            self.pipeline = GenerationPipeline(
+                profile=campaign_profile,
+                upcoming_fn=self.dispatcher.due_within,
+                select_fn=self._select_for_slot,
+                generate_fn=self._generate_email
+            )
+        
     def calculate_daily_send_requirements(self, day_type):
         """Calculate how many emails each inbox should send today"""
         if day_type == "business":
@@ -96,14 +128,11 @@ class EmailScheduler:
         
         # Fetch real inboxes from API
         try:
-            all_inboxes_raw = self.mailreef.get_inboxes()
-            # Sort by ID to ensure consistent rotation order
-            all_inboxes_raw.sort(key=lambda x: x['id'])
-            
+            # Registry list is sorted by ID to ensure consistent rotation order
             # HARDENING: Filter inboxes based on profile indices
             start_idx, end_idx = self.profile_config.get("inbox_indices", (0, 9999))
             # Safety: Ensure indices are within bounds
-            all_inboxes = all_inboxes_raw[start_idx:end_idx]
+            all_inboxes = self.inboxes.partition((start_idx, end_idx))
             
             self.logger.info(f"🛡️ [HARDENING] Inbox partition: Using indices {start_idx}-{end_idx} (Total: {len(all_inboxes)} inboxes)")
             
@@ -142,6 +171,9 @@ class EmailScheduler:
             active_inboxes = all_inboxes
             print("Weekend: All inboxes active")
         
+        # Stage 1 prefetch is sized from today's active inbox count (see _stage1_demand_per_minute)
+        self._active_inbox_count = len(active_inboxes)
+        
         emails_assigned_per_inbox = {}
         for inbox in active_inboxes:
             emails_assigned_per_inbox[inbox['id']] = 0
@@ -194,64 +226,48 @@ class EmailScheduler:
         slots.sort(key=lambda x: x['scheduled_time'])
         return slots
     
-    def _refresh_cache_if_needed(self):
-        """Refresh local lead cache if expired or empty"""
-        with self._cache_lock:
+    def _todays_windows(self):
+        now = datetime.now(pytz.timezone('US/Eastern'))
+        return self.config.WEEKEND_DAY_WINDOWS if now.weekday() in [5, 6] else self.config.BUSINESS_DAY_WINDOWS
+
+    def _current_window_label(self):
+        hour = datetime.now(pytz.timezone('US/Eastern')).hour
+        for window in self._todays_windows():
+            if window["start"] <= hour < window["end"]:
+                return f"{window['start']}:00-{window['end']}:00"
+        return None
+
+    def _stage1_demand_per_minute(self):
+        """Peak slot rate (sends/minute) of the windows overlapping the prefetch horizon"""
+        now = datetime.now(pytz.timezone('US/Eastern'))
+        horizon_end = now + timedelta(minutes=self.prefetch.horizon_minutes)
+        demand = 0.0
+        for window in self._todays_windows():
+            start = now.replace(hour=window["start"], minute=0, second=0, microsecond=0)
+            end = start + timedelta(hours=window["end"] - window["start"])
+            if start < horizon_end and end > now:
+                minutes = (end - start).total_seconds() / 60
+                demand = max(demand, window["emails_per_inbox"] * self._active_inbox_count / minutes)
+        return demand
+
+    def _fetch_pending_leads(self, limit):
+        """Stage 1 refill: `limit` leads plus any still reserved by prepared emails (they remain 'pending' in the sheet)"""
+        reserved = self.pipeline.reserved_count() if self.pipeline else 0
+        return self.sheets.get_pending_leads(limit=limit + reserved)
+
+    def _refresh_followup_index_if_needed(self):
+        """Rebuild the per-sender follow-up heaps for every inbox at once (one pass over the leads)"""
+        with self._followup_lock:
             now = datetime.now()
-            if not self._lead_cache or (now - self._last_cache_update) > self.CACHE_TTL:
-                self.logger.info("🔄 Refreshing Stage 1 lead cache...")
+            # The index covers all inboxes, so one timestamp is the right TTL for all of them
+            if (now - self._last_followup_update) > self.FOLLOWUP_CACHE_TTL:
+                self.logger.info("🔄 Refreshing Stage 2 follow-up index...")
                 try:
-                    # Use sheets_integration's fetch_all_records (which is also cached)
-                    new_batch = self.sheets.get_pending_leads(limit=50) 
-                    
-                    if new_batch:
-                        self._lead_cache = new_batch
-                        self._last_cache_update = now
-                        self.logger.info(f"✅ Cached {len(new_batch)} fresh Stage 1 leads.")
-                    else:
-                        self.logger.warning("⚠️ No pending Stage 1 leads found!")
+                    indexed = self._followup_index.rebuild(self.sheets.get_followup_candidates())
+                    self._last_followup_update = now
+                    self.logger.debug(f"✅ Indexed {indexed} Email 1 recipients for follow-up")
                 except Exception as e:
-                    # Log only the first line of the error to avoid 429 flood noise
-                    self.logger.error(f"❌ Lead cache refresh failed: {str(e).splitlines()[0]}")
-
-    def _refresh_followup_cache_if_needed(self, sender_email, inbox_id):
-        """Refresh local follow-up cache for a specific sender"""
-        now = datetime.now()
-        last_update = self._last_followup_update
-        
-        # Check if we need to refresh (global TTL for now for simplicity, or per-sender if needed)
-        # Using inbox_id as key for easier direct lookup
-        if inbox_id not in self._followup_cache or (now - last_update) > self.FOLLOWUP_CACHE_TTL:
-            self.logger.info(f"🔄 Refreshing Stage 2 cache for {sender_email}...")
-            try:
-                new_batch = self.sheets.get_leads_for_followup(sender_email=sender_email, limit=20)
-                self._followup_cache[inbox_id] = new_batch
-                self._last_followup_update = now
-                self.logger.debug(f"✅ Cached {len(new_batch)} follow-ups for {sender_email}")
-            except Exception as e:
-                self.logger.error(f"❌ Follow-up cache refresh failed for {sender_email}: {str(e).splitlines()[0]}")
-
-    def _refresh_inbox_map_if_needed(self):
-        """Refresh the ID->Email map for sign-offs"""
-        now = datetime.now()
-        if not self.inbox_map or (now - self._last_inbox_refresh) > self.INBOX_REFRESH_TTL:
-            try:
-                self.logger.info("REFRESHING inbox identity map...")
-                inboxes = self.mailreef.get_inboxes()
-                new_map = {}
-                for ibx in inboxes:
-                    # differnet schemas/fields sometimes
-                    email = ibx.get('email') or ibx.get('address')
-                    if email:
-                        new_map[str(ibx['id'])] = email
-                
-                if new_map:
-                    self.inbox_map = new_map
-                    self._last_inbox_refresh = now
-                    self.logger.info(f"✅ Cached {len(new_map)} inbox identities.")
-                    self.logger.info(f"🔍 DEBUG INBOX MAP: {self.inbox_map}")
-            except Exception as e:
-                self.logger.error(f"Failed to refresh inbox map: {e}")
+                    self.logger.error(f"❌ Follow-up index refresh failed: {str(e).splitlines()[0]}")
 
     def select_prospects_for_send(self, inbox_id, count, sequence_stage):
         """Select prospects for a specific send slot (Sheets-First)"""
@@ -260,29 +276,22 @@ class EmailScheduler:
         # Must find a lead that was sent Email 1 by THIS inbox
         if sequence_stage == 2:
             try:
-                # Optimized: If inbox_id looks like an email, use it directly
-                inbox_email = str(inbox_id) if '@' in str(inbox_id) else None
-                
-                if not inbox_email:
-                    # Resolve ID to email
-                    inboxes = self.mailreef.get_inboxes()
-                    for ibx in inboxes:
-                        if str(ibx.get('id')) == str(inbox_id):
-                            inbox_email = ibx.get('email') or ibx.get('address')
-                            break
+                # Resolve ID to email from the registry (inbox_id may already be an email)
+                inbox_email = self.inboxes.email_for(inbox_id)
                 
                 if inbox_email:
-                    self._refresh_followup_cache_if_needed(inbox_email, inbox_id)
+                    self._refresh_followup_index_if_needed()
                     
-                    # Pop from follow-up cache with suppression check
-                    if self._followup_cache.get(inbox_id):
-                        while self._followup_cache[inbox_id]:
-                            candidate = self._followup_cache[inbox_id].pop(0)
-                            if not self.suppression.is_suppressed(candidate.get('email')):
-                                return [candidate]
-                            self.logger.warning(f"🚫 [SELECTION] Skipping suppressed follow-up: {candidate.get('email')}")
-                        return []
-                    return []
+                    # Pop the earliest-due follow-up for this sender, with suppression check
+                    while True:
+                        candidate = self._followup_index.pop_due(inbox_email)
+                        if candidate is None:
+                            return []
+                        if self._is_reserved(candidate.get('email')):
+                            continue
+                        if not self.suppression.is_suppressed(candidate.get('email')):
+                            return self.sheets.hydrate_leads([candidate])
+                        self.logger.warning(f"🚫 [SELECTION] Skipping suppressed follow-up: {candidate.get('email')}")
                 else:
                     self.logger.warning(f"Could not resolve email for inbox ID {inbox_id}")
                     return []
@@ -292,101 +301,114 @@ class EmailScheduler:
 
         # Stage 1: New Leads (Use Cache)
         if sequence_stage == 1:
-            self._refresh_cache_if_needed()
+            # Pop from cache with suppression check (refills itself ahead of demand)
+            def accept(candidate):
+                if self._is_reserved(candidate.get('email', '')):
+                    return False
+                if self.suppression.is_suppressed(candidate.get('email', '')):
+                    self.logger.warning(f"🚫 [SELECTION] Skipping suppressed lead: {candidate.get('email')}")
+                    return False
+                return True
             
-            # Pop from cache with suppression check
-            selected = []
-            with self._cache_lock:
-                while len(selected) < count and self._lead_cache:
-                    candidate = self._lead_cache.pop(0)
-                    if not self.suppression.is_suppressed(candidate.get('email', '')):
-                        selected.append(candidate)
-                    else:
-                        self.logger.warning(f"🚫 [SELECTION] Skipping suppressed lead: {candidate.get('email')}")
-            
-            return selected
+            return self.prefetch.take(count, accept)
             
         return []
     
+    def _is_reserved(self, email):
+        """True if the generation pipeline already holds a prepared email for this lead"""
+        return bool(self.pipeline) and self.pipeline.is_reserved(email)
+
+    def _resolve_sender_email(self, inbox_id):
+        """Resolve sender email for dynamic sign-off"""
+        # If inbox_id LOOKS like an email the registry returns it directly; otherwise it uses the map
+        return self.inboxes.email_for(inbox_id) or "unknown"
+
+    def _generate_email(self, inbox_id, prospect, sequence_number=1):
+        """Generate the personalized email for one prospect (website scrape + LLM)"""
+        sender_email = self._resolve_sender_email(inbox_id)
+        self.logger.info(f"🔍 DEBUG LOOKUP: ID={inbox_id} -> Sender: {sender_email}")
+
+        # Use High-Fidelity Generator
+        self.logger.info(f"🚀 [GENERATE] Generating personalized email for {prospect.get('email')} using sender {sender_email}...")
+        
+        # Note: Sheets Row provides 'school_name', 'domain', 'first_name', 'role', etc.
+        result = self.generator.generate_email(
+            campaign_type=self.profile_config.get("campaign_type", "school"),
+            sequence_number=sequence_number,
+            lead_data=dict(prospect),
+            enrichment_data={}, # Scrapes live
+            sender_email=sender_email
+        )
+        return {"subject": result['subject'], "body": result['body'], "sender_email": sender_email}
+
+    def _send_prepared(self, inbox_id, prospect, sequence_number, subject, body_text, sender_email):
+        """Send an already generated email and record it (suppression + sheet status)"""
+        # Mailreef is down (circuit open): fail fast and keep the lead sendable
+        breaker = getattr(self.mailreef, "breaker", None)
+        if breaker is not None and breaker.state == BREAKER_OPEN:
+            raise CircuitOpenError(f"Mailreef circuit open, not sending to {prospect['email']}")
+
+        body_html = body_text.replace('\n', '<br>')
+        
+        # VERBOSE LOGGING FOR USER VISIBILITY (Consolidated to prevent interleaving)
+        log_msg = [
+            f"📧 [EMAIL CONTENT] To: {prospect['email']}",
+            f"Subject: {subject}",
+            f"--- BODY START ---",
+            body_text,
+            f"--- BODY END ---"
+        ]
+        self.logger.info("\n".join(log_msg))
+        
+        # --- NUCLEAR OPTION: LOCK-BEFORE-SEND ---
+        # Record in suppression BEFORE the API call.
+        # This ensures literal ZERO chance of retry if the API call hangs or crashes.
+        # acquire_lock never overwrites an existing entry (another campaign's, SHEETS_SYNC's), and
+        # tells us whether this call owns the row, i.e. whether it may be undone below.
+        campaign = self.profile_config.get("log_file", "unknown")
+        locked_here = self.suppression.acquire_lock(prospect["email"], campaign)
+
+        try:
+            response = self.send_limiter.send(inbox_id, lambda: self.mailreef.send_email(
+                inbox_id=inbox_id,
+                to_email=prospect["email"],
+                subject=subject,
+                body=f"<html><body>{body_html}</body></html>"
+            ))
+        except CircuitOpenError:
+            # The breaker opened while we queued: the API was never called, so our lock can go
+            if locked_here:
+                self.suppression.remove_from_suppression(prospect["email"], campaign)
+            raise
+        
+        self.logger.info(f"✅ [SEND SUCCESS] Email sent to {prospect['email']} via inbox {inbox_id}. MsgID: {response.get('message_id')}")
+        
+        # Sheets-First: Update Status Immediately (sender_email records who sent it, for Stage 2)
+        status = f"email_{sequence_number}_sent"
+        self.sheets.update_lead_status(
+            email=prospect["email"],
+            status=status,
+            sent_at=datetime.now(),
+            sender_email=sender_email,
+            row=prospect.get('_row'), # CRITICAL FIX: Pass exact row to prevent duplicate loop
+            shard=prospect.get('_shard') # (shard, row) address when the profile is sharded
+        )
+        
+        return {
+            "email": prospect["email"],
+            "status": "sent",
+            "mailreef_message_id": response.get("message_id")
+        }
+
     def execute_send(self, inbox_id, prospects, sequence_number=1):
-        """Execute the actual send via Mailreef API"""
+        """Generate and send inline via Mailreef API (fallback when no prepared email is ready)"""
         results = []
         for prospect in prospects:
             try:
-                # Resolve sender email for dynamic sign-off
-                # Logic Update: If inbox_id LOOKS like an email, use it directly. 
-                # Otherwise, try the map.
-                if "@" in str(inbox_id):
-                    sender_email = str(inbox_id)
-                else:
-                    self._refresh_inbox_map_if_needed()
-                    sender_email = self.inbox_map.get(str(inbox_id), "unknown")
-                
-                self.logger.info(f"🔍 DEBUG LOOKUP: ID={inbox_id} -> Sender: {sender_email}")
-
-                # Use High-Fidelity Generator
-                self.logger.info(f"🚀 [SEND START] Generating personalized email for {prospect.get('email')} using sender {sender_email}...")
-                
-                # Note: Sheets Row provides 'school_name', 'domain', 'first_name', 'role', etc.
-                result = self.generator.generate_email(
-                    campaign_type=self.profile_config.get("campaign_type", "school"),
-                    sequence_number=sequence_number,
-                    lead_data=dict(prospect),
-                    enrichment_data={}, # Scrapes live
-                    sender_email=sender_email
-                )
-                
-                subject = result['subject']
-                body_text = result['body']
-                body_html = body_text.replace('\n', '<br>')
-                
-                # VERBOSE LOGGING FOR USER VISIBILITY (Consolidated to prevent interleaving)
-                log_msg = [
-                    f"📧 [EMAIL CONTENT] To: {prospect['email']}",
-                    f"Subject: {subject}",
-                    f"--- BODY START ---",
-                    body_text,
-                    f"--- BODY END ---"
-                ]
-                self.logger.info("\n".join(log_msg))
-                
-                # --- NUCLEAR OPTION: LOCK-BEFORE-SEND ---
-                # Record in suppression BEFORE the API call.
-                # This ensures literal ZERO chance of retry if the API call hangs or crashes.
-                self.suppression.add_to_suppression(prospect["email"], self.profile_config.get("log_file", "unknown"))
-
-                response = self.mailreef.send_email(
-                    inbox_id=inbox_id,
-                    to_email=prospect["email"],
-                    subject=subject,
-                    body=f"<html><body>{body_html}</body></html>"
-                )
-                
-                self.logger.info(f"✅ [SEND SUCCESS] Email sent to {prospect['email']} via inbox {inbox_id}. MsgID: {response.get('message_id')}")
-                
-                # Sheets-First: Update Status Immediately
-                # We need the sender email to record who sent it
-                # We can perform a lookup or pass it if available.
-                # Optimization: get email from result/response or lookup?
-                # Mailreef API response might contain 'from'? Probably not.
-                # Let's resolve specific sender email again or assume rotation logic valid.
-                
-                # Match logic moved up (sender_email already resolved)
-
-                status = f"email_{sequence_number}_sent"
-                self.sheets.update_lead_status(
-                    email=prospect["email"],
-                    status=status,
-                    sent_at=datetime.now(),
-                    sender_email=sender_email,
-                    row=prospect.get('_row') # CRITICAL FIX: Pass exact row to prevent duplicate loop
-                )
-                
-                results.append({
-                    "email": prospect["email"],
-                    "status": "sent",
-                    "mailreef_message_id": response.get("message_id")
-                })
+                email = self._generate_email(inbox_id, prospect, sequence_number)
+                results.append(self._send_prepared(
+                    inbox_id, prospect, sequence_number, email['subject'], email['body'], email['sender_email']
+                ))
             except Exception as e:
                 # Log failure
                 self.logger.error(f"❌ [SEND FAILURE] Failed to send to {prospect.get('email')}: {e}")
@@ -399,6 +421,9 @@ class EmailScheduler:
         """Start the scheduler"""
         if not self.is_running:
             self.scheduler.start()
+            self.dispatcher.start()
+            if self.pipeline:
+                self.pipeline.start()
             self.is_running = True
             self.logger.info("🚀 Email Scheduler Started (EST Timezone)")
             self._schedule_daily_runs()
@@ -410,7 +435,12 @@ class EmailScheduler:
     def stop(self):
         """Stop the scheduler"""
         self.scheduler.shutdown()
+        self.dispatcher.stop()
+        if self.pipeline:
+            self.pipeline.stop()
         self.is_running = False
+        # Flush any write-behind status updates before the process exits
+        self.sheets.close()
         print("Scheduler stopped")
     
     def _schedule_daily_runs(self):
@@ -424,10 +454,21 @@ class EmailScheduler:
         )
         print("Daily preparation job scheduled for 5:00 AM EST")
     
-    def _prepare_daily_queue(self):
-        """Prepare and queue all sends for the day"""
+    def _prepare_daily_queue(self, force=False):
+        """Prepare and queue all sends for the day (resumes today's persisted plan after a restart)"""
         self.logger.info("📅 Starting daily queue preparation...")
         now = datetime.now(pytz.timezone('US/Eastern'))
+        plan_date = now.strftime("%Y-%m-%d")
+        
+        if not force and self.slot_plan.has_plan(plan_date):
+            # --- RESTART RECOVERY ---
+            # Today's plan already exists: no new random slots, no inbox crawl, only what has not fired yet
+            counts = self.slot_plan.counts(plan_date)
+            self.logger.info(f"♻️ Resuming today's slot plan: {counts}")
+            self._active_inbox_count = self.slot_plan.inbox_count(plan_date) or self._active_inbox_count
+            self._queue_pending_slots(plan_date, now)
+            return
+        
         day_of_week = now.weekday()
         
         if day_of_week in [5, 6]:  # Weekend
@@ -440,54 +481,96 @@ class EmailScheduler:
         # Generate slots
         slots = self.generate_send_slots(day_type, inbox_count)
         self.logger.info(f"🎯 Generated {len(slots)} send slots for today ({day_type}).")
+        if not slots:
+            # Inbox fetch failed: keep any existing plan rather than persisting an empty day
+            return
+        self.slot_plan.save_plan(plan_date, slots)
+        self._queue_pending_slots(plan_date, now)
+    
+    def _queue_pending_slots(self, plan_date, now):
+        """Load the plan's pending slots into the dispatcher"""
+        # Slots already overdue (restart, or a window that started before the plan) are spread over the
+        # next minutes instead of firing as one catch-up burst; hopelessly late ones are marked missed.
+        schedule, rescheduled, missed = spread_overdue(
+            self.slot_plan.pending(plan_date), now, self.dispatcher.misfire_grace, RESUME_SPREAD_MINUTES
+        )
+        if rescheduled:
+            self.slot_plan.reschedule(rescheduled)
+            self.logger.info(f"🕒 Spread {len(rescheduled)} overdue slots over the next {RESUME_SPREAD_MINUTES} min.")
+        if missed:
+            self.slot_plan.mark_many(missed, "missed")
+            self.logger.warning(f"⏭️ Marked {len(missed)} slots as missed (more than {self.dispatcher.misfire_grace // 60} min late).")
         
-        # Schedule each slot
-        for slot in slots:
-            self.scheduler.add_job(
-                self._execute_slot,
-                'date',
-                run_date=slot["scheduled_time"],
-                args=[slot["inbox_id"], slot["scheduled_time"]],
-                id=f'slot_{slot["inbox_id"]}_{slot["scheduled_time"].strftime("%Y%m%d%H%M%S")}_{random.randint(1000,9999)}',
-                misfire_grace_time=3600 # Allow catchup if system was briefly down
-            )
+        # Queue each slot on the dispatcher (one heap entry per slot, not one APScheduler job).
+        # Today's slots replace anything still queued, so a re-prepare never doubles up the day.
+        dropped = self.dispatcher.clear()
+        if dropped:
+            self.logger.info(f"♻️ Replacing {dropped} previously queued slots.")
+        eastern = pytz.timezone('US/Eastern')
+        self.dispatcher.schedule((when.astimezone(eastern), inbox_id, slot_id) for slot_id, inbox_id, when in schedule)
         
         # Log upcoming sends for peace of mind
         self.log_upcoming_sends(limit=5)
     
-    def _execute_slot(self, inbox_id, scheduled_time):
-        """Execute a single send slot with sequence prioritization"""
+    def _select_for_slot(self, inbox_id):
+        """Pick the prospect for one slot of this inbox: (prospect, stage) or (None, None)"""
         # Prioritize Follow-ups (Stage 2) first
         prospects = self.select_prospects_for_send(inbox_id, count=1, sequence_stage=2)
-        stage = 2
-        
-        if not prospects:
-            # If no follow-ups due, pick a new Stage 1 lead
-            prospects = self.select_prospects_for_send(inbox_id, count=1, sequence_stage=1)
-            stage = 1
-        
         if prospects:
-            self.logger.info(f"⏰ [SLOT FIRE] Executing Stage {stage} send for {prospects[0].get('email')} from inbox {inbox_id}")
-            self.execute_send(inbox_id, prospects, sequence_number=stage)
-        else:
-             # self.logger.debug(f"🔇 [SLOT FIRE] No prospects (Stage 1 or 2) found for inbox {inbox_id} at {scheduled_time}")
-             pass
+            return prospects[0], 2
+        # If no follow-ups due, pick a new Stage 1 lead
+        prospects = self.select_prospects_for_send(inbox_id, count=1, sequence_stage=1)
+        if prospects:
+            return prospects[0], 1
+        return None, None
+
+    def _execute_slot(self, inbox_id, scheduled_time):
+        """Execute a single send slot with sequence prioritization. Returns the slot's outcome for the slot plan"""
+        # Fast path: the pipeline already generated this slot's email (waits briefly if it is in progress)
+        prepared = self.pipeline.take(inbox_id) if self.pipeline else None
+        if prepared:
+            prospect = prepared['lead']
+            try:
+                if self.suppression.is_suppressed(prospect.get('email', '')):
+                    # Replied, bounced or sent elsewhere while the email sat in the queue: the slot still sends below
+                    self.logger.warning(f"🚫 [SLOT FIRE] Discarding prepared email for suppressed lead: {prospect.get('email')}")
+                else:
+                    stage = prepared['sequence_number']
+                    self.logger.info(f"⏰ [SLOT FIRE] Sending prepared Stage {stage} email to {prospect.get('email')} from inbox {inbox_id}")
+                    try:
+                        self._send_prepared(inbox_id, prospect, stage, prepared['subject'], prepared['body'],
+                                            prepared['sender_email'] or self._resolve_sender_email(inbox_id))
+                    except Exception as e:
+                        self.logger.error(f"❌ [SEND FAILURE] Failed to send to {prospect.get('email')}: {e}")
+                        return "failed"
+                    return "sent"
+            finally:
+                # Sent leads are suppressed by now, so selection can no longer pick them
+                self.pipeline.release(prospect.get('email'))
+        
+        # Slow path: nothing prepared in time (or it was discarded), generate inline
+        prospect, stage = self._select_for_slot(inbox_id)
+        if prospect:
+            self.logger.info(f"⏰ [SLOT FIRE] Executing Stage {stage} send for {prospect.get('email')} from inbox {inbox_id}")
+            return "sent" if self.execute_send(inbox_id, [prospect], sequence_number=stage) else "failed"
+        # self.logger.debug(f"🔇 [SLOT FIRE] No prospects (Stage 1 or 2) found for inbox {inbox_id} at {scheduled_time}")
+        return "no_prospect"
 
     def log_upcoming_sends(self, limit=5):
         """Prints the next N scheduled sends to the log for visibility."""
-        jobs = self.scheduler.get_jobs()
-        # Filter for slot jobs and sort by next_run_time
-        slot_jobs = [j for j in jobs if j.id.startswith('slot_')]
-        slot_jobs.sort(key=lambda x: x.next_run_time)
+        upcoming = self.dispatcher.upcoming(limit)
         
-        if not slot_jobs:
+        if not upcoming:
             self.logger.info("📅 No upcoming send slots found in queue.")
             return
 
-        self.logger.info(f"📅 UPCOMING SENDS (Next {min(len(slot_jobs), limit)}):")
-        for i, job in enumerate(slot_jobs[:limit]):
-            run_time = job.next_run_time.strftime("%I:%M:%S %p %Z")
-            # Extract inbox from ID (format: slot_EMAIL_TIMESTAMP_RANDOM)
-            parts = job.id.split('_')
-            inbox = parts[1] if len(parts) > 1 else "unknown"
+        metrics = self.dispatcher.metrics()
+        rate = self.send_limiter.metrics()
+        breaker = getattr(self.mailreef, "breaker", None)
+        self.logger.info(f"🚦 Send rate: {rate['account_rate_per_minute']}/min effective "
+                         f"(ceiling {rate['account_ceiling_per_minute']}/min, {rate['inbox_ceiling_per_minute']}/min per inbox)"
+                         + (f", circuit {breaker.state}" if breaker is not None else ""))
+        self.logger.info(f"📅 UPCOMING SENDS (Next {len(upcoming)} of {metrics['queue_depth']}):")
+        for i, (scheduled_time, inbox) in enumerate(upcoming):
+            run_time = scheduled_time.strftime("%I:%M:%S %p %Z")
             self.logger.info(f"   {i+1}. 🕒 {run_time} -> {inbox}")
@@ -0,0 +1,215 @@
+"""
+In-process send dispatcher for the day's send slots.
+
+Instead of registering one APScheduler 'date' job per slot (thousands a day
+per profile), the day's slots sit in a single min-heap ordered by scheduled
+time. One dispatcher thread sleeps until the earliest slot is due and hands it
+to a small worker pool. Slots that are more than misfire_grace seconds late
+(e.g. the process was down) are skipped, matching the old job settings.
+
+Slots may carry a slot_id; state_fn(slot_id, state) then records each one as
+'fired', 'missed', 'failed' or whatever fire_fn returns (see slot_plan.py).
+
+Metrics: queue depth, in-flight slots, lag behind schedule and fire rate.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("SEND_DISPATCHER")
+
+DISPATCH_WORKERS = int(os.environ.get("SEND_DISPATCH_WORKERS", "10"))
+MISFIRE_GRACE_SECONDS = 3600 # Allow catchup if system was briefly down
+METRICS_LOG_INTERVAL_SECONDS = 900
+FIRE_RATE_WINDOW_SECONDS = 300
+
+
+class SendDispatcher:
+    """
+    Priority queue of (scheduled_time, inbox_id) slots fired by a worker pool.
+
+    fire_fn(inbox_id, scheduled_time) is called for every slot at (or just after) its time.
+    """
+
+    def __init__(self, fire_fn: Callable[[Any, datetime], Optional[str]], workers: int = DISPATCH_WORKERS,
+                 misfire_grace: int = MISFIRE_GRACE_SECONDS, timezone: str = 'US/Eastern', name: str = "default",
+                 state_fn: Optional[Callable[[Any, str], None]] = None):
+        self.fire_fn = fire_fn
+        self.state_fn = state_fn
+        self.workers = workers
+        self.misfire_grace = misfire_grace
+        self.tz = pytz.timezone(timezone)
+        self.name = name
+
+        self._heap: List[Tuple[datetime, int, Any, Any]] = []
+        self._seq = itertools.count() # FIFO among slots with the same time
+        self._cond = threading.Condition()
+        self._pool = None
+        self._thread = None
+        self._stopped = False
+
+        # --- METRICS ---
+        self._in_flight = 0
+        self._fired = 0
+        self._missed = 0
+        self._failed = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._last_lag = 0.0
+        self._recent_fires = deque()
+        self._last_metrics_log = time.monotonic()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"send-{self.name}")
+        self._thread = threading.Thread(target=self._dispatch_loop, name=f"send-dispatcher-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"🚀 Send dispatcher started ({self.workers} workers)")
+
+    def stop(self, wait: bool = True):
+        """Stop firing new slots; optionally wait for in-flight sends to finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def _aware(self, when: datetime) -> datetime:
+        return self.tz.localize(when) if when.tzinfo is None else when
+
+    def schedule(self, slots: Iterable[Tuple]) -> int:
+        """Queue (scheduled_time, inbox_id) or (scheduled_time, inbox_id, slot_id) tuples. Returns the number added."""
+        added = 0
+        with self._cond:
+            for scheduled_time, inbox_id, *slot_id in slots:
+                heapq.heappush(self._heap, (self._aware(scheduled_time), next(self._seq), inbox_id, slot_id[0] if slot_id else None))
+                added += 1
+            self._cond.notify_all()
+        return added
+
+    def clear(self) -> int:
+        """Drop every queued (not yet fired) slot. Returns how many were dropped."""
+        with self._cond:
+            dropped = len(self._heap)
+            self._heap = []
+            self._cond.notify_all()
+        return dropped
+
+    def upcoming(self, limit: int = 5) -> List[Tuple[datetime, Any]]:
+        with self._cond:
+            return [(when, inbox_id) for when, _, inbox_id, _ in heapq.nsmallest(limit, self._heap)]
+
+    def due_within(self, seconds: float) -> List[Tuple[datetime, Any]]:
+        """Queued slots due in the next `seconds` (including overdue ones), earliest first."""
+        horizon = self._now().timestamp() + seconds
+        with self._cond:
+            due = [(when, inbox_id) for when, _, inbox_id, _ in self._heap if when.timestamp() <= horizon]
+        due.sort(key=lambda slot: slot[0])
+        return due
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap:
+                        wait = (self._heap[0][0] - self._now()).total_seconds()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(timeout=min(wait, 60))
+                    else:
+                        self._cond.wait(timeout=60)
+                    self._maybe_log_metrics()
+                if self._stopped:
+                    return
+                scheduled_time, _, inbox_id, slot_id = heapq.heappop(self._heap)
+
+            lag = (self._now() - scheduled_time).total_seconds()
+            if lag > self.misfire_grace:
+                self._missed += 1
+                self._set_state(slot_id, "missed")
+                logger.warning(f"⏭️ [DISPATCH] Skipping slot for inbox {inbox_id} at {scheduled_time:%H:%M:%S}: {lag / 60:.0f} min late")
+                continue
+
+            with self._cond:
+                self._in_flight += 1
+            self._pool.submit(self._run_slot, inbox_id, scheduled_time, slot_id)
+
+    def _set_state(self, slot_id, state: str):
+        if self.state_fn and slot_id is not None:
+            self.state_fn(slot_id, state)
+
+    def _run_slot(self, inbox_id, scheduled_time, slot_id=None):
+        # Lag is measured when a worker picks the slot up, so a saturated pool shows up as lag
+        self._record_fire((self._now() - scheduled_time).total_seconds())
+        # Recorded before sending: a slot interrupted mid-send is never replayed after a restart
+        self._set_state(slot_id, "fired")
+        try:
+            result = self.fire_fn(inbox_id, scheduled_time)
+            self._set_state(slot_id, result if isinstance(result, str) else "done")
+        except Exception as e:
+            with self._cond:
+                self._failed += 1
+            self._set_state(slot_id, "failed")
+            logger.error(f"❌ [DISPATCH] Slot for inbox {inbox_id} failed: {str(e).splitlines()[0]}")
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+
+    def _record_fire(self, lag: float):
+        now = time.monotonic()
+        with self._cond:
+            self._fired += 1
+            self._last_lag = max(lag, 0.0)
+            self._lag_total += self._last_lag
+            self._lag_max = max(self._lag_max, self._last_lag)
+            self._recent_fires.append(now)
+            while self._recent_fires and now - self._recent_fires[0] > FIRE_RATE_WINDOW_SECONDS:
+                self._recent_fires.popleft()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, in-flight sends, lag behind schedule and fire rate (slots/minute over the last 5 min)."""
+        now = time.monotonic()
+        with self._cond:
+            while self._recent_fires and now - self._recent_fires[0] > FIRE_RATE_WINDOW_SECONDS:
+                self._recent_fires.popleft()
+            next_due = self._heap[0][0] if self._heap else None
+            return {
+                "queue_depth": len(self._heap),
+                "in_flight": self._in_flight,
+                "fired": self._fired,
+                "missed": self._missed,
+                "failed": self._failed,
+                "last_lag_seconds": round(self._last_lag, 2),
+                "avg_lag_seconds": round(self._lag_total / self._fired, 2) if self._fired else 0.0,
+                "max_lag_seconds": round(self._lag_max, 2),
+                "fire_rate_per_minute": round(len(self._recent_fires) * 60 / FIRE_RATE_WINDOW_SECONDS, 2),
+                "next_due": next_due.isoformat() if next_due else None,
+            }
+
+    def _maybe_log_metrics(self):
+        # Called with the condition held
+        if time.monotonic() - self._last_metrics_log < METRICS_LOG_INTERVAL_SECONDS:
+            return
+        self._last_metrics_log = time.monotonic()
+        logger.info(f"📊 [DISPATCH] depth={len(self._heap)} in_flight={self._in_flight} fired={self._fired} "
+                    f"missed={self._missed} last_lag={self._last_lag:.1f}s max_lag={self._lag_max:.1f}s")
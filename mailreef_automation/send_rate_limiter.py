@@ -0,0 +1,218 @@
+"""
+Adaptive pacing for Mailreef sends.
+
+Slots are jittered, but nothing stopped several of them (across inboxes and,
+with the multi-profile runner, across profiles) from hitting the send API in
+the same second. SendRateLimiter sits between the scheduler and
+MailreefClient.send_email and enforces two token buckets per send:
+
+- account-wide: MAILREEF_SENDS_PER_MINUTE for every inbox on the API key
+- per inbox:    INBOX_SENDS_PER_MINUTE for each sending inbox
+
+Both rates adapt (AIMD): a throttling error (HTTP 429/5xx, network failure)
+halves the rate, a latency spike cuts it by a fifth, and every clean send
+climbs back toward the configured ceiling. A rejected recipient (other 4xx)
+leaves the rates alone. metrics() exposes the effective
+rate, i.e. the real ceiling right now, next to the configured one.
+
+One limiter exists per API account and process (see get_send_limiter).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from mailreef_automation.circuit_breaker import CircuitOpenError
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("SEND_RATE_LIMITER")
+
+ACCOUNT_SENDS_PER_MINUTE = float(os.environ.get("MAILREEF_SENDS_PER_MINUTE", "60"))
+INBOX_SENDS_PER_MINUTE = float(os.environ.get("INBOX_SENDS_PER_MINUTE", "2"))
+# A send slower than this (or 3x the running average) counts as a latency spike
+LATENCY_SPIKE_SECONDS = float(os.environ.get("MAILREEF_LATENCY_SPIKE_SECONDS", "10"))
+LATENCY_SPIKE_FACTOR = 3.0
+# ...but a fast API jittering between 0.1s and 0.4s is not a spike
+LATENCY_SPIKE_MIN_SECONDS = 2.0
+ERROR_DECREASE = 0.5
+LATENCY_DECREASE = 0.8
+# Clean sends needed to climb from the floor back to the ceiling
+RECOVERY_SENDS = 50
+MIN_RATE_FRACTION = 0.05
+# Concurrent failures from one incident only cut the rate once
+DECREASE_COOLDOWN_SECONDS = 10
+LATENCY_EWMA_ALPHA = 0.2
+LATENCY_WARMUP_SAMPLES = 5
+
+
+class _Bucket:
+    """Token bucket with a burst of one and an adjustable rate (sends per minute)."""
+
+    def __init__(self, ceiling: float):
+        self.ceiling = ceiling
+        self.rate = ceiling
+        self.tokens = 1.0
+        self.updated_at = time.monotonic()
+        self.decreased_at = 0.0
+
+    def wait_time(self, now: float) -> float:
+        self.tokens = min(1.0, self.tokens + (now - self.updated_at) * self.rate / 60.0)
+        self.updated_at = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) * 60.0 / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def decrease(self, factor: float, now: float) -> bool:
+        if now - self.decreased_at < DECREASE_COOLDOWN_SECONDS:
+            return False
+        self.decreased_at = now
+        self.rate = max(self.ceiling * MIN_RATE_FRACTION, self.rate * factor)
+        return True
+
+    def increase(self):
+        self.rate = min(self.ceiling, self.rate + self.ceiling / RECOVERY_SENDS)
+
+
+class SendRateLimiter:
+    """Account-wide and per-inbox send pacing that backs off on errors and slow responses."""
+
+    def __init__(self, account_per_minute: float = ACCOUNT_SENDS_PER_MINUTE,
+                 inbox_per_minute: float = INBOX_SENDS_PER_MINUTE):
+        self.inbox_per_minute = inbox_per_minute
+        self._account = _Bucket(account_per_minute)
+        self._inboxes: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+        # --- METRICS ---
+        self._sends = 0
+        self._errors = 0
+        self._spikes = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._latency_avg = None
+        self._latency_samples = 0
+
+    def _inbox_bucket(self, inbox_id) -> _Bucket:
+        # Called with the lock held
+        key = str(inbox_id)
+        bucket = self._inboxes.get(key)
+        if bucket is None:
+            bucket = self._inboxes[key] = _Bucket(self.inbox_per_minute)
+        return bucket
+
+    def acquire(self, inbox_id) -> float:
+        """Block until both the inbox and the account may send. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                inbox = self._inbox_bucket(inbox_id)
+                wait = max(inbox.wait_time(now), self._account.wait_time(now))
+                if wait <= 0:
+                    inbox.take()
+                    self._account.take()
+                    self._total_wait += waited
+                    self._max_wait = max(self._max_wait, waited)
+                    return waited
+            if waited == 0:
+                logger.debug(f"⏳ [RATE] Pacing send from inbox {inbox_id} for {wait:.1f}s")
+            time.sleep(wait)
+            waited += wait
+
+    def record(self, inbox_id, latency: float, error: Optional[Exception] = None):
+        """Feed one send's outcome back into the rates."""
+        now = time.monotonic()
+        cut = recovered = False
+        with self._lock:
+            inbox = self._inbox_bucket(inbox_id)
+            self._sends += 1
+            if error is not None and _is_throttling(error):
+                self._errors += 1
+                inbox.decrease(ERROR_DECREASE, now)
+                cut = self._account.decrease(ERROR_DECREASE, now)
+                reason = f"error: {str(error).splitlines()[0]}"
+            elif self._is_spike(latency):
+                self._spikes += 1
+                inbox.decrease(LATENCY_DECREASE, now)
+                cut = self._account.decrease(LATENCY_DECREASE, now)
+                reason = f"slow send ({latency:.1f}s, avg {self._latency_avg or 0.0:.1f}s)"
+            elif error is None:
+                was_slowed = self._account.rate < self._account.ceiling
+                inbox.increase()
+                self._account.increase()
+                recovered = was_slowed and self._account.rate >= self._account.ceiling
+            self._observe_latency(latency)
+            rate = self._account.rate
+
+        if cut:
+            logger.warning(f"⚠️ [RATE] Mailreef {reason}; send rate now {rate:.1f}/min")
+        elif recovered:
+            logger.info(f"✅ [RATE] Send rate recovered to {rate:.1f}/min")
+
+    def _is_spike(self, latency: float) -> bool:
+        # Called with the lock held
+        if latency > LATENCY_SPIKE_SECONDS:
+            return True
+        return (self._latency_samples >= LATENCY_WARMUP_SAMPLES
+                and latency > max(self._latency_avg * LATENCY_SPIKE_FACTOR, LATENCY_SPIKE_MIN_SECONDS))
+
+    def _observe_latency(self, latency: float):
+        # Called with the lock held
+        self._latency_samples += 1
+        if self._latency_avg is None:
+            self._latency_avg = latency
+        else:
+            self._latency_avg += LATENCY_EWMA_ALPHA * (latency - self._latency_avg)
+
+    def send(self, inbox_id, send_fn: Callable[[], Any]) -> Any:
+        """Pace, run send_fn() and record how it went. Exceptions propagate unchanged."""
+        self.acquire(inbox_id)
+        started = time.monotonic()
+        try:
+            result = send_fn()
+        except CircuitOpenError:
+            raise # Failed fast without reaching the API: says nothing about its pace
+        except Exception as e:
+            self.record(inbox_id, time.monotonic() - started, e)
+            raise
+        self.record(inbox_id, time.monotonic() - started)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Effective vs configured rates, waits, errors and latency."""
+        with self._lock:
+            slowed = {inbox_id: round(b.rate, 2) for inbox_id, b in self._inboxes.items() if b.rate < b.ceiling}
+            return {
+                "account_rate_per_minute": round(self._account.rate, 2),
+                "account_ceiling_per_minute": self._account.ceiling,
+                "inbox_ceiling_per_minute": self.inbox_per_minute,
+                "slowed_inboxes": slowed,
+                "sends": self._sends,
+                "throttle_errors": self._errors,
+                "latency_spikes": self._spikes,
+                "avg_latency_seconds": round(self._latency_avg or 0.0, 2),
+                "total_wait_seconds": round(self._total_wait, 2),
+                "max_wait_seconds": round(self._max_wait, 2),
+            }
+
+
+def _is_throttling(error: Exception) -> bool:
+    """429s, server errors and network failures slow us down; a rejected recipient (other 4xx) does not."""
+    status = getattr(error, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+_limiters: Dict[Tuple[str, str], SendRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_send_limiter(mailreef_client) -> SendRateLimiter:
+    """Process-wide limiter for the client's Mailreef account."""
+    key = (getattr(mailreef_client, 'base_url', ''), getattr(mailreef_client, 'api_key', '') or str(id(mailreef_client)))
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = SendRateLimiter()
+        return limiter
@@ -0,0 +1,196 @@
+"""
+Write-behind queue for Google Sheets lead status updates.
+
+Every status write is first committed to a local SQLite journal (so a crash
+never loses it), coalesced per cell, and then pushed to the sheet as a single
+batch_update every FLUSH_INTERVAL_SECONDS or once FLUSH_MAX_PENDING rows are
+waiting. Anything left in the journal is replayed on the next start.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("SHEETS_WRITE_QUEUE")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOURNAL_PATH = os.path.join(ROOT_DIR, "sheets_write_journal.db")
+
+FLUSH_INTERVAL_SECONDS = int(os.environ.get("SHEETS_FLUSH_INTERVAL", "15"))
+FLUSH_MAX_PENDING = int(os.environ.get("SHEETS_FLUSH_MAX_PENDING", "50"))
+
+
+class WriteBehindQueue:
+    """
+    Durable, coalescing queue of cell writes for one worksheet.
+
+    flush_fn receives [(row, email, {header: value})] and must raise if the write
+    failed; entries are only removed from the journal after it returns. Rows may
+    have moved since the writes were queued (sorts, inserts, deletes, a restart
+    in between), so flush_fn must check the row still holds that email first.
+    """
+
+    def __init__(self, sheet_key: str,
+                 flush_fn: Callable[[List[Tuple[int, Optional[str], Dict[str, str]]]], None],
+                 db_path: str = None,
+                 flush_interval: int = FLUSH_INTERVAL_SECONDS,
+                 max_pending: int = FLUSH_MAX_PENDING):
+        self.sheet_key = sheet_key
+        self.flush_fn = flush_fn
+        self.db_path = db_path or DEFAULT_JOURNAL_PATH
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._version = 0
+
+        self._init_db()
+
+        recovered = self.pending_count()
+        if recovered:
+            logger.warning(f"♻️ [JOURNAL] Recovered {recovered} unflushed status writes for '{sheet_key}'. Replaying...")
+            self._ensure_thread()
+
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL") # Durability over speed: this is the crash log
+        return conn
+
+    def _init_db(self):
+        """Initialize the journal table (one row per pending cell)."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS pending_writes (
+                    sheet TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT,
+                    email TEXT,
+                    version INTEGER NOT NULL,
+                    queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (sheet, row, field)
+                )
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize write journal: {e}")
+
+    def enqueue(self, row: int, email: str, fields: Dict[str, str]):
+        """Journal the writes for one row. Later writes to the same cell replace earlier ones."""
+        with self._lock:
+            self._version += 1
+            version = time.time_ns() + self._version
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO pending_writes (sheet, row, field, value, email, version) VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.sheet_key, row, field, value, email, version) for field, value in fields.items()]
+            )
+            conn.commit()
+            conn.close()
+
+        self._ensure_thread()
+        if self.pending_rows() >= self.max_pending:
+            self._wakeup.set()
+
+    def pending(self) -> Dict[int, Dict[str, str]]:
+        """All journaled writes for this sheet as {row: {field: value}}."""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT row, field, value FROM pending_writes WHERE sheet = ? ORDER BY row", (self.sheet_key,)
+        ).fetchall()
+        conn.close()
+        patches = {}
+        for row, field, value in rows:
+            patches.setdefault(row, {})[field] = value
+        return patches
+
+    def pending_count(self) -> int:
+        try:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM pending_writes WHERE sheet = ?", (self.sheet_key,)).fetchone()[0]
+            conn.close()
+            return count
+        except Exception:
+            return 0
+
+    def pending_rows(self) -> int:
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(DISTINCT row) FROM pending_writes WHERE sheet = ?", (self.sheet_key,)).fetchone()[0]
+        conn.close()
+        return count
+
+    def flush(self) -> int:
+        """Push every journaled write in one call. Returns the number of rows written."""
+        with self._flush_lock:
+            conn = self._connect()
+            entries = conn.execute(
+                "SELECT row, field, value, version, email FROM pending_writes WHERE sheet = ?", (self.sheet_key,)
+            ).fetchall()
+            conn.close()
+            if not entries:
+                return 0
+
+            patches = {}
+            for row, field, value, _, email in entries:
+                patches.setdefault((row, email), {})[field] = value
+
+            self.flush_fn([(row, email, fields) for (row, email), fields in patches.items()])
+
+            # Only drop the exact versions we wrote; anything re-queued meanwhile stays for the next flush
+            conn = self._connect()
+            conn.executemany(
+                "DELETE FROM pending_writes WHERE sheet = ? AND row = ? AND field = ? AND version = ?",
+                [(self.sheet_key, row, field, version) for row, field, _, version, _ in entries]
+            )
+            conn.commit()
+            conn.close()
+            return len(patches)
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._flush_loop, name=f"sheets-flush-{self.sheet_key}", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stopped:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            try:
+                written = self.flush()
+                if written:
+                    logger.info(f"📤 [WRITE-BEHIND] Flushed status updates for {written} rows to '{self.sheet_key}'")
+            except Exception as e:
+                # Entries stay journaled; the next tick retries them
+                logger.warning(f"⚠️ [WRITE-BEHIND] Flush failed, will retry: {str(e).splitlines()[0]}")
+
+    def close(self):
+        """Stop the flusher and push anything still pending."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        try:
+            written = self.flush()
+            if written:
+                logger.info(f"📤 [WRITE-BEHIND] Final flush wrote {written} rows to '{self.sheet_key}'")
+        except Exception as e:
+            remaining = self.pending_count()
+            logger.error(f"❌ [WRITE-BEHIND] Final flush failed; {remaining} writes kept in journal for replay: {e}")
@@ -0,0 +1,158 @@
+"""
+Persistent daily slot plan.
+
+The day's randomized send slots used to exist only in memory, so a container
+restart called _prepare_daily_queue again and drew a fresh random plan for the
+whole day (double-booking windows that had already run, after a full inbox
+crawl). SlotPlanStore keeps each profile's plan and every slot's state in
+SQLite; a restart resumes the slots that are still pending.
+
+Slot states: pending -> fired -> sent | no_prospect | suppressed | failed,
+or pending -> missed when a slot can no longer be sent in time. A slot that
+was fired but never finished (crash mid-send) is not replayed: the
+lock-before-send suppression entry may already exist for its lead.
+"""
+
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mailreef_automation.logger_util import get_logger
+
+logger = get_logger("SLOT_PLAN")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(ROOT_DIR, "slot_plan.db")
+PLAN_RETENTION_DAYS = 7
+
+
+class SlotPlanStore:
+    """SQLite job store for one profile's daily send slots."""
+
+    def __init__(self, profile: str, db_path: str = None):
+        self.profile = profile
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize the slot plan table."""
+        try:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS slot_plan (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile TEXT NOT NULL,
+                    plan_date TEXT NOT NULL,
+                    inbox_id TEXT NOT NULL,
+                    scheduled_time TEXT NOT NULL,
+                    window TEXT,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_slot_plan_day ON slot_plan(profile, plan_date, state)")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize slot plan store: {e}")
+
+    def has_plan(self, plan_date: str) -> bool:
+        conn = self._connect()
+        row = conn.execute("SELECT 1 FROM slot_plan WHERE profile = ? AND plan_date = ? LIMIT 1",
+                           (self.profile, plan_date)).fetchone()
+        conn.close()
+        return row is not None
+
+    def save_plan(self, plan_date: str, slots: Iterable[Dict[str, Any]]) -> int:
+        """Store a freshly generated plan for the day (replacing any previous one). Returns the slot count."""
+        rows = [(self.profile, plan_date, str(slot["inbox_id"]), slot["scheduled_time"].isoformat(), slot.get("window"))
+                for slot in slots]
+        cutoff = (datetime.strptime(plan_date, "%Y-%m-%d") - timedelta(days=PLAN_RETENTION_DAYS)).strftime("%Y-%m-%d")
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM slot_plan WHERE profile = ? AND (plan_date = ? OR plan_date < ?)",
+                         (self.profile, plan_date, cutoff))
+            conn.executemany(
+                "INSERT INTO slot_plan (profile, plan_date, inbox_id, scheduled_time, window) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        conn.close()
+        return len(rows)
+
+    def pending(self, plan_date: str) -> List[Tuple[int, str, datetime]]:
+        """(slot_id, inbox_id, scheduled_time) of the day's slots that have not fired yet."""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, inbox_id, scheduled_time FROM slot_plan WHERE profile = ? AND plan_date = ? AND state = 'pending' "
+            "ORDER BY scheduled_time", (self.profile, plan_date)
+        ).fetchall()
+        conn.close()
+        return [(slot_id, inbox_id, datetime.fromisoformat(when)) for slot_id, inbox_id, when in rows]
+
+    def reschedule(self, changes: Iterable[Tuple[int, datetime]]):
+        """Persist new times for pending slots (restart catch-up spreading)."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE slot_plan SET scheduled_time = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                             [(when.isoformat(), slot_id) for slot_id, when in changes])
+        conn.close()
+
+    def mark(self, slot_id: Optional[int], state: str):
+        if slot_id is None:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("UPDATE slot_plan SET state = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", (state, slot_id))
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to record slot {slot_id} as {state}: {e}")
+
+    def mark_many(self, slot_ids: Iterable[int], state: str):
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE slot_plan SET state = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                             [(state, slot_id) for slot_id in slot_ids])
+        conn.close()
+
+    def inbox_count(self, plan_date: str) -> int:
+        """Distinct inboxes in the day's plan (the active inbox count it was generated for)."""
+        conn = self._connect()
+        row = conn.execute("SELECT COUNT(DISTINCT inbox_id) FROM slot_plan WHERE profile = ? AND plan_date = ?",
+                           (self.profile, plan_date)).fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def counts(self, plan_date: str) -> Dict[str, int]:
+        conn = self._connect()
+        rows = conn.execute("SELECT state, COUNT(*) FROM slot_plan WHERE profile = ? AND plan_date = ? GROUP BY state",
+                            (self.profile, plan_date)).fetchall()
+        conn.close()
+        return dict(rows)
+
+
+def spread_overdue(pending: List[Tuple[int, str, datetime]], now: datetime, misfire_grace: int,
+                   spread_minutes: int) -> Tuple[List[Tuple[int, str, datetime]], List[Tuple[int, datetime]], List[int]]:
+    """
+    Split pending slots into (schedule, rescheduled, missed).
+
+    Slots more than misfire_grace seconds overdue are missed. Slots overdue by less are
+    re-timed at random across the next spread_minutes instead of all firing at once.
+    """
+    schedule, rescheduled, missed = [], [], []
+    for slot_id, inbox_id, when in pending:
+        if when >= now:
+            schedule.append((slot_id, inbox_id, when))
+        elif (now - when).total_seconds() > misfire_grace:
+            missed.append(slot_id)
+        else:
+            new_time = now + timedelta(seconds=random.randint(30, max(60, spread_minutes * 60)))
+            schedule.append((slot_id, inbox_id, new_time))
+            rescheduled.append((slot_id, new_time))
+    return schedule, rescheduled, missed
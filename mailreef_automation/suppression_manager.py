@@ -66,6 +66,27 @@ class SuppressionManager:
             logger.error(f"Error checking suppression for {email}: {e}")
             return False
 
+    def filter_suppressed(self, emails: list) -> Set[str]:
+        """Return the subset of emails that are suppressed, using one connection for the whole batch."""
+        emails = [e.lower().strip() for e in emails if e]
+        if not emails:
+            return set()
+
+        suppressed = set()
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(emails), 500):
+                chunk = emails[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"SELECT email FROM suppressed_emails WHERE email IN ({placeholders})", chunk)
+                suppressed.update(row[0] for row in cursor.fetchall())
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error checking suppression batch: {e}")
+        return suppressed
+
     def add_to_suppression(self, email: str, campaign: Optional[str] = None):
         """Add an email to the suppression list."""
         if not email:
@@ -126,6 +147,21 @@ class SuppressionManager:
         except Exception as e:
             logger.error(f"Error releasing lock for {email}: {e}")
 
+    def remove_from_suppression(self, email: str, campaign: Optional[str] = None):
+        """Undo add_to_suppression for an email that provably was not sent (only that campaign's entry)."""
+        if not email:
+            return
+            
+        email = email.lower().strip()
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM suppressed_emails WHERE email = ? AND campaign IS ?", (email, campaign))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error removing {email} from suppression: {e}")
+
     def bulk_add(self, emails: list, campaign: Optional[str] = None):
         """Add multiple emails at once for efficiency during backfill."""
         if not emails:
@@ -176,12 +212,13 @@ class SuppressionManager:
         except Exception as e:
             logger.error(f"❌ Failed to sync to sheets: {e}")
 
-    def sync_from_sheets(self):
+    def sync_from_sheets(self, client=None):
         """
         Pull from Master Suppression sheet to local DB. Useful on container startup.
+        Pass an authenticated gspread client to reuse it instead of authenticating again.
         """
         try:
-            sheets = GoogleSheetsClient(input_sheet_name=SUPPRESSION_SHEET_NAME)
+            sheets = GoogleSheetsClient(input_sheet_name=SUPPRESSION_SHEET_NAME, client=client)
             sheets.setup_sheets()
             
             records = sheets._fetch_all_records()
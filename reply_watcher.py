@@ -14,9 +14,10 @@ sys.path.insert(0, os.path.join(BASE_DIR, "mailreef_automation"))
 sys.path.insert(0, BASE_DIR)
 
 from mailreef_automation.mailreef_client import MailreefClient
+from mailreef_automation.inbox_registry import get_inbox_registry
 from mailreef_automation.telegram_alert import TelegramNotifier
 import mailreef_automation.automation_config as automation_config
-from sheets_integration import GoogleSheetsClient
+from sheets_integration import sheets_client_for_profile
 from generators.email_generator import EmailGenerator
 import lock_util
 
@@ -28,6 +29,8 @@ if not MAILREEF_API_KEY:
 
 STATE_FILE = "mailreef_automation/logs/reply_watcher_state.json"
 CHECK_INTERVAL_MINUTES = 5
+# Upper bound on inbound pages per check (the scan normally stops at `since` much earlier)
+MAX_INBOUND_PAGES = 10
 
 logging.basicConfig(
     level=logging.INFO,
@@ -44,10 +47,13 @@ logger = get_logger("REPLY_WATCHER", "automation.log") # Default initially
 
 
 class ReplyWatcher:
-    def __init__(self, mailreef_client=None, config=None, profile_name="IVYBOUND"):
+    def __init__(self, mailreef_client=None, config=None, profile_name="IVYBOUND", sheets_client=None, openai_client=None,
+                 lead_sheets=None):
         self.profile_name = profile_name.upper()
         self.config = config or automation_config
-        self.mailreef = mailreef_client or MailreefClient(api_key=MAILREEF_API_KEY)
+        # Shared clients (multi-profile runner): Mailreef session, gspread auth, OpenAI client,
+        # and the profile scheduler's own sheets client (lead_sheets) so the input sheet has one cache and one journal
+        self.mailreef = mailreef_client or MailreefClient(api_key=MAILREEF_API_KEY, base_url=automation_config.MAILREEF_API_BASE)
         self.lock_name = f'watcher_{self.profile_name.lower()}'
         
         # Ensure only one instance runs per profile
@@ -55,32 +61,22 @@ class ReplyWatcher:
         
         self.state_file = f"mailreef_automation/logs/reply_watcher_{self.profile_name.lower()}_state.json"
         
-        self.mailreef = MailreefClient(api_key=MAILREEF_API_KEY)
-        
         profile_config = automation_config.CAMPAIGN_PROFILES[self.profile_name]
         
         # --- LOGGING ISOLATION ---
-        # Re-bind the global logger to the profile-specific file
-        # and remove the default 'automation.log' handler to prevent leakage.
-        global logger
+        # Profile-specific logger (REPLY_WATCHER_<LOG>) bound to this profile's file only,
+        # so watchers of several profiles in one process never leak into each other's logs.
         log_file = profile_config.get("log_file", "automation.log")
-        logger = get_logger("REPLY_WATCHER", log_file)
-        
-        # Clean up default handler if we switched to a specific one
-        # (This ensures "strategy_b.log" doesn't also get written to "automation.log")
-        if log_file != "automation.log":
-            for h in logger.handlers[:]:
-                if isinstance(h, logging.FileHandler) and "automation.log" in h.baseFilename:
-                    logger.removeHandler(h)
+        self.logger = get_logger("REPLY_WATCHER", log_file)
                     
-        self.sheets_client = GoogleSheetsClient(
-            input_sheet_name=profile_config["input_sheet"],
-            replies_sheet_name=profile_config["replies_sheet"],
-            replies_sheet_id=profile_config.get("replies_sheet_id")
-        )
-        self.sheets_client.setup_sheets() # Ensure sheet1 is available
+        if lead_sheets is not None:
+            self.sheets_client = lead_sheets
+        else:
+            # Standalone: our own client for the profile's sheets
+            self.sheets_client = sheets_client_for_profile(profile_config, client=sheets_client)
+            self.sheets_client.setup_sheets() # Ensure sheet1 is available
         self.telegram = TelegramNotifier()
-        self.generator = EmailGenerator() # Used for sentiment analysis
+        self.generator = EmailGenerator(client=openai_client, log_file=log_file) # Used for sentiment analysis
         
         # --- CAMPAIGN INBOX ISOLATION ---
         self.campaign_inboxes = set()
@@ -103,32 +99,32 @@ class ReplyWatcher:
             indices = profile_config.get("inbox_indices")
             
             if not indices:
-                logger.warning(f"⚠️ [WATCHER] No inbox indices defined for {self.profile_name}. Monitoring ALL inboxes (Risk of leakage).")
+                self.logger.warning(f"⚠️ [WATCHER] No inbox indices defined for {self.profile_name}. Monitoring ALL inboxes (Risk of leakage).")
                 return
 
-            all_inboxes = self.mailreef.get_inboxes()
-            # Sort by ID to ensure consistent indexing with Scheduler
-            all_inboxes.sort(key=lambda x: x['id'])
-            
-            start, end = indices
-            campaign_list = all_inboxes[start:end]
+            # Shared registry: sorted by ID for consistent indexing with Scheduler, no crawl once warm
+            campaign_list = get_inbox_registry(self.mailreef).partition(indices)
             
+            campaign_inboxes = set()
             for f in campaign_list:
                 email = f.get("email", "").lower().strip()
                 if email:
-                    self.campaign_inboxes.add(email)
+                    campaign_inboxes.add(email)
+            if campaign_inboxes:
+                self.campaign_inboxes = campaign_inboxes
             
-            logger.info(f"📋 [WATCHER] Monitoring {len(self.campaign_inboxes)} dedicated inboxes for {self.profile_name}.")
-            # logger.debug(f"Monitored emails: {self.campaign_inboxes}")
+            self.logger.info(f"📋 [WATCHER] Monitoring {len(self.campaign_inboxes)} dedicated inboxes for {self.profile_name}.")
+            # self.logger.debug(f"Monitored emails: {self.campaign_inboxes}")
             
         except Exception as e:
-            logger.error(f"❌ [WATCHER] Failed to load campaign inboxes: {e}")
+            self.logger.error(f"❌ [WATCHER] Failed to load campaign inboxes: {e}")
 
     def _load_lead_emails(self):
         """Loads all lead emails and domains from the current profile's input sheet."""
         try:
-            logger.info(f"📋 [WATCHER] Loading lead list for {self.profile_name} to guarantee no missed replies...")
-            records = self.sheets_client.input_sheet.sheet1.get_all_records()
+            self.logger.info(f"📋 [WATCHER] Loading lead list for {self.profile_name} to guarantee no missed replies...")
+            # Every shard of the profile, via the lead cache (warm-started from the local mirror)
+            records = self.sheets_client._fetch_all_records()
             for r in records:
                 email = str(r.get('email', '')).lower().strip()
                 if email:
@@ -137,9 +133,9 @@ class ReplyWatcher:
                         domain = email.split('@')[-1]
                         if domain not in self.generic_domains:
                             self.lead_domains.add(domain)
-            logger.info(f"✅ [WATCHER] Loaded {len(self.lead_emails)} lead emails and {len(self.lead_domains)} lead domains.")
+            self.logger.info(f"✅ [WATCHER] Loaded {len(self.lead_emails)} lead emails and {len(self.lead_domains)} lead domains.")
         except Exception as e:
-            logger.error(f"❌ [WATCHER] Failed to load lead list: {e}")
+            self.logger.error(f"❌ [WATCHER] Failed to load lead list: {e}")
         
     def load_state(self) -> dict:
         if os.path.exists(self.state_file):
@@ -164,14 +160,14 @@ class ReplyWatcher:
         # 1. LEAD-FIRST CHECK (Exact Email)
         email_clean = from_email.lower().strip()
         if email_clean in self.lead_emails:
-            logger.info(f"📬 [REPLY] Exact match found for lead: {email_clean}")
+            self.logger.info(f"📬 [REPLY] Exact match found for lead: {email_clean}")
             return False
 
         # 1b. LEAD-DOMAIN CHECK (Exclude generic domains)
         if '@' in email_clean:
             domain = email_clean.split('@')[-1]
             if domain in self.lead_domains:
-                logger.info(f"📬 [REPLY] Domain match found for lead: {email_clean} (@{domain})")
+                self.logger.info(f"📬 [REPLY] Domain match found for lead: {email_clean} (@{domain})")
                 return False
 
         if not subject:
@@ -202,7 +198,7 @@ class ReplyWatcher:
         
         for pattern in warmup_patterns:
             if pattern in subj_lower:
-                logger.info(f"🗑️ [FILTER] Filtered as warmup (Pattern: {pattern}): {from_email}")
+                self.logger.info(f"🗑️ [FILTER] Filtered as warmup (Pattern: {pattern}): {from_email}")
                 return True
                 
         # 3. DEFAULT TO FALSE: If we aren't sure, let it through.
@@ -211,68 +207,60 @@ class ReplyWatcher:
     def get_inbox_replies(self, since: str) -> List[Dict]:
         """Fetch all inbound replies using the global scan endpoint."""
         replies = []
+        # Pick up added/removed campaign inboxes (served from the registry's memory, no crawl)
+        self._load_campaign_inboxes()
+        # Filter by date if since is provided
+        if since:
+            try:
+                since_dt = datetime.fromisoformat(since)
+            except ValueError:
+                since_dt = datetime.now() - timedelta(hours=24)
+        else:
+            since_dt = datetime.now() - timedelta(hours=24)
+
         try:
-            # INCREASED ROBUSTNESS: Fetch top 3 pages (300 emails) 
-            # to ensure high-volume warmup doesn't push real replies out of sight.
-            for page in range(1, 4):
-                logger.debug(f"Fetching global inbound page {page}...")
-                result = self.mailreef.get_global_inbound(page=page, display=100)
-                batch = result.get("data", [])
-                if not batch:
-                    break
+            # Newest-first scan that stops at since_dt, so a quiet period costs one page
+            # and heavy warmup traffic can't push real replies past a fixed page count.
+            for msg in self.mailreef.iter_inbound(since_ts=since_dt.timestamp(), max_pages=MAX_INBOUND_PAGES):
+                from_email = str(msg.get("from_email", "")).lower().strip()
+                subject = msg.get("subject_line", "")
                 
-                # Filter by date if since is provided
-                if since:
-                    try:
-                        since_dt = datetime.fromisoformat(since)
-                    except ValueError:
-                        since_dt = datetime.now() - timedelta(hours=24)
-                else:
-                    since_dt = datetime.now() - timedelta(hours=24)
-
-                for msg in batch:
-                    from_email = str(msg.get("from_email", "")).lower().strip()
-                    subject = msg.get("subject_line", "")
-                    
-                    ts = msg.get("ts")
-                    if not ts:
-                        continue
-                        
-                    # ts is unix timestamp
-                    msg_dt = datetime.fromtimestamp(ts)
-                    # Filter by date FIRST to prevent spamming logs with historical matches
-                    if msg_dt <= since_dt:
-                        continue
+                ts = msg.get("ts")
+                if not ts:
+                    continue
                     
-                    # FILTER: Skip warmup emails
-                    if self.is_warmup(from_email, subject):
-                        continue
-
-                    # FILTER: Skip if not for this campaign's inboxes
-                    to_email = msg.get("to")[0] if msg.get("to") else "unknown"
-                    if self.campaign_inboxes and to_email.lower().strip() not in self.campaign_inboxes:
-                        # logger.debug(f"⏭️ [SKIP] Message for {to_email} does not belong to {self.profile_name}")
-                        continue
-
-                    # Normalize keys for the rest of the script
-                    msg["from_email"] = msg.get("from_email")
-                    # 1. Try body_text (full), 2. Try body_html (stripped), 3. Snippet
-                    body_text = msg.get("body_text")
-                    if not body_text and msg.get("body_html"):
-                        import re
-                        body_text = re.sub('<[^<]+?>', '', msg.get("body_html"))
-                        
-                    msg["body"] = body_text if body_text else msg.get("snippet_preview", "")
-                    msg["subject"] = subject
-                    msg["date"] = msg_dt.isoformat()
-                    # Extra context
-                    msg["inbox_email"] = msg.get("to")[0] if msg.get("to") else "unknown"
-                    msg["message_id"] = msg.get("id") or msg.get("message_id")
+                # ts is unix timestamp
+                msg_dt = datetime.fromtimestamp(ts)
+                
+                # FILTER: Skip warmup emails
+                if self.is_warmup(from_email, subject):
+                    continue
+
+                # FILTER: Skip if not for this campaign's inboxes
+                to_email = msg.get("to")[0] if msg.get("to") else "unknown"
+                if self.campaign_inboxes and to_email.lower().strip() not in self.campaign_inboxes:
+                    # self.logger.debug(f"⏭️ [SKIP] Message for {to_email} does not belong to {self.profile_name}")
+                    continue
+
+                # Normalize keys for the rest of the script
+                msg["from_email"] = msg.get("from_email")
+                # 1. Try body_text (full), 2. Try body_html (stripped), 3. Snippet
+                body_text = msg.get("body_text")
+                if not body_text and msg.get("body_html"):
+                    import re
+                    body_text = re.sub('<[^<]+?>', '', msg.get("body_html"))
                     
-                    replies.append(msg)
+                msg["body"] = body_text if body_text else msg.get("snippet_preview", "")
+                msg["subject"] = subject
+                msg["date"] = msg_dt.isoformat()
+                # Extra context
+                msg["inbox_email"] = msg.get("to")[0] if msg.get("to") else "unknown"
+                msg["message_id"] = msg.get("id") or msg.get("message_id")
+                
+                replies.append(msg)
                             
         except Exception as e:
-            logger.error(f"Error in global reply fetch: {e}")
+            self.logger.error(f"Error in global reply fetch: {e}")
         
         return replies
 
@@ -306,7 +294,7 @@ Return ONLY one word: positive, negative, or neutral."""
             )
             return response.choices[0].message.content.strip().lower()
         except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
+            self.logger.error(f"Sentiment analysis failed: {e}")
             return "neutral"
 
     def send_auto_reply(self, to_email: str, thread_id: str, inbox_id: str):
@@ -315,7 +303,7 @@ Return ONLY one word: positive, negative, or neutral."""
         template_file = profile_config.get("auto_reply_template")
         
         if not template_file:
-            logger.warning("No auto-reply template configured for this profile.")
+            self.logger.warning("No auto-reply template configured for this profile.")
             return
 
         # Construct full path to template
@@ -326,7 +314,7 @@ Return ONLY one word: positive, negative, or neutral."""
         full_tpl_path = os.path.join(BASE_DIR, base_tpl_dir, template_file)
         
         if not os.path.exists(full_tpl_path):
-             logger.error(f"Auto-reply template not found at {full_tpl_path}")
+             self.logger.error(f"Auto-reply template not found at {full_tpl_path}")
              return
 
         try:
@@ -372,7 +360,7 @@ Return ONLY one word: positive, negative, or neutral."""
             pass # Implemented in process_replies
             
         except Exception as e:
-            logger.error(f"Error preparing auto-reply: {e}")
+            self.logger.error(f"Error preparing auto-reply: {e}")
 
     def is_auto_reply(self, subject: str, body: str) -> bool:
         """Detects if a message is an automated response."""
@@ -390,7 +378,7 @@ Return ONLY one word: positive, negative, or neutral."""
         
         for kw in auto_keywords:
             if kw in subject:
-                logger.info(f"🤖 [AUTO-DETECT] Detected auto-reply by subject: '{kw}'")
+                self.logger.info(f"🤖 [AUTO-DETECT] Detected auto-reply by subject: '{kw}'")
                 return True
                 
         # 2. Body Keywords (First 200 chars usually sufficient)
@@ -402,13 +390,13 @@ Return ONLY one word: positive, negative, or neutral."""
         ]
         for kw in body_keywords:
             if kw in snippet:
-                logger.info(f"🤖 [AUTO-DETECT] Detected auto-reply by body: '{kw}'")
+                self.logger.info(f"🤖 [AUTO-DETECT] Detected auto-reply by body: '{kw}'")
                 return True
                 
         return False
 
     def process_replies(self):
-        logger.info("🛑 Reply Tracker is currently DISABLED via emergency kill switch.")
+        self.logger.info("🛑 Reply Tracker is currently DISABLED via emergency kill switch.")
         return
 
         state = self.load_state()
@@ -423,9 +411,9 @@ Return ONLY one word: positive, negative, or neutral."""
         safety_check_dt = last_check_dt - timedelta(hours=1)
         safety_check_str = safety_check_dt.isoformat()
         
-        logger.info(f"Checking for replies since {safety_check_str} (Safety Overlap: 1h)")
+        self.logger.info(f"Checking for replies since {safety_check_str} (Safety Overlap: 1h)")
         replies = self.get_inbox_replies(safety_check_str)
-        logger.info(f"Found {len(replies)} potential replies in window")
+        self.logger.info(f"Found {len(replies)} potential replies in window")
         
         # Sort replies by date to process chronologically
         replies.sort(key=lambda x: x.get('date', ''))
@@ -450,18 +438,18 @@ Return ONLY one word: positive, negative, or neutral."""
                     if last_check_dt.tzinfo is None:
                          last_check_dt = last_check_dt.replace(tzinfo=reply_dt.tzinfo)
                 except Exception as e:
-                    logger.warning(f"Date parse error for {from_email}: {e}")
+                    self.logger.warning(f"Date parse error for {from_email}: {e}")
 
             # SKIP if we've already processed this time range
             if reply_dt and reply_dt <= last_check_dt:
-                logger.debug(f"⏭️ [SKIP] Already processed reply from {from_email} (Date: {reply_dt} <= {last_check_dt})")
+                self.logger.debug(f"⏭️ [SKIP] Already processed reply from {from_email} (Date: {reply_dt} <= {last_check_dt})")
                 continue
 
-            logger.info(f"📩 Processing NEW reply from {from_email} (Date: {reply_dt})...")
+            self.logger.info(f"📩 Processing NEW reply from {from_email} (Date: {reply_dt})...")
             
             # 1.5 CHECK FOR AUTO-REPLIES (Prevent Loops)
             if self.is_auto_reply(subject, body):
-                logger.info(f"⛔ [SKIP] Ignoring auto-reply from {from_email}")
+                self.logger.info(f"⛔ [SKIP] Ignoring auto-reply from {from_email}")
                 # We log it as 'Auto-Reply' sentiment but DO NOT trigger alerts or responses
                 # Actually, maybe we just skip processing entirely? 
                 # Better to log it so we know it happened, but suppress actions.
@@ -469,7 +457,7 @@ Return ONLY one word: positive, negative, or neutral."""
             else:
                 # 2. Sentiment Analysis
                 sentiment = self.analyze_sentiment(body)
-                logger.info(f"Sentiment for {from_email}: {sentiment}")
+                self.logger.info(f"Sentiment for {from_email}: {sentiment}")
             
             # 3. Log to Google Sheets
             reply_data = {
@@ -489,14 +477,14 @@ Return ONLY one word: positive, negative, or neutral."""
                     latest_successful_dt = reply_dt
                     
             except Exception as e:
-                logger.error(f"❌ Failed to log to sheets: {e}")
+                self.logger.error(f"❌ Failed to log to sheets: {e}")
                 
             
         # 4. Telegram Alert for Positive Sentiment
         if sentiment == 'positive':
             alert_text = f"🔥 *HOT LEAD REPLY*\n\n*From:* {from_email}\n*Subject:* {subject}\n\n*Snippet:*\n`{body[:300]}...`"
             self.telegram.send_message(alert_text)
-            logger.info(f"🚀 Telegram alert sent for {from_email}")
+            self.logger.info(f"🚀 Telegram alert sent for {from_email}")
             
         # 5. Forward all non-auto-reply genuine responses
         msg_id = reply.get('message_id')
@@ -504,19 +492,19 @@ Return ONLY one word: positive, negative, or neutral."""
             forward_targets = ["cja@ivybound.net", "andrew@web4guru.com"]
             for target in forward_targets:
                 try:
-                    logger.info(f"↪️ Forwarding reply from {from_email} to {target}...")
+                    self.logger.info(f"↪️ Forwarding reply from {from_email} to {target}...")
                     res = self.mailreef.forward_email(msg_id, target)
                     if res.get('error'):
-                        logger.error(f"⚠️ Mailreef API forward error for {target}: {res.get('error')}")
+                        self.logger.error(f"⚠️ Mailreef API forward error for {target}: {res.get('error')}")
                 except Exception as e:
-                    logger.error(f"❌ Failed to forward to {target}: {e}")
+                    self.logger.error(f"❌ Failed to forward to {target}: {e}")
         else:
-            logger.warning(f"⚠️ Cannot forward reply from {from_email}: Missing message_id from Mailreef API.")
+            self.logger.warning(f"⚠️ Cannot forward reply from {from_email}: Missing message_id from Mailreef API.")
         
         # 6. AUTO-REPLY LOGIC (DISABLED)
         # profile_config = automation_config.CAMPAIGN_PROFILES[self.profile_name]
         # if profile_config.get("auto_reply_template"):
-        #     logger.info(f"🤖 [AUTO-REPLY] Attempting to auto-reply to {from_email}")
+        #     self.logger.info(f"🤖 [AUTO-REPLY] Attempting to auto-reply to {from_email}")
         #     ... (Removed to prevent loops)
         pass
         
@@ -528,16 +516,16 @@ Return ONLY one word: positive, negative, or neutral."""
     def send_auto_reply(self, to_email: str, thread_id: str, inbox_id: str, original_subject: str):
         """Sends the follow-up pitch (Email 2) as an auto-reply."""
         # DISABLED BY USER REQUEST
-        logger.warning(f"⛔ Auto-reply to {to_email} BLOCKED (Feature Disabled Globally).")
+        self.logger.warning(f"⛔ Auto-reply to {to_email} BLOCKED (Feature Disabled Globally).")
         return
 
     def run_daemon(self):
-        logger.info(f"Starting Reply Watcher daemon (every {CHECK_INTERVAL_MINUTES}m)")
+        self.logger.info(f"Starting Reply Watcher daemon (every {CHECK_INTERVAL_MINUTES}m)")
         while True:
             try:
                 self.process_replies()
             except Exception as e:
-                logger.error(f"Error in daemon: {e}")
+                self.logger.error(f"Error in daemon: {e}")
             time.sleep(CHECK_INTERVAL_MINUTES * 60)
 
 
@@ -554,6 +542,7 @@ def main():
         else:
             watcher.process_replies()
     finally:
+        watcher.sheets_client.close()
         lock_util.release_lock(watcher.lock_name)
 
 if __name__ == "__main__":
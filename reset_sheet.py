@@ -1,5 +1,6 @@
 import gspread
 from google.oauth2.service_account import Credentials
+from mailreef_automation.quota_governor import GovernedHTTPClient
 import os
 import logging
 
@@ -16,7 +17,7 @@ SCOPES = [
 def reset_law_firm_sheet():
     service_account_path = 'credentials/service_account.json'
     creds = Credentials.from_service_account_file(service_account_path, scopes=SCOPES)
-    client = gspread.authorize(creds)
+    client = gspread.authorize(creds, http_client=GovernedHTTPClient)
 
     sheet_name = "Florida Law Firm Leads"
     try:
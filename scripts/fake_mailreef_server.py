@@ -0,0 +1,374 @@
+"""
+Local stand-in for the Mailreef HTTP API, for load tests.
+
+Serves the endpoints MailreefClient and AsyncMailreefClient use:
+
+    GET  /domains                 paginated domain list
+    GET  /mailboxes?domain=       paginated mailboxes of one domain (404 for an unknown domain)
+    GET  /mailboxes/<id>          one mailbox
+    POST /email                   accept a send (201 {"id": ...})
+    GET  /mail/inbound            account-wide inbound, newest first, paginated
+    POST /email/forward/<id>      forward an inbound message
+
+Every request sleeps a jittered latency first. Sends fail with 503 at
+--error-rate and with 429 (Retry-After: 1) at --throttle-rate; list endpoints
+fail with 503 at --read-error-rate. Pages are capped at --max-display, like an
+API that ignores a larger display. A background thread adds synthetic inbound
+traffic: warmup mail at --warmup-per-minute and a reply to --reply-rate of the
+accepted sends after about --reply-delay seconds. --backlog messages spread
+over the previous --backlog-hours are there from the start.
+
+Two extra endpoints drive a test run:
+
+    GET  /__stats                 request, status, send and inbound counters
+    POST /__config                change latency / error rates / traffic rates live (JSON body)
+
+Any API key is accepted, but requests without basic auth get 401.
+
+Usage:
+    python scripts/fake_mailreef_server.py --port 8025 --inboxes 190 --latency 0.3 --error-rate 0.02
+    MAILREEF_API_BASE=http://127.0.0.1:8025 MAILREEF_API_KEY=fake python mailreef_automation/main.py
+
+In-process (see scripts/simulate_day.py --fake-server):
+    server = FakeMailreefServer(inboxes=190).start()
+    client = MailreefClient(api_key="fake", base_url=server.base_url)
+    ...
+    server.stop()
+"""
+
+import argparse
+import heapq
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Subjects the reply watcher's warmup filter recognises
+WARMUP_SUBJECTS = [
+    "Project timeline update", "Security update for your account", "Office recycling program",
+    "Employee satisfaction survey", "New hire onboarding", "IT support ticket", "Leave request",
+]
+REPLY_BODIES = [
+    "Thanks for reaching out, could you send more details?",
+    "Not interested, please remove me from your list.",
+    "Happy to chat next week. What times work for you?",
+]
+# Runtime-adjustable settings (POST /__config)
+TUNABLE = ("latency", "latency_jitter", "error_rate", "throttle_rate", "read_error_rate",
+           "warmup_per_minute", "reply_rate", "reply_delay")
+
+
+class FakeMailreefServer:
+    """Threaded HTTP server holding fake domains, mailboxes, an outbox and an inbound feed."""
+
+    def __init__(self, inboxes: int = 190, inboxes_per_domain: int = 3, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, latency_jitter: float = 0.3, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, read_error_rate: float = 0.0, max_display: int = 100,
+                 warmup_per_minute: float = 0.0, reply_rate: float = 0.0, reply_delay: float = 60.0,
+                 backlog: int = 0, backlog_hours: float = 48.0, retention: int = 50000, seed: Optional[int] = None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.read_error_rate = read_error_rate
+        self.max_display = max_display
+        self.warmup_per_minute = warmup_per_minute
+        self.reply_rate = reply_rate
+        self.reply_delay = reply_delay
+        self.retention = retention
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Zero-padded ids: sorting by id keeps the inbox_indices partitions in creation order
+        self.domains = [{"id": f"dom{d:04d}", "name": f"outreach{d:04d}.fake.example"}
+                        for d in range((inboxes + inboxes_per_domain - 1) // inboxes_per_domain)]
+        self.mailboxes: Dict[str, Dict[str, Any]] = {}
+        self.mailboxes_by_domain: Dict[str, List[Dict[str, Any]]] = {d["id"]: [] for d in self.domains}
+        for i in range(inboxes):
+            domain = self.domains[i // inboxes_per_domain]
+            mailbox = {"id": f"mbx{i:05d}", "email": f"sender{i:05d}@{domain['name']}", "domain": domain["id"],
+                       "sender_name": f"Sender {i}", "status": "active"}
+            self.mailboxes[mailbox["id"]] = mailbox
+            self.mailboxes_by_domain[domain["id"]].append(mailbox)
+
+        # --- STATE ---
+        self.sent: List[Tuple[str, str]] = [] # (from inbox id, to email) per accepted send
+        self.inbound: List[Dict[str, Any]] = [] # Oldest first; served reversed
+        self.inbound_by_id: Dict[str, Dict[str, Any]] = {}
+        self.forwarded: List[Tuple[str, str]] = []
+        self._pending_replies: List[Tuple[float, int, Dict[str, Any]]] = [] # heap of (due, seq, message)
+        self._seq = 0
+        self.requests = Counter()
+        self.statuses = Counter()
+
+        now = time.time()
+        for _ in range(backlog):
+            self._add_inbound(self._warmup_message(now - self.rng.uniform(0, backlog_hours * 3600)))
+        self.inbound.sort(key=lambda m: m["ts"])
+
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 256
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMailreefServer":
+        for target, name in ((self.httpd.serve_forever, "fake-mailreef-http"), (self._traffic_loop, "fake-mailreef-traffic")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def configure(self, **settings) -> Dict[str, Any]:
+        with self._lock:
+            for key, value in settings.items():
+                if key not in TUNABLE:
+                    raise ValueError(f"unknown setting: {key}")
+                setattr(self, key, float(value))
+            return {key: getattr(self, key) for key in TUNABLE}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recipients = Counter(to for _, to in self.sent)
+            return {
+                "requests": dict(self.requests),
+                "statuses": {str(k): v for k, v in self.statuses.items()},
+                "sent": len(self.sent),
+                "duplicate_recipients": sum(n - 1 for n in recipients.values() if n > 1),
+                "inbound": len(self.inbound),
+                "pending_replies": len(self._pending_replies),
+                "forwarded": len(self.forwarded),
+                "settings": {key: getattr(self, key) for key in TUNABLE},
+            }
+
+    # ------------------------------------------------------------------ traffic
+
+    def _add_inbound(self, message: Dict[str, Any]):
+        # Called with the lock held (or before start)
+        self._seq += 1
+        message.setdefault("id", f"in{self._seq:08d}")
+        self.inbound.append(message)
+        self.inbound_by_id[message["id"]] = message
+        if len(self.inbound) > self.retention * 1.1:
+            for old in self.inbound[:len(self.inbound) - self.retention]:
+                self.inbound_by_id.pop(old["id"], None)
+            del self.inbound[:len(self.inbound) - self.retention]
+
+    def _warmup_message(self, ts: float) -> Dict[str, Any]:
+        to = self.rng.choice(list(self.mailboxes.values()))["email"]
+        subject = self.rng.choice(WARMUP_SUBJECTS)
+        body = f"{subject}. Please review when you have a moment."
+        return {"ts": int(ts), "from_email": f"warmup{self.rng.randrange(10000):04d}@warmup-pool.fake.example",
+                "to": [to], "to_email": to, "subject_line": subject, "body_text": body,
+                "body_html": f"<p>{body}</p>", "snippet_preview": body[:80]}
+
+    def _schedule_reply(self, mailbox: Dict[str, Any], to_email: str, subject: str):
+        # Called with the lock held
+        if self.rng.random() >= self.reply_rate:
+            return
+        body = self.rng.choice(REPLY_BODIES)
+        message = {"from_email": to_email, "to": [mailbox["email"]], "to_email": mailbox["email"],
+                   "subject_line": f"Re: {subject}", "body_text": body, "body_html": f"<p>{body}</p>",
+                   "snippet_preview": body[:80]}
+        self._seq += 1
+        due = time.time() + self.rng.expovariate(1.0 / self.reply_delay) if self.reply_delay > 0 else time.time()
+        heapq.heappush(self._pending_replies, (due, self._seq, message))
+
+    def _traffic_loop(self):
+        tick = 0.2
+        while not self._stop.wait(tick):
+            now = time.time()
+            with self._lock:
+                while self._pending_replies and self._pending_replies[0][0] <= now:
+                    _, _, message = heapq.heappop(self._pending_replies)
+                    message["ts"] = int(now)
+                    self._add_inbound(message)
+                # Poisson arrivals: expected warmup_per_minute * tick / 60 per tick
+                expected = self.warmup_per_minute * tick / 60.0
+                while expected > 0 and self.rng.random() < expected:
+                    self._add_inbound(self._warmup_message(now))
+                    expected -= 1
+
+    # ------------------------------------------------------------------ endpoints
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any, Dict[str, str]]:
+        parts = [p for p in path.split("/") if p]
+        if method == "GET" and parts == ["domains"]:
+            return self._read(lambda: self._page(self.domains, query))
+        if method == "GET" and parts == ["mailboxes"]:
+            mailboxes = self.mailboxes_by_domain.get(query.get("domain", ""))
+            if mailboxes is None:
+                return 404, {"error": "Domain not found"}, {}
+            return self._read(lambda: self._page(mailboxes, query))
+        if method == "GET" and len(parts) == 2 and parts[0] == "mailboxes":
+            mailbox = self.mailboxes.get(parts[1])
+            return (200, dict(mailbox), {}) if mailbox else (404, {"error": "Mailbox not found"}, {})
+        if method == "POST" and parts == ["email"]:
+            return self._send(body or {})
+        if method == "GET" and parts == ["mail", "inbound"]:
+            def inbound_page():
+                with self._lock:
+                    newest_first = self.inbound[::-1]
+                return self._page(newest_first, query)
+            return self._read(inbound_page)
+        if method == "POST" and len(parts) == 3 and parts[:2] == ["email", "forward"]:
+            with self._lock:
+                if parts[2] not in self.inbound_by_id:
+                    return 404, {"error": "Message not found"}, {}
+                self.forwarded.append((parts[2], (body or {}).get("to", "")))
+            return 200, {"id": parts[2], "status": "forwarded"}, {}
+        return 404, {"error": f"No route for {method} {path}"}, {}
+
+    def _read(self, build) -> Tuple[int, Any, Dict[str, str]]:
+        if self.rng.random() < self.read_error_rate:
+            return 503, {"error": "Service temporarily unavailable"}, {}
+        return 200, build(), {}
+
+    def _page(self, items: List[Dict[str, Any]], query: Dict[str, str]) -> Dict[str, Any]:
+        page = max(1, int(query.get("page", 1)))
+        display = max(1, min(int(query.get("display", 100)), self.max_display))
+        start = (page - 1) * display
+        return {"data": items[start:start + display], "total_count": len(items), "page": page, "display": display}
+
+    def _send(self, payload: Dict[str, Any]) -> Tuple[int, Any, Dict[str, str]]:
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 429, {"error": "Too many requests"}, {"Retry-After": "1"}
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, {"error": "Service temporarily unavailable"}, {}
+        mailbox = self.mailboxes.get(payload.get("from"))
+        to = payload.get("to") or []
+        if mailbox is None:
+            return 400, {"message": f"Unknown sending mailbox: {payload.get('from')}"}, {}
+        if not to or not payload.get("subject"):
+            return 400, {"message": "Missing recipient or subject"}, {}
+        with self._lock:
+            self.sent.append((mailbox["id"], to[0]))
+            message_id = f"out{len(self.sent):08d}"
+            self._schedule_reply(mailbox, to[0], payload["subject"])
+        return 201, {"id": message_id, "status": "queued"}, {}
+
+    def delay(self):
+        if self.latency > 0:
+            time.sleep(max(0.0, self.rng.gauss(self.latency, self.latency * self.latency_jitter)))
+
+
+def _make_handler(server: FakeMailreefServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the real API behind its load balancer
+
+        def _dispatch(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            with server._lock:
+                server.requests[f"{method} {_route(url.path)}"] += 1
+
+            if url.path == "/__stats" and method == "GET":
+                status, body, headers = 200, server.stats(), {}
+            elif url.path == "/__config" and method == "POST":
+                try:
+                    status, body, headers = 200, server.configure(**json.loads(raw or b"{}")), {}
+                except (ValueError, TypeError) as e:
+                    status, body, headers = 400, {"error": str(e)}, {}
+            elif not self.headers.get("Authorization", "").startswith("Basic "):
+                status, body, headers = 401, {"error": "Unauthorized"}, {}
+            else:
+                server.delay()
+                try:
+                    payload = json.loads(raw) if raw else None
+                    status, body, headers = server.handle(method, url.path, query, payload)
+                except (ValueError, TypeError) as e:
+                    status, body, headers = 400, {"error": f"Bad request: {e}"}, {}
+
+            with server._lock:
+                server.statuses[status] += 1
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):
+            pass # Thousands of requests per run; /__stats has the counts
+
+    return Handler
+
+
+def _route(path: str) -> str:
+    """/mailboxes/mbx00012 -> /mailboxes/:id, for per-endpoint counters."""
+    parts = [p for p in path.split("/") if p]
+    if len(parts) == 2 and parts[0] == "mailboxes":
+        return "/mailboxes/:id"
+    if len(parts) == 3 and parts[:2] == ["email", "forward"]:
+        return "/email/forward/:id"
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Mailreef API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--inboxes", type=int, default=190)
+    parser.add_argument("--inboxes-per-domain", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3, help="Mean seconds per request")
+    parser.add_argument("--latency-jitter", type=float, default=0.3, help="Std deviation as a fraction of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of sends answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of sends answered 429")
+    parser.add_argument("--read-error-rate", type=float, default=0.0, help="Fraction of list requests answered 503")
+    parser.add_argument("--max-display", type=int, default=100, help="Largest page size served")
+    parser.add_argument("--warmup-per-minute", type=float, default=20.0, help="Synthetic warmup messages per minute")
+    parser.add_argument("--reply-rate", type=float, default=0.05, help="Fraction of sends that get a reply")
+    parser.add_argument("--reply-delay", type=float, default=60.0, help="Mean seconds until a reply arrives")
+    parser.add_argument("--backlog", type=int, default=2000, help="Inbound messages present at startup")
+    parser.add_argument("--backlog-hours", type=float, default=48.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeMailreefServer(
+        inboxes=args.inboxes, inboxes_per_domain=args.inboxes_per_domain, host=args.host, port=args.port,
+        latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, read_error_rate=args.read_error_rate, max_display=args.max_display,
+        warmup_per_minute=args.warmup_per_minute, reply_rate=args.reply_rate, reply_delay=args.reply_delay,
+        backlog=args.backlog, backlog_hours=args.backlog_hours, seed=args.seed,
+    ).start()
+    print(f"🧪 Fake Mailreef API on {server.base_url} ({args.inboxes} inboxes, {len(server.domains)} domains)")
+    print(f"   Point the app at it with MAILREEF_API_BASE={server.base_url}; stats at {server.base_url}/__stats")
+    try:
+        while True:
+            time.sleep(60)
+            stats = server.stats()
+            print(f"📊 sent={stats['sent']} inbound={stats['inbound']} statuses={stats['statuses']}")
+    except KeyboardInterrupt:
+        print("🛑 Stopping fake Mailreef API")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
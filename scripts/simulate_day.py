@@ -0,0 +1,472 @@
+"""
+Full-day send simulation harness.
+
+Runs a compressed virtual business day of send slots through the real
+EmailScheduler code path (slot generation, slot plan, dispatcher, generation
+pipeline, Stage 1 prefetch, Stage 2 follow-up index, suppression, EmailGenerator)
+with in-memory fakes for MailreefClient, the Google Sheets client and the
+OpenAI client. Nothing touches the network, the real sheets or the real
+SQLite stores (everything lives in a temp directory).
+
+With --fake-server the real MailreefClient is used instead, over HTTP against
+an in-process fake Mailreef API (scripts/fake_mailreef_server.py) with
+synthetic replies and warmup traffic, and the report adds a timed
+reply-watcher inbound scan over the day's mail.
+
+Latencies are given in real-world seconds and compressed together with the
+day, so the ratio of work to slot rate matches production.
+
+Usage:
+    python scripts/simulate_day.py --profile IVYBOUND --compression 360
+    python scripts/simulate_day.py --emails-per-inbox 80 --openai-latency 12 --json report.json
+    python scripts/simulate_day.py --fake-server --inboxes 190 --mailreef-error-rate 0.02
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root (and the automation package dir, as main.py does)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "mailreef_automation"))
+
+import pytz
+
+import automation_config
+import generation_pipeline
+import scheduler as scheduler_module
+import sheets_integration
+import slot_plan
+from mailreef_automation import inbox_registry
+from mailreef_automation.send_rate_limiter import (ACCOUNT_SENDS_PER_MINUTE, INBOX_SENDS_PER_MINUTE,
+                                                   SendRateLimiter)
+from suppression_manager import SuppressionManager
+
+EASTERN = pytz.timezone('US/Eastern')
+
+
+class Latency:
+    """Sleeps for a jittered, compressed real-world latency."""
+
+    def __init__(self, seconds: float, compression: float, jitter: float = 0.3):
+        self.seconds = seconds
+        self.compression = compression
+        self.jitter = jitter
+
+    def wait(self):
+        if self.seconds > 0:
+            time.sleep(max(0.0, random.gauss(self.seconds, self.seconds * self.jitter)) / self.compression)
+
+
+# ==================== FAKES ====================
+
+class FakeMailreef:
+    """MailreefClient stand-in: a fixed inbox list and a recorded outbox."""
+
+    def __init__(self, inbox_count: int, latency: Latency):
+        self.api_key = f"sim-{id(self)}" # Own inbox registry, never shared with a real client
+        self.base_url = "sim://mailreef"
+        self.latency = latency
+        self.inboxes = [{"id": f"ibx{i:04d}", "email": f"sender{i:04d}@sim.example"} for i in range(inbox_count)]
+        self.calls = Counter()
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def get_inboxes(self):
+        with self._lock:
+            self.calls["get_inboxes"] += 1
+        self.latency.wait()
+        return [dict(i) for i in self.inboxes]
+
+    def send_email(self, inbox_id, to_email, subject, body, reply_to=None):
+        self.latency.wait()
+        with self._lock:
+            self.calls["send_email"] += 1
+            self.sent.append((inbox_id, to_email))
+            return {"message_id": f"sim-{len(self.sent)}"}
+
+
+class FakeSheets:
+    """Google Sheets client stand-in holding the lead rows in memory."""
+
+    def __init__(self, leads, latency: Latency):
+        self.latency = latency
+        self.client = None
+        self.rows = {lead["_row"]: lead for lead in leads}
+        self.calls = Counter()
+        self.status_writes = []
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        self.latency.wait()
+
+    def setup_sheets(self):
+        return {}
+
+    def get_pending_leads(self, limit=50):
+        self._call("get_pending_leads")
+        with self._lock:
+            pending = [dict(r) for row, r in sorted(self.rows.items()) if r.get("status") in ("", "pending")]
+        return pending[:limit]
+
+    def get_followup_candidates(self):
+        self._call("get_followup_candidates")
+        with self._lock:
+            # Live records: the follow-up index re-checks status lazily, like the real cache records
+            return [r for r in self.rows.values() if r.get("status") == "email_1_sent"]
+
+    def hydrate_leads(self, records):
+        return [dict(r) for r in records]
+
+    def update_lead_status(self, email, status, sent_at=None, sender_email=None, row=None, shard=None, **kwargs):
+        self._call("update_lead_status")
+        with self._lock:
+            record = self.rows.get(row)
+            if record is None or record.get("email") != email:
+                record = next((r for r in self.rows.values() if r.get("email") == email), None)
+            if record is None:
+                return False
+            record["status"] = status
+            if sender_email:
+                record["sender_email"] = sender_email
+            if sent_at:
+                record[f"{status.replace('_sent', '')}_sent_at"] = sent_at.isoformat()
+            self.status_writes.append((email, status))
+        return True
+
+    def flush_writes(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+class FakeOpenAI:
+    """OpenAI client stand-in: client.chat.completions.create(...) with latency."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model=None, messages=None, **kwargs):
+        self.latency.wait()
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        content = f"Subject: Quick question {n}\nBody: Simulated personalized message {n}."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+# ==================== SIMULATION ====================
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _config(args):
+    class ConfigWrapper:
+        pass
+
+    cfg = ConfigWrapper()
+    for name in dir(automation_config):
+        if not name.startswith("__"):
+            setattr(cfg, name, getattr(automation_config, name))
+
+    # Scale the windows so one inbox sends --emails-per-inbox a day, keeping their shape
+    windows = [dict(w) for w in cfg.BUSINESS_DAY_WINDOWS]
+    total = sum(w["emails_per_inbox"] for w in windows) or 1
+    for w in windows:
+        w["emails_per_inbox"] = max(0, round(w["emails_per_inbox"] * args.emails_per_inbox / total))
+    cfg.BUSINESS_DAY_WINDOWS = windows
+    cfg.WEEKEND_DAY_WINDOWS = windows
+    cfg.EMAILS_PER_INBOX_DAY_BUSINESS = args.emails_per_inbox
+    cfg.INBOXES_PER_DAY_BUSINESS = args.inboxes
+    return cfg
+
+
+def _make_leads(count, followups, sender_emails, seed):
+    rng = random.Random(seed)
+    leads = []
+    sent_at = (datetime.now() - timedelta(days=4)).isoformat()
+    for i in range(count + followups):
+        lead = {
+            "_row": i + 2,
+            "email": f"lead{i:06d}@school{i % 997}.sim.example",
+            "first_name": f"Lead{i}",
+            "school_name": f"School {i % 997}",
+            "role": rng.choice(["principal", "head of school", "dean", "counselor", ""]),
+            "status": "pending",
+        }
+        if i >= count:
+            # Email 1 recipients that are due a follow-up from the inbox that emailed them
+            lead.update(status="email_1_sent", email_1_sent_at=sent_at, sender_email=rng.choice(sender_emails))
+        leads.append(lead)
+    return leads
+
+
+def simulate(args):
+    compression = float(args.compression)
+    tmp = tempfile.mkdtemp(prefix="mailreef_sim_")
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    # Every local store goes to the temp dir
+    slot_plan.DEFAULT_DB_PATH = os.path.join(tmp, "slot_plan.db")
+    generation_pipeline.DEFAULT_QUEUE_PATH = os.path.join(tmp, "prepared_emails.db")
+    inbox_registry.DEFAULT_SNAPSHOT_PATH = os.path.join(tmp, "inbox_registry.db")
+    generation_pipeline.IDLE_POLL_SECONDS = max(0.05, 15 / compression)
+    generation_pipeline.SLOT_WAIT_SECONDS = generation_pipeline.SLOT_WAIT_SECONDS / compression
+
+    cfg = _config(args)
+    profile_config = cfg.CAMPAIGN_PROFILES[args.profile]
+    start_idx, _ = profile_config.get("inbox_indices", (0, 9999))
+    server = None
+    if args.fake_server:
+        from fake_mailreef_server import FakeMailreefServer
+        from mailreef_automation.mailreef_client import MailreefClient
+        server = FakeMailreefServer(
+            inboxes=start_idx + args.inboxes, latency=args.mailreef_latency / compression,
+            error_rate=args.mailreef_error_rate, reply_rate=args.reply_rate, reply_delay=3600 / compression,
+            warmup_per_minute=args.warmup_per_hour / 60 * compression, seed=args.seed,
+        ).start()
+        mailreef = MailreefClient(api_key=f"sim-{id(server)}", base_url=server.base_url)
+        mailreef.breaker.on_trip = None # Never run the network diagnostics from a simulation
+        inboxes = sorted(server.mailboxes.values(), key=lambda i: i["id"])
+    else:
+        mailreef = FakeMailreef(start_idx + args.inboxes, Latency(args.mailreef_latency, compression))
+        inboxes = mailreef.inboxes
+    partition = inboxes[start_idx:start_idx + args.inboxes]
+    openai = FakeOpenAI(Latency(args.openai_latency, compression))
+
+    slots_per_day = sum(w["emails_per_inbox"] for w in cfg.BUSINESS_DAY_WINDOWS) * args.inboxes
+    leads = _make_leads(args.leads or int(slots_per_day * 1.2), args.followups,
+                        [i["email"] for i in partition], args.seed)
+    sheets = FakeSheets(leads, Latency(args.sheets_latency, compression))
+
+    # Real scheduler, built around the fakes
+    original_factory = sheets_integration.sheets_client_for_profile
+    sheets_integration.sheets_client_for_profile = lambda profile_config, **kwargs: sheets
+    try:
+        sched = scheduler_module.EmailScheduler(
+            mailreef_client=mailreef,
+            config=cfg,
+            campaign_profile=args.profile,
+            openai_client=openai,
+            suppression=SuppressionManager(os.path.join(tmp, "suppression.db"))
+        )
+    finally:
+        sheets_integration.sheets_client_for_profile = original_factory
+    for name in list(logging.root.manager.loggerDict):
+        logger = logging.getLogger(name)
+        # Never page anyone from a simulation
+        logger.handlers = [h for h in logger.handlers if type(h).__name__ != "TelegramLogHandler"]
+
+    if args.no_pipeline:
+        sched.pipeline = None
+    elif sched.pipeline:
+        sched.pipeline.lookahead /= compression
+
+    # --- VIRTUAL CLOCK ---
+    random.seed(args.seed)
+    plan = sched.generate_send_slots("business", args.inboxes)
+    windows = cfg.BUSINESS_DAY_WINDOWS
+    day_start_hour = min(w["start"] for w in windows)
+    day_end_hour = max(w["end"] for w in windows)
+    real_start = datetime.now(EASTERN) + timedelta(seconds=2)
+
+    def virtual_offset(when):
+        return (when.hour - day_start_hour) * 3600 + when.minute * 60 + when.second
+
+    def virtual_now():
+        return (datetime.now(EASTERN) - real_start).total_seconds() * compression
+
+    def virtual_window():
+        hour = day_start_hour + int(virtual_now() // 3600)
+        for w in windows:
+            if w["start"] <= hour < w["end"]:
+                return f"{w['start']}:00-{w['end']}:00"
+        return None
+
+    def virtual_demand():
+        hour = day_start_hour + int(virtual_now() // 3600)
+        rates = [w["emails_per_inbox"] * args.inboxes / (60 * (w["end"] - w["start"]))
+                 for w in windows if hour <= w["start"] <= hour + 1 or w["start"] <= hour < w["end"]]
+        return max(rates or [0])
+
+    sched.prefetch.window_fn = virtual_window
+    sched.prefetch.demand_fn = virtual_demand
+    sched.prefetch.ttl = sched.prefetch.ttl / compression
+    sched.FOLLOWUP_CACHE_TTL = sched.FOLLOWUP_CACHE_TTL / compression
+    sched.dispatcher.misfire_grace = sched.dispatcher.misfire_grace / compression
+    sched.send_limiter = SendRateLimiter(ACCOUNT_SENDS_PER_MINUTE * compression, INBOX_SENDS_PER_MINUTE * compression)
+
+    compressed = [dict(slot, scheduled_time=real_start + timedelta(seconds=virtual_offset(slot["scheduled_time"]) / compression))
+                  for slot in plan]
+
+    # Lag is measured at the moment the slot's send path starts (virtual seconds)
+    lags = []
+    outcomes = Counter()
+    lag_lock = threading.Lock()
+    execute_slot = sched.dispatcher.fire_fn
+
+    def timed_slot(inbox_id, scheduled_time):
+        lag = (datetime.now(EASTERN) - scheduled_time).total_seconds() * compression
+        result = execute_slot(inbox_id, scheduled_time)
+        with lag_lock:
+            lags.append(max(lag, 0.0))
+            outcomes[result or "done"] += 1
+        return result
+
+    sched.dispatcher.fire_fn = timed_slot
+
+    plan_date = real_start.strftime("%Y-%m-%d")
+    sched.slot_plan.save_plan(plan_date, compressed)
+    sched.dispatcher.start()
+    if sched.pipeline:
+        sched.pipeline.start()
+    sched._queue_pending_slots(plan_date, datetime.now(EASTERN))
+
+    wall_start = time.monotonic()
+    epoch_start = time.time()
+    day_seconds = (day_end_hour - day_start_hour) * 3600 / compression
+    deadline = wall_start + day_seconds + 5 + args.drain_seconds
+    while time.monotonic() < deadline:
+        m = sched.dispatcher.metrics()
+        if m["queue_depth"] == 0 and m["in_flight"] == 0:
+            break
+        time.sleep(0.2)
+    wall = time.monotonic() - wall_start
+
+    sched.dispatcher.stop()
+    if sched.pipeline:
+        pipeline_metrics = sched.pipeline.metrics()
+        sched.pipeline.stop()
+    else:
+        pipeline_metrics = None
+    # --- REPLY WATCHER SCAN ---
+    inbound_scan = None
+    if server:
+        time.sleep(min(args.drain_seconds, 3600 / compression)) # Let most replies arrive
+        pages_before = server.stats()["requests"].get("GET /mail/inbound", 0)
+        scan_start = time.monotonic()
+        scanned = list(mailreef.iter_inbound(since_ts=epoch_start - 1))
+        inbound_scan = {
+            "messages": len(scanned),
+            "replies": sum(1 for m in scanned if str(m.get("subject_line", "")).startswith("Re: ")),
+            "pages": server.stats()["requests"].get("GET /mail/inbound", 0) - pages_before,
+            "seconds": round(time.monotonic() - scan_start, 2),
+        }
+    logging.disable(logging.NOTSET)
+
+    if server:
+        server_stats = server.stats()
+        server.stop()
+        sent_log = server.sent
+        mailreef_calls = server_stats["requests"]
+    else:
+        sent_log = mailreef.sent
+        mailreef_calls = dict(mailreef.calls)
+
+    # --- DUPLICATE CHECKS ---
+    sends_per_recipient = Counter(to for _, to in sent_log)
+    stages_per_recipient = Counter(email for email, _ in set(sheets.status_writes))
+    duplicate_sends = sum(max(0, n - stages_per_recipient.get(email, 0)) for email, n in sends_per_recipient.items())
+    repeated_stage_writes = sum(n - 1 for n in Counter(sheets.status_writes).values() if n > 1)
+
+    sent = len(sent_log)
+    virtual_hours = max(1e-9, wall * compression / 3600)
+    report = {
+        "profile": args.profile,
+        "compression": compression,
+        "inboxes": args.inboxes,
+        "slots_planned": len(plan),
+        "slot_outcomes": dict(outcomes),
+        "dispatcher": sched.dispatcher.metrics(),
+        "sent": sent,
+        "throughput": {
+            "sends_per_virtual_hour": round(sent / virtual_hours, 1),
+            "sends_per_wall_second": round(sent / wall, 2) if wall else 0.0,
+            "wall_seconds": round(wall, 1),
+        },
+        "slot_lag_seconds": {
+            "p50": round(_percentile(lags, 50), 1),
+            "p90": round(_percentile(lags, 90), 1),
+            "p99": round(_percentile(lags, 99), 1),
+            "max": round(max(lags or [0]), 1),
+        },
+        "duplicates": {
+            "duplicate_sends": duplicate_sends,
+            "repeated_stage_writes": repeated_stage_writes,
+        },
+        "api_calls": {
+            "mailreef": mailreef_calls,
+            "sheets": dict(sheets.calls),
+            "openai": openai.calls,
+        },
+        "send_rate": sched.send_limiter.metrics(),
+        "prefetch": sched.prefetch.stats(),
+        "pipeline": pipeline_metrics,
+    }
+    if server:
+        report["fake_server"] = {"statuses": server_stats["statuses"], "inbound": server_stats["inbound"]}
+        report["inbound_scan"] = inbound_scan
+    shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a compressed send day against in-memory fakes.")
+    parser.add_argument("--profile", default="IVYBOUND")
+    parser.add_argument("--compression", type=float, default=360, help="Virtual seconds per wall-clock second")
+    parser.add_argument("--inboxes", type=int, default=automation_config.INBOXES_PER_DAY_BUSINESS)
+    parser.add_argument("--emails-per-inbox", type=int, default=automation_config.EMAILS_PER_INBOX_DAY_BUSINESS)
+    parser.add_argument("--leads", type=int, default=0, help="Pending leads (default: 1.2x the day's slots)")
+    parser.add_argument("--followups", type=int, default=500, help="Email 1 recipients due a follow-up")
+    parser.add_argument("--mailreef-latency", type=float, default=0.8, help="Seconds per Mailreef API call")
+    parser.add_argument("--sheets-latency", type=float, default=1.0, help="Seconds per Sheets API call")
+    parser.add_argument("--openai-latency", type=float, default=8.0, help="Seconds per OpenAI completion")
+    parser.add_argument("--no-pipeline", action="store_true", help="Generate inline when slots fire")
+    parser.add_argument("--fake-server", action="store_true",
+                        help="Use the real MailreefClient against a local fake Mailreef API")
+    parser.add_argument("--mailreef-error-rate", type=float, default=0.0, help="--fake-server: fraction of sends answered 503")
+    parser.add_argument("--reply-rate", type=float, default=0.05, help="--fake-server: fraction of sends that get a reply")
+    parser.add_argument("--warmup-per-hour", type=float, default=300, help="--fake-server: warmup messages per virtual hour")
+    parser.add_argument("--drain-seconds", type=float, default=30, help="Wall seconds to wait for the queue to drain")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep scheduler logging on")
+    args = parser.parse_args()
+    args.profile = args.profile.upper()
+
+    report = simulate(args)
+    print(json.dumps(report, indent=2, default=str))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    dup = report["duplicates"]
+    if dup["duplicate_sends"] or dup["repeated_stage_writes"]:
+        print("❌ DUPLICATE SENDS DETECTED")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import gspread
 from google.oauth2.service_account import Credentials
+from mailreef_automation.quota_governor import GovernedHTTPClient
 import os
 
 # Define the scopes
@@ -15,7 +16,7 @@ def setup_law_firm_sheet():
         return
 
     creds = Credentials.from_service_account_file(service_account_path, scopes=SCOPES)
-    client = gspread.authorize(creds)
+    client = gspread.authorize(creds, http_client=GovernedHTTPClient)
 
     sheet_name = "Florida Law Firm Leads"
     user_email = "andrew@web4guru.com"
@@ -20,7 +20,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 
+import re
 import time
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import gspread
 from google.oauth2.credentials import Credentials
@@ -28,9 +32,14 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from gspread.exceptions import APIError
+from gspread.utils import numericise_all
 
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 from mailreef_automation.logger_util import get_logger
+from mailreef_automation.sheets_write_queue import WriteBehindQueue
+from mailreef_automation.lead_mirror import LeadMirror
+from mailreef_automation.lead_record import LeadRecord, LeadSchema, UNLOADED
+from mailreef_automation.quota_governor import GovernedHTTPClient, get_governor
 logger = get_logger("SHEETS_CLIENT")
 
 # OAuth scopes needed
@@ -49,12 +58,70 @@ SERVICE_ACCOUNT_FILE = Path(__file__).parent / 'credentials' / 'service_account.
 INPUT_SHEET_NAME = "Ivy Bound - Campaign Leads"
 REPLIES_SHEET_NAME = "Ivy Bound - Reply Tracking"
 
+# Lead cache sync: "incremental" patches only changed rows, "full" re-downloads the sheet every TTL
+SHEETS_SYNC_MODE = os.environ.get("SHEETS_SYNC_MODE", "incremental").lower()
+FULL_RESYNC_INTERVAL = timedelta(hours=1)
+# Columns the campaign itself mutates; diffing these is how the delta sync spots changed rows
+# (manual edits to any other column only reach the cache with the hourly full resync)
+DELTA_FINGERPRINT_FIELDS = ['email', 'status', 'email_1_sent_at', 'email_2_sent_at', 'sender_email']
+
+# Input sheet columns, in order (new sheets/tabs are created with these)
+INPUT_SHEET_HEADERS = [
+    "email",
+    "first_name",
+    "last_name",
+    "role",
+    "business_name",
+    "business_type",
+    "domain",
+    "state",
+    "city",
+    "phone",
+    "status",           # pending, email_1_sent, email_2_sent, replied, bounced
+    "email_verified",   # verified, invalid, unchecked
+    "email_1_sent_at",
+    "email_2_sent_at",
+    "sender_email",
+    "notes",
+    "custom_data"
+]
+
+# Shard worksheets are addressed as "<spreadsheet>::<worksheet>" (see ShardedSheetsClient)
+SHARD_SEPARATOR = "::"
+SHEETS_SHARD_WORKERS = int(os.environ.get("SHEETS_SHARD_WORKERS", "4"))
+
+# Lead fetches: "projected" downloads everything except HEAVY_FIELDS, which are loaded lazily
+# for the leads actually handed out; "full" downloads every column
+SHEETS_FETCH_MODE = os.environ.get("SHEETS_FETCH_MODE", "projected").lower()
+HEAVY_FIELDS = ['custom_data', 'notes']
+
+# Lead statuses that block every other row for the same email / that mean "not contacted yet"
+TERMINAL_STATUSES = {'replied', 'bounced', 'unsubscribed', 'opt_out', 'do_not_contact'}
+PENDING_STATUSES = {'', 'pending'}
+
+# Free-mail domains never identify a specific lead
+GENERIC_DOMAINS = {'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com'}
+# Longest school/company name (in words) tried when matching names inside a reply subject
+MAX_NAME_TOKENS = 8
+
+# New leads per append_rows call in add_leads/flush_leads
+ADD_LEADS_CHUNK_SIZE = int(os.environ.get("SHEETS_APPEND_CHUNK", "500"))
+
+# Status writes: journal locally and flush in batches ("1") or write each one immediately ("0")
+SHEETS_WRITE_BEHIND = os.environ.get("SHEETS_WRITE_BEHIND", "1") == "1"
+
 
 class GoogleSheetsClient:
     """Handles all Google Sheets operations for the campaign."""
     
-    def __init__(self, input_sheet_name=INPUT_SHEET_NAME, replies_sheet_name=REPLIES_SHEET_NAME, replies_sheet_id=None):
+    def __init__(self, input_sheet_name=INPUT_SHEET_NAME, replies_sheet_name=REPLIES_SHEET_NAME, replies_sheet_id=None,
+                 write_behind: Optional[bool] = None, input_worksheet: Optional[str] = None,
+                 client: Optional[gspread.Client] = None):
         self.input_sheet_name = input_sheet_name
+        # Leads live on the first tab unless a specific worksheet is named (see ShardedSheetsClient)
+        self.input_worksheet_name = input_worksheet
+        self.sheet_key = f"{input_sheet_name}{SHARD_SEPARATOR}{input_worksheet}" if input_worksheet else input_sheet_name
+        self._input_ws: Optional[gspread.Worksheet] = None
         self.replies_sheet_name = replies_sheet_name or REPLIES_SHEET_NAME
         self.replies_sheet_id = replies_sheet_id
         self.logger = logger
@@ -69,7 +136,44 @@ class GoogleSheetsClient:
         self._last_all_records_fetch = datetime.min
         self.CACHE_TTL = timedelta(minutes=5)
         
-        self._authenticate()
+        # Delta sync state (see _delta_sync)
+        self._row_index = {} # sheet row -> record
+        self._delta_upserts, self._delta_deletes = [], []
+        
+        # Status indexes, maintained incrementally on load/delta/status write (see _index_record)
+        self._index_lock = threading.RLock()
+        self._status_index = {}  # status -> {email: row count}
+        self._email_rows = {}    # email -> [rows]
+        self._pending_rows = []  # sorted rows whose status is pending/empty
+        self._domain_index = {}  # email/website domain -> [rows]
+        self._name_index = {}    # normalized school/company name -> [rows]
+        self._suppression = None
+        self._raw_headers = []
+        self._norm_headers = []
+        self._schema = LeadSchema([]) # Shared by every LeadRecord of the current header layout
+        self._synced_row_count = 0
+        self._sheet_modified = None
+        self._last_full_sync = datetime.min
+        
+        # Write-behind queue for update_lead_status (see mailreef_automation/sheets_write_queue.py)
+        if write_behind is None:
+            write_behind = SHEETS_WRITE_BEHIND
+        self._write_queue = WriteBehindQueue(self.sheet_key, self._flush_status_writes) if write_behind else None
+        
+        # Local indexed mirror of the input sheet: hot-path reads query this instead of scanning
+        self._mirror = LeadMirror(self.sheet_key)
+        self._sync_lock = threading.RLock()
+        self._background_sync = None
+        
+        # add_leads buffer, written in append_rows chunks by flush_leads
+        self._add_lock = threading.RLock()
+        self._add_buffer = []
+        self._add_buffer_emails = set()
+        
+        if client is not None:
+            self.client = client # Shards of one profile share a single authenticated client
+        else:
+            self._authenticate()
 
     def retry_on_quota(f):
         @wraps(f)
@@ -80,7 +184,13 @@ class GoogleSheetsClient:
                     return f(*args, **kwargs)
                 except APIError as e:
                     if "[429]" in str(e) and i < max_retries - 1:
-                        wait = (i + 1) * 30 
+                        if getattr(e, 'quota_paused', False):
+                            # The quota governor has paused this bucket for every process;
+                            # the retried request waits that out in acquire() instead of sleeping here.
+                            logger.warning(f"⚠️ Google Sheets Quota hit. Retrying once the shared quota pause ends ({i+1}/{max_retries})...")
+                            continue
+                        # No governor on this client (or its DB failed): back off here
+                        wait = (i + 1) * 30
                         logger.warning(f"⚠️ Google Sheets Quota hit. Waiting {wait}s before retry {i+1}/{max_retries}...")
                         time.sleep(wait)
                         continue
@@ -90,37 +200,509 @@ class GoogleSheetsClient:
 
     @retry_on_quota
     def _fetch_all_records(self):
-        """Internal helper to fetch all records with caching."""
+        """Internal helper to fetch all records with caching.
+
+        In incremental mode (default) only the rows that changed since the last
+        sync are downloaded; a full download happens on first load, after
+        FULL_RESYNC_INTERVAL, or whenever the delta cannot be trusted.
+        """
+        with self._sync_lock:
+            return self._sync_records()
+
+    def _sync_records(self):
         now = datetime.now()
         if self._all_records_cache is None or (now - self._last_all_records_fetch) > self.CACHE_TTL:
-            logger.info("📡 Fetching fresh records from Google Sheets...")
-            worksheet = self.input_sheet.sheet1
-            raw_records = worksheet.get_all_records()
+            worksheet = self._input_worksheet()
             
-            # Normalize Headers: lowercase and map synonyms
-            normalized = []
-            for i, raw in enumerate(raw_records):
-                record = {}
-                for k, v in raw.items():
-                    norm_k = str(k).lower().strip().replace(' ', '_')
-                    # Map common synonyms
-                    if norm_k in ['job_title', 'title', 'position']: norm_k = 'role'
-                    if norm_k in ['website', 'url', 'site']: norm_k = 'domain'
-                    if norm_k in ['job_title', 'title', 'position']: norm_k = 'role'
-                    if norm_k in ['website', 'url', 'site']: norm_k = 'domain'
-                    if norm_k in ['school', 'company', 'organization']: norm_k = 'school_name'
-                    if norm_k in ['type', 'school_type', 'category']: norm_k = 'school_type'
-                    
-                    record[norm_k] = v
-                
-                if record.get('email'):
-                    record['_row'] = i + 2
-                    normalized.append(record)
-                    self._cache[record['email']] = record
+            can_delta = (
+                SHEETS_SYNC_MODE == "incremental"
+                and self._all_records_cache is not None
+                and (now - self._last_full_sync) < FULL_RESYNC_INTERVAL
+            )
+            if can_delta:
+                try:
+                    self._delta_sync(worksheet)
+                    self._last_all_records_fetch = now
+                    return self._all_records_cache
+                except APIError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️ [DELTA SYNC] Falling back to full fetch: {e}")
             
-            self._all_records_cache = normalized
+            self._full_sync(worksheet)
             self._last_all_records_fetch = now
+            self._last_full_sync = now
+        return self._all_records_cache
+
+    def _read_records(self):
+        """
+        Records for hot-path reads: never blocks on the Google API once warm.
+        
+        Cold start loads the local mirror from disk (falling back to one blocking
+        sheet download if the mirror is empty); afterwards a stale cache is
+        refreshed by a background sync while callers keep reading the current copy.
+        """
+        if self._all_records_cache is None:
+            with self._sync_lock:
+                if self._all_records_cache is None and not self._load_from_mirror():
+                    return self._fetch_all_records()
+        if (datetime.now() - self._last_all_records_fetch) > self.CACHE_TTL:
+            self._refresh_in_background()
         return self._all_records_cache
+
+    def _load_from_mirror(self) -> bool:
+        """Warm-start the in-memory caches from the SQLite mirror."""
+        try:
+            loaded = self._mirror.load()
+        except Exception as e:
+            logger.warning(f"⚠️ [MIRROR] Could not load local mirror: {e}")
+            return False
+        if not loaded:
+            return False
+        
+        records, state = loaded
+        self._set_headers(state['headers'])
+        records = [LeadRecord.from_dict(self._schema, r) for r in records]
+        self._synced_row_count = state['row_count'] or 0
+        self._sheet_modified = state['modified']
+        cache = dict(self._cache)
+        for r in records:
+            cache[r['email']] = r
+        with self._index_lock:
+            self._rebuild_status_indexes(records)
+            self._row_index, self._cache = {r['_row']: r for r in records}, cache
+            self._all_records_cache = records
+        # Treat the mirror as a fresh full sync so the next refresh is a cheap delta
+        self._last_full_sync = datetime.now()
+        self._last_all_records_fetch = datetime.min
+        logger.info(f"💾 [MIRROR] Warm-started {len(records)} leads from local mirror.")
+        return True
+
+    def _refresh_in_background(self):
+        if self._background_sync and self._background_sync.is_alive():
+            return
+        
+        def _run():
+            try:
+                self._fetch_all_records()
+            except Exception as e:
+                logger.error(f"❌ Background lead sync failed: {str(e).splitlines()[0]}")
+        
+        self._background_sync = threading.Thread(target=_run, name="sheets-lead-sync", daemon=True)
+        self._background_sync.start()
+
+    def _records_at(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Resolve mirror row numbers to the live in-memory records."""
+        index = self._row_index
+        return [index[r] for r in rows if r in index]
+
+    @staticmethod
+    def _normalize_header(header) -> str:
+        """Lowercase a sheet header and map common synonyms to our canonical keys."""
+        norm_k = str(header).lower().strip().replace(' ', '_')
+        if norm_k in ['job_title', 'title', 'position']: norm_k = 'role'
+        if norm_k in ['website', 'url', 'site']: norm_k = 'domain'
+        if norm_k in ['school', 'company', 'organization']: norm_k = 'school_name'
+        if norm_k in ['type', 'school_type', 'category']: norm_k = 'school_type'
+        return norm_k
+
+    def _set_headers(self, raw_headers: List[Any]):
+        """Adopt a header row: normalization is computed once per sheet, not once per cell."""
+        self._raw_headers = list(raw_headers)
+        self._norm_headers = [self._normalize_header(h) for h in self._raw_headers]
+        self._schema = LeadSchema(self._norm_headers)
+
+    def _build_record(self, values: List[Any], row: int) -> Optional[LeadRecord]:
+        """Turn one raw sheet row into a normalized record (None if it has no email).
+
+        Columns that were not downloaded (projected fetch) are passed as UNLOADED
+        and read as absent keys, so _hydrate_records can tell them apart from blanks.
+        """
+        width = len(self._norm_headers)
+        values = numericise_all(list(values[:width]) + [''] * (width - len(values)))
+        record = LeadRecord(self._schema, values, row)
+        if not record.get('email'):
+            return None
+        return record
+
+    # --- COLUMN PROJECTION ---
+    # Lead selection only needs the narrow columns; the JSON blobs in HEAVY_FIELDS
+    # are most of the payload, so they are fetched per row only for leads we hand out.
+
+    def _projected_spans(self) -> List[tuple]:
+        """Contiguous 1-based column spans that exclude the heavy columns ([(first, last)])."""
+        if SHEETS_FETCH_MODE != "projected":
+            return [(1, len(self._raw_headers))]
+        light = [i + 1 for i, h in enumerate(self._norm_headers) if h not in HEAVY_FIELDS]
+        return self._coalesce_rows(light)
+
+    def _heavy_spans(self) -> List[tuple]:
+        heavy = [i + 1 for i, h in enumerate(self._norm_headers) if h in HEAVY_FIELDS]
+        return self._coalesce_rows(heavy) if SHEETS_FETCH_MODE == "projected" else []
+
+    def _stitch_columns(self, col_spans: List[tuple], span_values: List[List[List[Any]]], n_rows: int) -> List[List[Any]]:
+        """Reassemble per-column-span batch_get results into full-width rows (UNLOADED where skipped)."""
+        rows = [[UNLOADED] * len(self._raw_headers) for _ in range(n_rows)]
+        for (first, last), values in zip(col_spans, span_values):
+            width = last - first + 1
+            for r, row_values in enumerate(values[:n_rows]):
+                row_values = list(row_values) + [''] * (width - len(row_values))
+                rows[r][first - 1:last] = row_values[:width]
+            for r in range(len(values), n_rows):
+                rows[r][first - 1:last] = [''] * width
+        return rows
+
+    def _fetch_row_spans(self, worksheet, row_spans: List[tuple]) -> Dict[int, List[Any]]:
+        """Download the given (start, end) row spans, projected to the light columns, in one batch_get."""
+        col_spans = self._projected_spans()
+        ranges = [f"{self._col_letter(first)}{start}:{self._col_letter(last)}{end}"
+                  for start, end in row_spans for first, last in col_spans]
+        results = worksheet.batch_get(ranges) if ranges else []
+        fetched = {}
+        for i, (start, end) in enumerate(row_spans):
+            span_values = results[i * len(col_spans):(i + 1) * len(col_spans)]
+            n_rows = end - start + 1
+            for offset, values in enumerate(self._stitch_columns(col_spans, span_values, n_rows)):
+                fetched[start + offset] = values
+        return fetched
+
+    def _hydrate_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Load the heavy columns for these records (one batch_get); already-loaded records are skipped."""
+        heavy_spans = self._heavy_spans()
+        if not heavy_spans or not records:
+            return records
+        heavy_headers = [h for h in self._norm_headers if h in HEAVY_FIELDS]
+        missing = [r for r in records if any(h not in r for h in heavy_headers)]
+        if not missing:
+            return records
+        
+        row_spans = self._coalesce_rows([r['_row'] for r in missing])
+        ranges = [f"{self._col_letter(first)}{start}:{self._col_letter(last)}{end}"
+                  for start, end in row_spans for first, last in heavy_spans]
+        try:
+            results = self._input_worksheet().batch_get(ranges)
+        except Exception as e:
+            # Leads still work without their blobs (generators default them); try again next time
+            logger.warning(f"⚠️ Could not load {', '.join(heavy_headers)} for {len(missing)} leads: {str(e).splitlines()[0]}")
+            return records
+        
+        by_row = {r['_row']: r for r in missing}
+        for i, (start, end) in enumerate(row_spans):
+            span_values = results[i * len(heavy_spans):(i + 1) * len(heavy_spans)]
+            rows = self._stitch_columns(heavy_spans, span_values, end - start + 1)
+            for offset, values in enumerate(rows):
+                record = by_row.get(start + offset)
+                if record is None:
+                    continue
+                for header, value in zip(self._norm_headers, numericise_all(values)):
+                    if header in HEAVY_FIELDS and value is not UNLOADED:
+                        record[header] = value
+        logger.debug(f"📥 Loaded heavy columns for {len(missing)} leads.")
+        return records
+
+    def _get_sheet_modified_time(self) -> Optional[str]:
+        """Drive modifiedTime of the input spreadsheet (one cheap metadata call)."""
+        try:
+            return self.input_sheet.get_lastUpdateTime()
+        except Exception as e:
+            logger.debug(f"Could not read sheet modifiedTime: {e}")
+            return None
+
+    def _full_sync(self, worksheet):
+        """Download the whole sheet and rebuild the record caches."""
+        logger.info("📡 Fetching fresh records from Google Sheets...")
+        # Read the timestamp BEFORE the download so edits made mid-fetch are picked up next time
+        modified = self._get_sheet_modified_time()
+        if SHEETS_FETCH_MODE == "projected":
+            all_values = self._fetch_projected(worksheet)
+        else:
+            all_values = worksheet.get(pad_values=True)
+            self._set_headers(all_values[0] if all_values and all_values[0] else [])
+        
+        normalized = []
+        row_index = {}
+        cache = dict(self._cache)
+        for i, values in enumerate(all_values[1:]):
+            record = self._build_record(values, i + 2)
+            if record:
+                normalized.append(record)
+                row_index[record['_row']] = record
+                cache[record['email']] = record
+        
+        with self._index_lock:
+            # Writes still sitting in the journal are newer than what the sheet shows
+            for row, fields in self._pending_status_writes().items():
+                if row in row_index:
+                    row_index[row].update(fields)
+            
+            self._rebuild_status_indexes(normalized)
+            # Publish in one step: readers iterate these without a lock
+            self._row_index, self._cache, self._all_records_cache = row_index, cache, normalized
+        self._synced_row_count = len(all_values)
+        self._sheet_modified = modified
+        self._mirror.replace_all(normalized, self._raw_headers, self._synced_row_count, modified)
+
+    def _fetch_projected(self, worksheet) -> List[List[Any]]:
+        """
+        Full download of the light columns only: header row plus one range per
+        column span, in a single batch_get when the header layout is already known.
+        """
+        known_headers = self._raw_headers
+        if not known_headers:
+            header_values = worksheet.get('1:1')
+            self._set_headers(header_values[0] if header_values else [])
+        
+        col_spans = self._projected_spans()
+        ranges = ['1:1'] + [f"{self._col_letter(first)}2:{self._col_letter(last)}" for first, last in col_spans]
+        results = worksheet.batch_get(ranges)
+        
+        header_row = list(results[0][0]) if results[0] else []
+        if self._strip_trailing_blanks(header_row) != self._strip_trailing_blanks(self._raw_headers):
+            # Columns moved since we last looked: re-plan the projection against the new header
+            logger.info("📡 Header row changed; re-planning projected fetch.")
+            self._set_headers(header_row)
+            col_spans = self._projected_spans()
+            ranges = ['1:1'] + [f"{self._col_letter(first)}2:{self._col_letter(last)}" for first, last in col_spans]
+            results = worksheet.batch_get(ranges)
+        
+        n_rows = max([len(values) for values in results[1:]] + [0])
+        return [self._raw_headers] + self._stitch_columns(col_spans, results[1:], n_rows)
+
+    def _delta_sync(self, worksheet):
+        """
+        Patch the caches with only the rows that changed since the last sync.
+
+        1. Skip entirely if the spreadsheet's Drive modifiedTime is unchanged.
+        2. Otherwise download the header row plus the narrow fingerprint columns
+           (email/status/sent_at/sender) in a single batch_get.
+        3. Re-download full-width only the rows whose fingerprint differs from
+           the cache, plus any rows appended past the last known row.
+        Structural changes (header edits, deleted rows) raise so the caller does a full sync.
+
+        Edits that touch only columns outside DELTA_FINGERPRINT_FIELDS (names, notes,
+        custom_data, ...) are invisible here: the cache keeps the old values until the
+        next full sync, at most FULL_RESYNC_INTERVAL (1 hour) later.
+        """
+        modified = self._get_sheet_modified_time()
+        if modified and modified == self._sheet_modified:
+            logger.debug("📡 [DELTA SYNC] Sheet unchanged since last sync.")
+            return
+        
+        fp_cols = [(field, self._norm_headers.index(field) + 1)
+                   for field in DELTA_FINGERPRINT_FIELDS if field in self._norm_headers]
+        if not fp_cols or fp_cols[0][0] != 'email':
+            raise ValueError("email column missing from cached headers")
+        
+        col_letters = [self._col_letter(col) for _, col in fp_cols]
+        ranges = ['1:1'] + [f"{letter}2:{letter}" for letter in col_letters]
+        results = worksheet.batch_get(ranges)
+        
+        header_row = list(results[0][0]) if results[0] else []
+        if self._strip_trailing_blanks(header_row) != self._strip_trailing_blanks(self._raw_headers):
+            raise ValueError("header row changed")
+        
+        columns = [[cell[0] if cell else '' for cell in col_range] for col_range in results[1:]]
+        row_count = max(len(c) for c in columns) + 1 # includes header row
+        if row_count < self._synced_row_count:
+            raise ValueError(f"sheet shrank from {self._synced_row_count} to {row_count} rows")
+        
+        pending_writes = self._pending_status_writes()
+        changed_rows = []
+        for offset in range(self._synced_row_count - 1):
+            row = offset + 2
+            if row in pending_writes:
+                continue # Cache already holds our queued (newer) values
+            fingerprint = numericise_all([c[offset] if offset < len(c) else '' for c in columns])
+            cached = self._row_index.get(row)
+            if cached is None:
+                if fingerprint[0]:
+                    changed_rows.append(row)
+                continue
+            if any(cached.get(field, '') != value for (field, _), value in zip(fp_cols, fingerprint)):
+                changed_rows.append(row)
+        new_rows = list(range(self._synced_row_count + 1, row_count + 1))
+        
+        if len(changed_rows) > max(500, (self._synced_row_count // 4)):
+            raise ValueError(f"{len(changed_rows)} rows changed; cheaper to resync")
+        
+        fetch_rows = changed_rows + new_rows
+        self._delta_upserts, self._delta_deletes = [], []
+        if fetch_rows:
+            fetched = self._fetch_row_spans(worksheet, self._coalesce_rows(fetch_rows))
+            with self._index_lock:
+                # Readers iterate the published list/dicts without a lock: patch copies, then swap them in
+                row_index, cache = dict(self._row_index), dict(self._cache)
+                pending_writes = self._pending_status_writes()
+                for row in sorted(fetched):
+                    self._patch_row(row, fetched[row], row_index, cache, pending_writes.get(row))
+                records = sorted(row_index.values(), key=lambda r: r['_row'])
+                self._row_index, self._cache, self._all_records_cache = row_index, cache, records
+        
+        self._synced_row_count = row_count
+        self._sheet_modified = modified
+        self._mirror.apply_delta(self._delta_upserts, self._delta_deletes, self._raw_headers, row_count, modified)
+        logger.info(f"📡 [DELTA SYNC] Patched {len(changed_rows)} changed + {len(new_rows)} new rows "
+                    f"({len(fetch_rows)} of {row_count - 1} downloaded).")
+
+    def _patch_row(self, row: int, values: List[Any], row_index: Dict[int, Dict[str, Any]],
+                   cache: Dict[str, Dict[str, Any]], pending_fields: Optional[Dict[str, str]] = None):
+        """
+        Apply one re-downloaded row to unpublished copies of _row_index/_cache (caller holds _index_lock).
+
+        The row gets a new record object; the old one is left untouched for readers still holding it.
+        """
+        record = self._build_record(values, row)
+        if record is not None and pending_fields:
+            record.update(pending_fields) # A journaled write is newer than the sheet
+        existing = row_index.get(row)
+        
+        if existing is not None:
+            self._unindex_record(existing)
+            del row_index[row]
+            old_email = existing.get('email')
+            if old_email and cache.get(old_email) is existing:
+                del cache[old_email]
+            if record is None:
+                self._delta_deletes.append(row)
+        if record is not None:
+            row_index[row] = record
+            cache[record['email']] = record
+            self._index_record(record)
+            self._delta_upserts.append(record)
+
+    # --- STATUS INDEXES ---
+    # status -> emails and email -> rows, so pending selection and the global
+    # replied/bounced check never walk the whole sheet.
+
+    @staticmethod
+    def _normalize_domain(value) -> str:
+        domain = str(value or '').lower().strip()
+        domain = re.sub(r'^https?://', '', domain)
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        return domain.split('/')[0]
+
+    @staticmethod
+    def _normalize_name(value) -> str:
+        """'St. Mary's Academy' -> 'st mary s academy' (word tokens joined by single spaces)."""
+        return ' '.join(re.findall(r'[a-z0-9]+', str(value or '').lower()))
+
+    def _attribution_keys(self, record: Dict[str, Any]) -> tuple:
+        email = str(record.get('email', '')).lower().strip()
+        domains = {self._normalize_domain(record.get('domain'))}
+        if '@' in email:
+            domains.add(email.split('@')[-1])
+        names = {self._normalize_name(record.get(f)) for f in ('school_name', 'business_name')}
+        return domains - GENERIC_DOMAINS - {''}, names - {''}
+
+    @staticmethod
+    def _index_key(record: Dict[str, Any]) -> tuple:
+        return (str(record.get('status', '')).lower().strip(),
+                str(record.get('email', '')).lower().strip(),
+                record.get('_row', -1))
+
+    def _index_record(self, record: Dict[str, Any], bulk: bool = False):
+        """Add a record to the indexes (caller holds _index_lock)."""
+        status, email, row = self._index_key(record)
+        emails = self._status_index.setdefault(status, {})
+        emails[email] = emails.get(email, 0) + 1
+        if row > 1:
+            self._email_rows.setdefault(email, []).append(row)
+            domains, names = self._attribution_keys(record)
+            for domain in domains:
+                self._domain_index.setdefault(domain, []).append(row)
+            for name in names:
+                self._name_index.setdefault(name, []).append(row)
+            if status in PENDING_STATUSES:
+                if bulk:
+                    self._pending_rows.append(row)
+                else:
+                    bisect.insort(self._pending_rows, row)
+
+    def _unindex_record(self, record: Dict[str, Any]):
+        """Remove a record from the indexes using its CURRENT values (caller holds _index_lock)."""
+        status, email, row = self._index_key(record)
+        emails = self._status_index.get(status)
+        if emails and email in emails:
+            emails[email] -= 1
+            if not emails[email]:
+                del emails[email]
+        rows = self._email_rows.get(email)
+        if rows and row in rows:
+            rows.remove(row)
+            if not rows:
+                del self._email_rows[email]
+        domains, names = self._attribution_keys(record)
+        for index, keys in ((self._domain_index, domains), (self._name_index, names)):
+            for key in keys:
+                rows = index.get(key)
+                if rows and row in rows:
+                    rows.remove(row)
+                    if not rows:
+                        del index[key]
+        if status in PENDING_STATUSES:
+            i = bisect.bisect_left(self._pending_rows, row)
+            if i < len(self._pending_rows) and self._pending_rows[i] == row:
+                del self._pending_rows[i]
+
+    def _rebuild_status_indexes(self, records: List[Dict[str, Any]]):
+        with self._index_lock:
+            self._status_index, self._email_rows, self._pending_rows = {}, {}, []
+            self._domain_index, self._name_index = {}, {}
+            for record in records:
+                self._index_record(record, bulk=True)
+            self._pending_rows.sort()
+
+    def _find_lead_by_domain(self, domain: str) -> Optional[Dict[str, Any]]:
+        """First lead (row order) whose email or website domain matches; generic domains never match."""
+        domain = self._normalize_domain(domain)
+        if domain in GENERIC_DOMAINS:
+            return None
+        with self._index_lock:
+            rows = sorted(self._domain_index.get(domain, []))
+        return next(iter(self._records_at(rows)), None)
+
+    def _find_lead_by_subject(self, subject: str, statuses=('email_1_sent', 'email_2_sent')) -> Optional[Dict[str, Any]]:
+        """
+        Contacted lead whose school/company name appears (as whole words) in a subject line.
+        Every word n-gram of the subject is one dict lookup; the longest name wins.
+        """
+        tokens = self._normalize_name(subject).split()
+        with self._index_lock:
+            for n in range(min(MAX_NAME_TOKENS, len(tokens)), 0, -1):
+                for i in range(len(tokens) - n + 1):
+                    for row in self._name_index.get(' '.join(tokens[i:i + n]), ()):
+                        record = self._row_index.get(row)
+                        if record and record.get('status') in statuses:
+                            return record
+        return None
+
+    def _is_globally_suppressed(self, email: str) -> bool:
+        """True if ANY row for this email has a terminal status."""
+        return any(email in self._status_index.get(status, ()) for status in TERMINAL_STATUSES)
+
+    @staticmethod
+    def _col_letter(col: int) -> str:
+        """1-based column index -> A1 column letters."""
+        return gspread.utils.rowcol_to_a1(1, col)[:-1]
+
+    @staticmethod
+    def _strip_trailing_blanks(values: List[Any]) -> List[Any]:
+        values = list(values)
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    @staticmethod
+    def _coalesce_rows(rows: List[int]) -> List[tuple]:
+        """Collapse sorted row numbers into contiguous (start, end) spans."""
+        spans = []
+        for row in sorted(set(rows)):
+            if spans and row == spans[-1][1] + 1:
+                spans[-1] = (spans[-1][0], row)
+            else:
+                spans.append((row, row))
+        return spans
     
     def _authenticate(self):
         """Authenticate with Google using OAuth credentials or a service account/token from env."""
@@ -200,7 +782,7 @@ class GoogleSheetsClient:
                     f.write(creds.to_json())
         
         if creds:
-            self.client = gspread.authorize(creds)
+            self.client = gspread.authorize(creds, http_client=GovernedHTTPClient)
             logger.info("✓ Final Authentication Successful")
         else:
             raise Exception("Failed to authenticate with Google")
@@ -225,14 +807,7 @@ class GoogleSheetsClient:
         results = {}
         
         # Create or get input sheet
-        try:
-            self.input_sheet = self.client.open(self.input_sheet_name)
-            logger.info(f"✓ Found existing input sheet: {self.input_sheet_name}")
-        except gspread.SpreadsheetNotFound:
-            self.input_sheet = self.client.create(self.input_sheet_name)
-            self._setup_input_sheet_headers()
-            logger.info(f"✓ Created input sheet: {self.input_sheet_name}")
-        
+        self._open_input_sheet()
         results['input_sheet_url'] = self.input_sheet.url
         
         # Create or get replies sheet
@@ -264,30 +839,42 @@ class GoogleSheetsClient:
         
         return results
     
-    def _setup_input_sheet_headers(self):
+    def _open_input_sheet(self):
+        """Open (or create) the input spreadsheet and, if one is named, the leads worksheet."""
+        try:
+            self.input_sheet = self.client.open(self.input_sheet_name)
+            logger.info(f"✓ Found existing input sheet: {self.input_sheet_name}")
+        except gspread.SpreadsheetNotFound:
+            self.input_sheet = self.client.create(self.input_sheet_name)
+            if not self.input_worksheet_name:
+                self._setup_input_sheet_headers()
+            logger.info(f"✓ Created input sheet: {self.input_sheet_name}")
+        
+        self._input_ws = None
+        if self.input_worksheet_name:
+            try:
+                self._input_ws = self.input_sheet.worksheet(self.input_worksheet_name)
+            except gspread.WorksheetNotFound:
+                self._input_ws = self.input_sheet.add_worksheet(self.input_worksheet_name, rows=1000, cols=len(INPUT_SHEET_HEADERS))
+                self._setup_input_sheet_headers(self._input_ws)
+                logger.info(f"✓ Created input worksheet: {self.sheet_key}")
+
+    def _input_worksheet(self) -> gspread.Worksheet:
+        """The leads worksheet, resolved once (Spreadsheet.sheet1 costs a metadata call on every access)."""
+        if self._input_ws is None:
+            if self.input_worksheet_name:
+                self._input_ws = self.input_sheet.worksheet(self.input_worksheet_name)
+            else:
+                self._input_ws = self.input_sheet.sheet1
+        return self._input_ws
+
+    def _setup_input_sheet_headers(self, worksheet: Optional[gspread.Worksheet] = None):
         """Set up headers for the input leads sheet."""
-        worksheet = self.input_sheet.sheet1
-        worksheet.update_title("Leads")
+        if worksheet is None:
+            worksheet = self.input_sheet.sheet1
+            worksheet.update_title("Leads")
         
-        headers = [
-            "email",
-            "first_name",
-            "last_name",
-            "role",
-            "business_name",
-            "business_type",
-            "domain",
-            "state",
-            "city",
-            "phone",
-            "status",           # pending, email_1_sent, email_2_sent, replied, bounced
-            "email_verified",   # verified, invalid, unchecked
-            "email_1_sent_at",
-            "email_2_sent_at",
-            "sender_email",
-            "notes",
-            "custom_data"
-        ]
+        headers = INPUT_SHEET_HEADERS
         
         # Calculate exactly based on headers list to avoid [400] error
         num_cols = len(headers)
@@ -333,99 +920,115 @@ class GoogleSheetsClient:
     
     def get_pending_leads(self, limit: int = 100, min_row: int = 0) -> List[Dict[str, Any]]:
         """Get leads that haven't been contacted yet, optionally starting from a specific row."""
-        all_records = self._fetch_all_records()
+        self._read_records()
         
         # --- NUCLEAR OPTION: HARD FILTER ---
         # Double-check against suppression DB in case the sheet is out of sync
-        try:
-            from mailreef_automation.suppression_manager import SuppressionManager
-            sm = SuppressionManager()
-        except:
-            sm = None
+        if self._suppression is None:
+            try:
+                from mailreef_automation.suppression_manager import SuppressionManager
+                self._suppression = SuppressionManager()
+            except:
+                self._suppression = False
+        sm = self._suppression or None
 
         # --- GLOBAL STATUS CHECK (CRITICAL FOR DUPLICATES) ---
         # If ANY row for an email is 'replied', 'bounced', etc., do NOT send to any other row for that email.
-        terminal_statuses = {'replied', 'bounced', 'unsubscribed', 'opt_out', 'do_not_contact'}
-        globally_suppressed_emails = set()
-        
-        for record in all_records:
-            status = str(record.get('status', '')).lower().strip()
-            email = str(record.get('email', '')).lower().strip()
-            if status in terminal_statuses:
-                globally_suppressed_emails.add(email)
-
+        # Both checks are index lookups; we only walk the pending rows we actually hand out.
         pending = []
         seen_emails = set()
+        last_row = min_row - 1
+        chunk_size = max(limit * 2, 50)
         
-        for record in all_records:
-            # Row Filter
-            if min_row > 0 and record.get('_row', 0) < min_row:
-                continue
-
-            if record.get('status', '').lower() in ['', 'pending']:
-                email = record.get('email', '').lower().strip()
-                
-                # In-Memory Deduplication (prevent picking up duplicates in same run)
-                if email in seen_emails:
-                    logger.debug(f"Skipping duplicate email in pending list: {email}")
-                    continue
-                
-                # Global Status Check
-                if email in globally_suppressed_emails:
-                    logger.warning(f"🚫 [GLOBAL FILTER] Skipping {email} because another row has status 'replied/bounced'")
-                    continue
-
-                if sm and email and sm.is_suppressed(email):
+        while len(pending) < limit:
+            candidates = []
+            with self._index_lock:
+                start = bisect.bisect_right(self._pending_rows, last_row)
+                chunk = self._pending_rows[start:start + chunk_size]
+                for row in chunk:
+                    record = self._row_index.get(row)
+                    if not record:
+                        continue
+                    email = str(record.get('email', '')).lower().strip()
+                    
+                    # In-Memory Deduplication (prevent picking up duplicates in same run)
+                    if email in seen_emails:
+                        logger.debug(f"Skipping duplicate email in pending list: {email}")
+                        continue
+                    
+                    # Global Status Check
+                    if self._is_globally_suppressed(email):
+                        logger.warning(f"🚫 [GLOBAL FILTER] Skipping {email} because another row has status 'replied/bounced'")
+                        continue
+                    
+                    seen_emails.add(email)
+                    candidates.append((email, record))
+            if not chunk:
+                break
+            last_row = chunk[-1]
+            
+            # One suppression query per chunk instead of one connection per candidate
+            suppressed = sm.filter_suppressed([email for email, _ in candidates]) if sm else set()
+            for email, record in candidates:
+                if email in suppressed:
                     logger.warning(f"🚫 [HARD FILTER] Skipping suppressed lead found in pending list: {email}")
                     continue
-                
                 pending.append(record)
-                seen_emails.add(email)
-            
-            if len(pending) >= limit:
-                break
+                if len(pending) >= limit:
+                    break
         
         logger.info(f"Found {len(pending)} pending leads (Limit: {limit}, Min Row: {min_row})")
-        return pending
+        return self._hydrate_records(pending)
     
     def get_leads_for_followup(self, days_since_email_1: int = 3, 
                                sender_email: Optional[str] = None,
                                limit: int = 100) -> List[Dict[str, Any]]:
         """Get leads that received Email 1 and are due for Email 2."""
-        all_records = self._fetch_all_records()
+        self._read_records()
         
         followup_leads = []
         now = datetime.now()
+        cutoff = now - timedelta(days=days_since_email_1)
         
-        for record in all_records:
-            # Must match sender email if specified
-            if sender_email and record.get('sender_email') != sender_email:
+        # Indexed on (sender_email, status, email_1_sent_at); re-check the date in Python
+        # because the SQL filter is a string comparison on whatever is in the cell.
+        rows = self._mirror.followup_rows(cutoff.isoformat(), sender_email=sender_email, limit=limit * 2)
+        for record in self._records_at(rows):
+            if record.get('status') != 'email_1_sent':
                 continue
-                
-            if record.get('status') == 'email_1_sent':
-                sent_at_str = record.get('email_1_sent_at', '')
-                if sent_at_str:
-                    try:
-                        sent_at = datetime.fromisoformat(sent_at_str)
-                        days_elapsed = (now - sent_at).days
-                        if days_elapsed >= days_since_email_1:
-                            followup_leads.append(record)
-                    except ValueError:
-                        pass
+            try:
+                sent_at = datetime.fromisoformat(str(record.get('email_1_sent_at', '')))
+                if (now - sent_at).days >= days_since_email_1:
+                    followup_leads.append(record)
+            except (ValueError, TypeError):
+                pass
             
             if len(followup_leads) >= limit:
                 break
         
         logger.info(f"Found {len(followup_leads)} leads due for follow-up (Sender: {sender_email or 'Any'})")
-        return followup_leads
+        return self._hydrate_records(followup_leads)
     
+    def get_followup_candidates(self) -> List[Dict[str, Any]]:
+        """Every lead at 'email_1_sent' (one in-memory pass) -- input for the scheduler's FollowupIndex."""
+        return [r for r in self._read_records() if r.get('status') == 'email_1_sent']
+
+    def hydrate_leads(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Load lazily-fetched heavy columns for leads picked outside get_pending_leads/get_leads_for_followup."""
+        return self._hydrate_records(records)
+
     @retry_on_quota
     def update_lead_status(self, email: str, status: str, 
                            sent_at: Optional[datetime] = None,
                            sender_email: Optional[str] = None,
-                           row: Optional[int] = None):
-        """Update a lead's status after sending an email."""
-        worksheet = self.input_sheet.sheet1
+                           row: Optional[int] = None,
+                           shard: Optional[str] = None):
+        """Update a lead's status after sending an email.
+
+        shard is the other half of a ShardedSheetsClient (shard, row) address; a
+        single-sheet client is its own only shard, so it is accepted and ignored here.
+        """
+        worksheet = self._input_worksheet()
         
         # Priority: Use explicit Row if provided (Fixes duplicate email bug)
         if row and row > 1:
@@ -434,10 +1037,22 @@ class GoogleSheetsClient:
             # Fallback to search
             # Find the row with this email
             try:
-                # Check cache for row if possible
+                # Check cache/mirror/domain index for row if possible
+                self._read_records()
                 cached_record = self._cache.get(email)
-                if cached_record and cached_record.get('_row'):
+                mirror_rows = [] if cached_record else self._mirror.rows_for_email(email)
+                domain_lead = None
+                if not cached_record and not mirror_rows and status == 'replied' and '@' in email:
+                    # Fallback: If exact email fails, try domain if it's a 'replied' status
+                    domain_lead = self._find_lead_by_domain(email.split('@')[-1])
+                
+                if cached_record and cached_record.get('_row', -1) > 1:
                     row = cached_record['_row']
+                elif mirror_rows:
+                    row = mirror_rows[0]
+                elif domain_lead:
+                    logger.info(f"🔄 [DOMAIN FALLBACK] Retrying status update for {domain_lead['email']} (from {email})")
+                    return self.update_lead_status(domain_lead['email'], status, sent_at, sender_email, row=domain_lead['_row'])
                 else:
                     # Fallback to search if not in cache (should be rare)
                     cell = worksheet.find(email)
@@ -449,52 +1064,37 @@ class GoogleSheetsClient:
                  logger.error(f"Error finding row for {email}: {e}")
                  return
 
+        # Columns to write (sheet header -> value)
+        sent_field = {'email_1_sent': 'email_1_sent_at', 'email_2_sent': 'email_2_sent_at'}.get(status)
+        fields = {'status': status}
+        if sent_at and sent_field:
+            fields[sent_field] = sent_at.isoformat()
+        if sender_email:
+            fields['sender_email'] = sender_email
+
         try:
-            # Get column indices (Use a small cache for headers too)
-            if not hasattr(self, '_headers_cache') or not self._headers_cache:
-                self._headers_cache = worksheet.row_values(1)
-            headers = self._headers_cache
-            
-            # Prepare batch updates
-            cell_list = []
-            
-            status_col = headers.index('status') + 1
-            cell_list.append(gspread.Cell(row, status_col, status))
-            
-            if sent_at:
-                if status == 'email_1_sent':
-                    col = headers.index('email_1_sent_at') + 1
-                elif status == 'email_2_sent':
-                    col = headers.index('email_2_sent_at') + 1
-                elif status == 'replied':
-                     # We don't have a 'replied_at' column necessarily, but we can add one if needed.
-                     # For now, just update status.
-                     col = None
-                else:
-                    col = None
-                
-                if col:
-                    cell_list.append(gspread.Cell(row, col, sent_at.isoformat()))
-            
-            if sender_email:
-                try:
-                    sender_col = headers.index('sender_email') + 1
-                    cell_list.append(gspread.Cell(row, sender_col, sender_email))
-                except ValueError:
-                    pass # sender_email column might not exist
-            # Perform Batch Update
-            worksheet.update_cells(cell_list)
-            logger.info(f"✓ Updated status for {email} (Row {row}) to {status}")
+            if self._write_queue is not None:
+                # --- WRITE-BEHIND ---
+                # Journal locally (crash-safe); the flusher coalesces it into one batch_update
+                self._write_queue.enqueue(row, email, fields)
+                logger.info(f"✓ Queued status for {email} (Row {row}) -> {status}")
+            else:
+                worksheet.update_cells(self._build_status_cells(worksheet, row, fields))
+                logger.info(f"✓ Updated status for {email} (Row {row}) to {status}")
             
             # --- CRITICAL BUG FIX (DUPLICATE EMAILS) ---
             # Even on success, we MUST update the local memory cache immediately.
             # Otherwise, get_pending_leads will continue returning this email as "pending"
             # for up to 5 minutes until the global records cache expires.
-            if email in self._cache:
-                self._cache[email].update({
-                    'status': status,
-                    'sender_email': sender_email or self._cache[email].get('sender_email')
-                })
+            # (Mirroring every written column also keeps the delta sync from re-downloading our own writes.)
+            with self._index_lock:
+                # Resolved under the lock so a concurrent sync can't swap the records out from under us
+                touched = {id(r): r for r in (self._cache.get(email), self._row_index.get(row)) if r}.values()
+                for record in touched:
+                    self._unindex_record(record)
+                    record.update(fields)
+                    self._index_record(record)
+            self._mirror.upsert([r for r in touched if r.get('_row', -1) > 1])
                 
         except Exception as e:
             logger.error(f"Failed to update lead status for {email}: {e}")
@@ -507,83 +1107,227 @@ class GoogleSheetsClient:
                 })
             
             logger.info(f"Updated {email} status to {status} (Batch)")
-            
-        except Exception as e:
-            # Fallback: If exact email fails, try domain if it's a 'replied' status
-            if status == 'replied' and '@' in email:
-                domain = email.split('@')[-1]
-                if domain not in ['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']:
-                    records = self._fetch_all_records()
-                    for rec in records:
-                        rec_email = str(rec.get('email', '')).lower()
-                        if f"@{domain}" in rec_email:
-                            logger.info(f"🔄 [DOMAIN FALLBACK] Retrying status update for {rec_email} (from {email})")
-                            return self.update_lead_status(rec_email, status, sent_at, sender_email)
-            
-            logger.error(f"Error updating status for {email}: {e}")
     
+    def _build_status_cells(self, worksheet, row: int, fields: Dict[str, str]) -> List[gspread.Cell]:
+        """Map {header: value} to cells for one row (the status column is mandatory)."""
+        # Get column indices (Use a small cache for headers too)
+        if not hasattr(self, '_headers_cache') or not self._headers_cache:
+            self._headers_cache = worksheet.row_values(1)
+        headers = self._headers_cache
+        
+        cell_list = [gspread.Cell(row, headers.index('status') + 1, fields['status'])]
+        for field, value in fields.items():
+            if field != 'status' and field in headers: # sender_email column might not exist
+                cell_list.append(gspread.Cell(row, headers.index(field) + 1, value))
+        return cell_list
+
     @retry_on_quota
-    def add_lead(self, lead_data: Dict[str, Any]) -> bool:
+    def _flush_status_writes(self, entries: List[tuple]):
         """
-        Add a new lead to the input sheet.
-        Checks for duplicates based on email or domain/phone within the cache if possible.
+        Write-behind flush target: every queued row in a single batch_update call.
+
+        Journal entries are keyed by sheet row, which can shift between enqueue and
+        flush (or replay after a restart). Each row is checked against the email it
+        was queued for, re-resolved if the lead moved, and dropped if it is gone.
         """
+        if self.input_sheet is None:
+            raise RuntimeError("input sheet not opened yet")
+        worksheet = self._input_worksheet()
+        patches = {}
+        for row, fields in self._resolve_journal_rows(worksheet, entries):
+            patches.setdefault(row, {}).update(fields)
+        if not patches:
+            return
+        data = [
+            {'range': cell.address, 'values': [[cell.value]]}
+            for row, fields in patches.items()
+            for cell in self._build_status_cells(worksheet, row, fields)
+        ]
+        worksheet.batch_update(data)
+
+    def _resolve_journal_rows(self, worksheet, entries: List[tuple]) -> List[tuple]:
+        """[(row, email, fields)] -> [(current row, fields)] using the sheet's email column."""
+        if not hasattr(self, '_headers_cache') or not self._headers_cache:
+            self._headers_cache = worksheet.row_values(1)
+        norm_headers = [self._normalize_header(h) for h in self._headers_cache]
+        if 'email' not in norm_headers:
+            logger.warning("⚠️ [WRITE-BEHIND] No email column; writing queued rows unverified")
+            return [(row, fields) for row, _, fields in entries]
+        letter = self._col_letter(norm_headers.index('email') + 1)
+
+        def _norm(value) -> str:
+            return str(value or '').lower().strip()
+
+        # One small read: the email cell of every queued row
+        rows = sorted({row for row, _, _ in entries})
+        cells = worksheet.batch_get([f"{letter}{row}" for row in rows])
+        current = {row: _norm(cell[0][0]) if cell and cell[0] else '' for row, cell in zip(rows, cells)}
+
+        resolved, moved = [], []
+        for row, email, fields in entries:
+            if not email or current.get(row) == _norm(email):
+                resolved.append((row, fields))
+            else:
+                moved.append((row, email, fields))
+        if not moved:
+            return resolved
+
+        # Some leads moved: find them in the full email column (first matching row wins)
+        column = worksheet.batch_get([f"{letter}2:{letter}"])[0]
+        email_rows = {}
+        for offset, cell in enumerate(column):
+            email_rows.setdefault(_norm(cell[0]) if cell else '', offset + 2)
+        for row, email, fields in moved:
+            new_row = email_rows.get(_norm(email))
+            if new_row is None:
+                logger.warning(f"⚠️ [WRITE-BEHIND] Dropping queued {fields.get('status', 'update')} for {email}: "
+                               f"no longer in the sheet (was row {row})")
+                continue
+            logger.info(f"↪️ [WRITE-BEHIND] {email} moved from row {row} to {new_row}; writing there")
+            resolved.append((new_row, fields))
+        return resolved
+
+    def _pending_status_writes(self) -> Dict[int, Dict[str, str]]:
+        """Journaled writes not yet on the sheet ({row: {header: value}})."""
+        if self._write_queue is None:
+            return {}
         try:
-            worksheet = self.input_sheet.sheet1
-            
-            # 1. basic deduplication check against local cache
-            # (Note: cache might not be 100% up to date if we don't fetch often, 
-            # but it catches immediate duplicates in a loop)
-            email = lead_data.get('email', '').lower().strip()
-            domain = lead_data.get('domain', '').lower().strip()
-            
-            if email and email in self._cache:
+            return self._write_queue.pending()
+        except Exception as e:
+            logger.warning(f"Could not read write journal: {e}")
+            return {}
+
+    def flush_writes(self) -> int:
+        """Push queued status writes now. Returns the number of rows written."""
+        if self._write_queue is None:
+            return 0
+        return self._write_queue.flush()
+
+    def close(self):
+        """Flush buffered leads and queued writes and stop the background flusher (call on shutdown)."""
+        self.flush_leads()
+        if self._write_queue is not None:
+            self._write_queue.close()
+
+    def quota_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Shared Sheets API quota usage (calls this minute, tokens left, current wait) per read/write bucket."""
+        return get_governor().metrics()
+
+    @staticmethod
+    def _lead_row(lead_data: Dict[str, Any]) -> List[Any]:
+        """Input-sheet row for a new lead."""
+        # Headers: email, first_name, last_name, role, business_name, business_type, domain, state, city, phone, status, email_verified, ...
+        return [
+            lead_data.get('email', '').lower().strip(),
+            lead_data.get('first_name', ''),
+            lead_data.get('last_name', ''),
+            lead_data.get('role', ''),
+            lead_data.get('business_name', ''),
+            lead_data.get('business_type', 'Business'),
+            lead_data.get('domain', '').lower().strip(),
+            lead_data.get('state', ''),
+            lead_data.get('city', ''),
+            lead_data.get('phone', ''),
+            lead_data.get('status', 'pending'),
+            lead_data.get('email_verified', 'unchecked'),
+            "", # email_1_sent_at
+            "", # email_2_sent_at
+            "", # sender_email
+            lead_data.get('notes', ''),
+            lead_data.get('custom_data', '')
+        ]
+
+    def add_lead(self, lead_data: Dict[str, Any]) -> bool:
+        """
+        Add a new lead to the input sheet now (bypasses the add_leads buffer).
+        Returns True once the row is written; False for a duplicate or a failed append.
+        """
+        email = lead_data.get('email', '').lower().strip()
+        with self._add_lock:
+            if email and (email in self._cache or email in self._add_buffer_emails):
                 logger.info(f"Skipping duplicate email: {email}")
                 return False
+            try:
+                start_row = self._append_lead_rows([self._lead_row(lead_data)])
+            except Exception as e:
+                logger.error(f"Failed to add lead: {e}")
+                return False
+            self._cache_added_lead(lead_data, start_row)
+        return True
 
-            # 2. Prepare Row
-            # Headers: email, first_name, last_name, role, business_name, business_type, domain, state, city, phone, status, email_verified, ...
-            
-            row = [
-                email,
-                lead_data.get('first_name', ''),
-                lead_data.get('last_name', ''),
-                lead_data.get('role', ''),
-                lead_data.get('business_name', ''),
-                lead_data.get('business_type', 'Business'),
-                domain,
-                lead_data.get('state', ''),
-                lead_data.get('city', ''),
-                lead_data.get('phone', ''),
-                lead_data.get('status', 'pending'),
-                lead_data.get('email_verified', 'unchecked'),
-                "", # email_1_sent_at
-                "", # email_2_sent_at
-                "", # sender_email
-                lead_data.get('notes', ''),
-                lead_data.get('custom_data', '')
-            ]
-            
-            worksheet.append_row(row)
-            
-            # Update cache
-            if email:
-                new_record = lead_data.copy()
-                new_record['_row'] = -1 # Unknown row until refresh, but exists
-                self._cache[email] = new_record
+    def add_leads(self, leads: List[Dict[str, Any]], flush: bool = True) -> int:
+        """
+        Buffer new leads for the input sheet and return how many were accepted.
+
+        Duplicates (by email) of cached or already-buffered leads are skipped.
+        The buffer is written with append_rows every ADD_LEADS_CHUNK_SIZE rows,
+        and whatever is left is written now unless flush=False (call flush_leads() later).
+        """
+        accepted = 0
+        with self._add_lock:
+            for lead_data in leads:
+                # (Note: cache might not be 100% up to date if we don't fetch often,
+                # but it catches immediate duplicates in a loop)
+                email = lead_data.get('email', '').lower().strip()
+                if email and (email in self._cache or email in self._add_buffer_emails):
+                    logger.info(f"Skipping duplicate email: {email}")
+                    continue
+                self._add_buffer.append(lead_data)
+                if email:
+                    self._add_buffer_emails.add(email)
+                accepted += 1
+            full = len(self._add_buffer) >= ADD_LEADS_CHUNK_SIZE
+        
+        if flush or full:
+            self.flush_leads(partial=flush)
+        return accepted
+
+    def flush_leads(self, partial: bool = True) -> int:
+        """Append buffered leads in ADD_LEADS_CHUNK_SIZE chunks (only full chunks if partial=False). Returns the number written."""
+        written = 0
+        with self._add_lock:
+            while len(self._add_buffer) >= (1 if partial else ADD_LEADS_CHUNK_SIZE):
+                chunk = self._add_buffer[:ADD_LEADS_CHUNK_SIZE]
+                try:
+                    start_row = self._append_lead_rows([self._lead_row(lead) for lead in chunk])
+                except Exception as e:
+                    # Chunk stays buffered; the next flush (or close()) retries it
+                    logger.error(f"Failed to add {len(chunk)} leads: {e}")
+                    break
+                del self._add_buffer[:len(chunk)]
                 
-            logger.info(f"✓ Added lead: {lead_data.get('business_name')} ({email})")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to add lead: {e}")
-            return False
+                # Update cache with the rows Google actually wrote to
+                for offset, lead_data in enumerate(chunk):
+                    self._add_buffer_emails.discard(lead_data.get('email', '').lower().strip())
+                    self._cache_added_lead(lead_data, start_row + offset if start_row else None)
+                written += len(chunk)
+        return written
+
+    def buffered_leads(self) -> List[Dict[str, Any]]:
+        """Leads accepted by add_leads but not written yet (a snapshot, in write order)."""
+        with self._add_lock:
+            return list(self._add_buffer)
+
+    def _cache_added_lead(self, lead_data: Dict[str, Any], row: Optional[int]):
+        """Record a lead just appended at `row` (None if Google didn't say) in the email cache."""
+        email = lead_data.get('email', '').lower().strip()
+        if email:
+            new_record = lead_data.copy()
+            new_record['_row'] = row or -1
+            self._cache[email] = new_record
+        logger.info(f"✓ Added lead: {lead_data.get('business_name')} ({email})")
+
+    @retry_on_quota
+    def _append_lead_rows(self, rows: List[List[Any]]) -> Optional[int]:
+        """One append_rows call; returns the first sheet row written (None if Google didn't say)."""
+        response = self._input_worksheet().append_rows(rows)
+        updated_range = (response or {}).get('updates', {}).get('updatedRange', '')
+        match = re.search(r'![A-Z]+(\d+)', updated_range)
+        return int(match.group(1)) if match else None
 
     @retry_on_quota
     def log_reply(self, reply_data: Dict[str, Any]):
         """Log a reply to the replies sheet, auto-enriching with lead data if possible."""
-        worksheet = self.replies_sheet.sheet1
-        
         from_email = str(reply_data.get('from_email', '')).lower().strip()
         
         # --- AUTO-ENRICHMENT ---
@@ -593,58 +1337,71 @@ class GoogleSheetsClient:
         
         # If missing, try to find in the leads sheet
         if not school_name or not role:
-            # This uses the cached _all_records_cache from _fetch_all_records
-            all_records = self._fetch_all_records()
-            lead = self._cache.get(from_email)
-            
-            # DOMAIN FALLBACK: If not found by email, try by domain
-            if not lead and '@' in from_email:
-                domain = from_email.split('@')[-1]
-                # Ignore common generic domains
-                if domain not in ['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']:
-                    for rec in all_records:
-                        rec_email = str(rec.get('email', '')).lower()
-                        if f"@{domain}" in rec_email or domain == rec.get('domain', '').lower():
-                            lead = rec
-                            logger.info(f"🔍 [DOMAIN MATCH] Associated {from_email} with lead {rec_email} via domain {domain}")
-                            break
-
+            lead = self._find_reply_lead(from_email, reply_data.get('subject', ''))
             if lead:
                 school_name = school_name or lead.get('school_name', '')
                 role = role or lead.get('role', '')
                 logger.info(f"✨ [ENRICH] Found lead info for {from_email}: {school_name} / {role}")
-            else:
-                # SUBJECT-BASED FALLBACK: Look for recent sends with this subject
-                # Subject in reply is usually "Re: Boosting Enrollment"
-                reply_subject = str(reply_data.get('subject', '')).lower()
-                clean_subject = reply_subject.replace('re:', '').replace('fwd:', '').strip()
+
+        self._append_reply_row(reply_data, from_email, school_name, role)
+        
+        # Also update the lead status in input sheet
+        # CRITICAL: Use the lead's actual email if found via domain/enrichment
+        update_email = lead.get('email', from_email) if lead else from_email
+        self.update_lead_status(update_email, 'replied')
+
+    def _lead_for_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Exact email match from memory / the local mirror (no Google API call once warm)."""
+        self._read_records()
+        lead = self._cache.get(email)
+        if not lead:
+            lead = next(iter(self._records_at(self._mirror.rows_for_email(email))), None)
+        return lead
+
+    def _find_reply_lead(self, from_email: str, subject: str, exact: bool = True) -> Optional[Dict[str, Any]]:
+        """Attribute a reply to a lead: exact email, then website/email domain, then a name in the subject."""
+        lead = self._lead_for_email(from_email) if exact else None
+        
+        # DOMAIN FALLBACK: If not found by email, try by domain
+        if not lead and '@' in from_email:
+            domain = from_email.split('@')[-1]
+            # Generic domains are ignored by the index lookup
+            lead = self._find_lead_by_domain(domain)
+            if lead:
+                logger.info(f"🔍 [DOMAIN MATCH] Associated {from_email} with lead {lead.get('email')} via domain {domain}")
+
+        if not lead:
+            # SUBJECT-BASED FALLBACK: Look for recent sends with this subject
+            # Subject in reply is usually "Re: Boosting Enrollment"
+            reply_subject = str(subject).lower()
+            clean_subject = reply_subject.replace('re:', '').replace('fwd:', '').strip()
+            
+            if len(clean_subject) > 10: # Only try for non-generic subjects
+                logger.info(f"🔍 [SUBJECT MATCH] Attempting to find lead for subject: {clean_subject}")
                 
-                if len(clean_subject) > 10: # Only try for non-generic subjects
-                    logger.info(f"🔍 [SUBJECT MATCH] Attempting to find lead for subject: {clean_subject}")
-                    
-                    # Heuristic list of known subject fragments from templates
-                    known_fragments = ["quick question", "supporting families", "boosting enrollment", 
-                                       "academic outcomes", "differentiation", "merit scholarship",
-                                       "college readiness", "student-athletes", "test prep", 
-                                       "enhancing value", "enrollment value",
-                                       "i want to get", "5 new clients", "new clients",
-                                       "had an idea for you", "idea for", "thought about"]
+                # Heuristic list of known subject fragments from templates
+                known_fragments = ["quick question", "supporting families", "boosting enrollment", 
+                                   "academic outcomes", "differentiation", "merit scholarship",
+                                   "college readiness", "student-athletes", "test prep", 
+                                   "enhancing value", "enrollment value",
+                                   "i want to get", "5 new clients", "new clients",
+                                   "had an idea for you", "idea for", "thought about"]
+                
+                if any(frag in clean_subject for frag in known_fragments):
+                    # Find leads who were contacted and whose school name is in the subject (Dynamic templates).
+                    # If school name is in the subject, it's a very high confidence match
+                    rec = self._find_lead_by_subject(clean_subject)
+                    if rec:
+                        lead = rec
+                        s_name = rec.get('school_name') or rec.get('business_name')
+                        logger.info(f"🎯 [ENRICH] Dynamic Subject Match! {from_email} -> {rec.get('email')} (School: {s_name})")
                     
-                    if any(frag in clean_subject for frag in known_fragments):
-                        # Find leads who were contacted TODAY or have a suspicious status
-                        # and whose school name might be in the subject (Dynamic templates)
-                        for rec in all_records:
-                            if rec.get('status') in ['email_1_sent', 'email_2_sent']:
-                                # If school name is in the subject, it's a very high confidence match
-                                s_name = str(rec.get('school_name', '')).lower()
-                                if s_name and s_name in clean_subject:
-                                    lead = rec
-                                    logger.info(f"🎯 [ENRICH] Dynamic Subject Match! {from_email} -> {rec.get('email')} (School: {s_name})")
-                                    break
-                        
-                        # Fallback: if we still don't have a lead, but it's clearly a reply to us
-                        # we still log it as 'Neutral' sender in log_reply (already handled by defaults)
+                    # Fallback: if we still don't have a lead, but it's clearly a reply to us
+                    # we still log it as 'Neutral' sender in log_reply (already handled by defaults)
+        return lead
 
+    def _append_reply_row(self, reply_data: Dict[str, Any], from_email: str, school_name: str, role: str):
+        worksheet = self.replies_sheet.sheet1
         row = [
             reply_data.get('received_at', datetime.now().isoformat()),
             from_email,
@@ -663,11 +1420,6 @@ class GoogleSheetsClient:
         
         worksheet.append_row(row)
         logger.info(f"Logged reply from {from_email}")
-        
-        # Also update the lead status in input sheet
-        # CRITICAL: Use the lead's actual email if found via domain/enrichment
-        update_email = lead.get('email', from_email) if lead else from_email
-        self.update_lead_status(update_email, 'replied')
 
     @retry_on_quota
     def clear_replies(self):
@@ -810,6 +1562,240 @@ class GoogleSheetsClient:
             logger.warning(f"⚠️ Could not apply some formatting: {e}")
 
 
+class ShardedSheetsClient:
+    """
+    One logical lead table spread over several shard worksheets/spreadsheets.
+
+    Each shard is a full GoogleSheetsClient (own caches, mirror and write
+    journal); this facade fetches them concurrently and merges their results.
+    Leads it hands out carry a '_shard' key, so a status write is addressed by
+    (shard, row) exactly like the single-sheet (row) fix. Shards are given as
+    "Spreadsheet Name" or "Spreadsheet Name::Worksheet"; new leads go to the last shard.
+    """
+
+    def __init__(self, shards: List[str], replies_sheet_name=REPLIES_SHEET_NAME, replies_sheet_id=None,
+                 write_behind: Optional[bool] = None, client: Optional[gspread.Client] = None):
+        if not shards:
+            raise ValueError("ShardedSheetsClient needs at least one shard")
+        
+        self.shards: List[GoogleSheetsClient] = []
+        for spec in shards:
+            sheet_name, _, worksheet = str(spec).partition(SHARD_SEPARATOR)
+            primary = self.shards[0] if self.shards else None
+            self.shards.append(GoogleSheetsClient(
+                input_sheet_name=sheet_name,
+                replies_sheet_name=replies_sheet_name,
+                replies_sheet_id=replies_sheet_id,
+                write_behind=write_behind,
+                input_worksheet=worksheet or None,
+                client=primary.client if primary else client
+            ))
+        self._by_key = {shard.sheet_key: shard for shard in self.shards}
+        self.input_sheet_name = self.shards[0].input_sheet_name
+        self.logger = logger
+
+    @property
+    def client(self):
+        return self.shards[0].client
+
+    @property
+    def replies_sheet(self):
+        return self.shards[0].replies_sheet
+
+    def setup_sheets(self) -> Dict[str, str]:
+        """Open every shard; the first shard also owns the replies sheet."""
+        results = self.shards[0].setup_sheets()
+        for shard in self.shards[1:]:
+            shard._open_input_sheet()
+        results['input_shards'] = [shard.sheet_key for shard in self.shards]
+        return results
+
+    def _parallel(self, fn, shards: Optional[List[GoogleSheetsClient]] = None) -> list:
+        """Run fn(shard) for each shard concurrently; results in shard order."""
+        shards = self.shards if shards is None else shards
+        if len(shards) <= 1:
+            return [fn(shard) for shard in shards]
+        with ThreadPoolExecutor(max_workers=min(SHEETS_SHARD_WORKERS, len(shards))) as pool:
+            return list(pool.map(fn, shards))
+
+    def _warm(self):
+        """Make sure every shard has records in memory, loading cold ones concurrently."""
+        cold = [shard for shard in self.shards if shard._all_records_cache is None]
+        if cold:
+            self._parallel(lambda shard: shard._read_records(), cold)
+
+    def _fetch_all_records(self):
+        """All leads of every shard (fetched concurrently), in shard order."""
+        results = self._parallel(lambda shard: shard._fetch_all_records())
+        return [r for records in results for r in records]
+
+    @staticmethod
+    def _tag(shard: GoogleSheetsClient, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for record in records:
+            record['_shard'] = shard.sheet_key
+        return records
+
+    def _is_globally_suppressed(self, email: str) -> bool:
+        return any(shard._is_globally_suppressed(email) for shard in self.shards)
+
+    def get_pending_leads(self, limit: int = 100, min_row: int = 0) -> List[Dict[str, Any]]:
+        """Pending leads across shards in shard order (min_row applies within each shard)."""
+        self._warm()
+        
+        pending = []
+        seen_emails = set()
+        for shard in self.shards:
+            last_row = min_row - 1
+            while len(pending) < limit:
+                want = limit - len(pending)
+                batch = shard.get_pending_leads(limit=want, min_row=last_row + 1)
+                for record in batch:
+                    email = str(record.get('email', '')).lower().strip()
+                    # A replied/bounced row in ANY shard blocks the email everywhere
+                    if email in seen_emails or self._is_globally_suppressed(email):
+                        logger.warning(f"🚫 [GLOBAL FILTER] Skipping {email}: duplicate or blocked in another shard")
+                        continue
+                    seen_emails.add(email)
+                    pending.append(self._tag(shard, [record])[0])
+                if len(batch) < want:
+                    break # Shard exhausted
+                last_row = batch[-1]['_row']
+            if len(pending) >= limit:
+                break
+        
+        logger.info(f"Found {len(pending)} pending leads across {len(self.shards)} shards (Limit: {limit})")
+        return pending
+
+    def get_leads_for_followup(self, days_since_email_1: int = 3,
+                               sender_email: Optional[str] = None,
+                               limit: int = 100) -> List[Dict[str, Any]]:
+        self._warm()
+        followup_leads = []
+        for shard in self.shards:
+            if len(followup_leads) >= limit:
+                break
+            batch = shard.get_leads_for_followup(days_since_email_1, sender_email=sender_email,
+                                                 limit=limit - len(followup_leads))
+            followup_leads.extend(self._tag(shard, batch))
+        return followup_leads
+
+    def get_followup_candidates(self) -> List[Dict[str, Any]]:
+        self._warm()
+        return [r for shard in self.shards for r in self._tag(shard, shard.get_followup_candidates())]
+
+    def hydrate_leads(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for shard in self.shards:
+            shard.hydrate_leads([r for r in records if r.get('_shard') == shard.sheet_key])
+        return records
+
+    def _locate(self, email: str, row: Optional[int] = None) -> Optional[GoogleSheetsClient]:
+        """Shard holding this email (at this row, if given): status index first, then each mirror."""
+        email = str(email).lower().strip()
+        self._warm()
+        for shard in self.shards:
+            with shard._index_lock:
+                rows = list(shard._email_rows.get(email, ()))
+            if rows and (row is None or row in rows):
+                return shard
+        for shard in self.shards:
+            rows = shard._mirror.rows_for_email(email)
+            if rows and (row is None or row in rows):
+                return shard
+        return None
+
+    def update_lead_status(self, email: str, status: str,
+                           sent_at: Optional[datetime] = None,
+                           sender_email: Optional[str] = None,
+                           row: Optional[int] = None,
+                           shard: Optional[str] = None):
+        """Route a status write to its shard: explicit (shard, row) address, else wherever the email lives."""
+        target = self._by_key.get(shard) if shard else self._locate(email, row)
+        if target is None and status == 'replied' and '@' in email:
+            # Fallback: If exact email fails, try domain if it's a 'replied' status
+            for candidate in self.shards:
+                domain_lead = candidate._find_lead_by_domain(email.split('@')[-1])
+                if domain_lead:
+                    logger.info(f"🔄 [DOMAIN FALLBACK] Retrying status update for {domain_lead['email']} (from {email})")
+                    return candidate.update_lead_status(domain_lead['email'], status, sent_at, sender_email, row=domain_lead['_row'])
+        if target is None:
+            # Unknown everywhere: let the first shard search its sheet (should be rare)
+            return self.shards[0].update_lead_status(email, status, sent_at, sender_email)
+        return target.update_lead_status(email, status, sent_at, sender_email, row=row)
+
+    def log_reply(self, reply_data: Dict[str, Any]):
+        """Log a reply to the replies sheet, enriching from whichever shard holds the lead."""
+        from_email = str(reply_data.get('from_email', '')).lower().strip()
+        school_name = reply_data.get('school_name', '')
+        role = reply_data.get('role', '')
+        lead, owner = None, None
+        
+        if not school_name or not role:
+            # An exact email match in any shard beats a domain/subject guess in an earlier one
+            for exact in (True, False):
+                for shard in self.shards:
+                    lead = shard._lead_for_email(from_email) if exact else shard._find_reply_lead(from_email, reply_data.get('subject', ''), exact=False)
+                    if lead:
+                        owner = shard
+                        break
+                if lead:
+                    break
+            if lead:
+                school_name = school_name or lead.get('school_name', '')
+                role = role or lead.get('role', '')
+                logger.info(f"✨ [ENRICH] Found lead info for {from_email} in {owner.sheet_key}: {school_name} / {role}")
+        
+        self.shards[0]._append_reply_row(reply_data, from_email, school_name, role)
+        
+        update_email = lead.get('email', from_email) if lead else from_email
+        self.update_lead_status(update_email, 'replied', shard=owner.sheet_key if owner else None)
+
+    def add_lead(self, lead_data: Dict[str, Any]) -> bool:
+        self._warm()
+        if self._locate(lead_data.get('email', '')):
+            return False
+        return self.shards[-1].add_lead(lead_data)
+
+    def add_leads(self, leads: List[Dict[str, Any]], flush: bool = True) -> int:
+        """New leads go to the newest (last) shard, deduped against every shard."""
+        self._warm()
+        fresh = [lead for lead in leads
+                 if not self._locate(lead.get('email', ''))]
+        return self.shards[-1].add_leads(fresh, flush=flush)
+
+    def flush_leads(self, partial: bool = True) -> int:
+        return sum(shard.flush_leads(partial=partial) for shard in self.shards)
+
+    def buffered_leads(self) -> List[Dict[str, Any]]:
+        return [lead for shard in self.shards for lead in shard.buffered_leads()]
+
+    def flush_writes(self) -> int:
+        return sum(shard.flush_writes() for shard in self.shards)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def quota_metrics(self) -> Dict[str, Dict[str, float]]:
+        return self.shards[0].quota_metrics()
+
+
+def sheets_client_for_profile(profile_config: Dict[str, Any], **kwargs):
+    """GoogleSheetsClient for a campaign profile, or a ShardedSheetsClient if it lists input_shards."""
+    if profile_config.get("input_shards"):
+        return ShardedSheetsClient(
+            profile_config["input_shards"],
+            replies_sheet_name=profile_config["replies_sheet"],
+            replies_sheet_id=profile_config.get("replies_sheet_id"),
+            **kwargs
+        )
+    return GoogleSheetsClient(
+        input_sheet_name=profile_config["input_sheet"],
+        replies_sheet_name=profile_config["replies_sheet"],
+        replies_sheet_id=profile_config.get("replies_sheet_id"),
+        **kwargs
+    )
+
+
 def setup_oauth():
     """Interactive setup for OAuth credentials."""
     print("\n" + "="*60)
@@ -56,26 +56,10 @@ def sync_replies(days_back: int = 14):
     # 4. Fetch and Filter Inbound Messages
     found_replies = []
     sync_run_seeds = set() # (email, date) to avoid duplicates in the same run
-    page = 1
-    scanning = True
-    
-    while scanning:
-        print(f"🔎 Scanning Mailreef Inbound Page {page}...")
-        res = mailreef.get_global_inbound(page=page, display=100)
-        messages = res.get('data', [])
-        
-        if not messages:
-            print("🏁 No more messages found.")
-            break
-            
-        for msg in messages:
+    print("🔎 Scanning Mailreef inbound (newest first)...")
+    try:
+        for msg in mailreef.iter_inbound(since_ts=cutoff_ts - 1):
             msg_ts = msg.get('ts', 0)
-            
-            # Stop if we hit messages older than cutoff
-            if msg_ts < cutoff_ts:
-                print(f"🛑 Reached message from {datetime.fromtimestamp(msg_ts)} (Older than 14 days). Stopping scan.")
-                scanning = False
-                break
                 
             from_email = str(msg.get('from_email', '')).lower().strip()
             subject = str(msg.get('subject_line', '')).strip()
@@ -118,11 +102,9 @@ def sync_replies(days_back: int = 14):
                     'action_taken': f'Recovered via 14-Day Audit ({match_type})',
                     'notes': f'Historical Sync Run on {datetime.now().strftime("%Y-%m-%d")}'
                 })
-        
-        if scanning:
-            page += 1
-            # Rate limit safety
-            time.sleep(0.5)
+        print(f"🏁 Scanned back to {days_back} days ago.")
+    except Exception as e:
+        print(f"❌ Inbound scan failed, continuing with {len(found_replies)} replies found so far: {e}")
             
     print(f"✨ Found {len(found_replies)} potential Ivy Bound replies.")
     
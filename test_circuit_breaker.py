@@ -0,0 +1,98 @@
+"""
+Circuit breaker state machine: closed -> open -> half_open -> closed (and half_open -> open).
+
+Pure logic, no network: run with `python -m pytest test_circuit_breaker.py` or directly.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from mailreef_automation import circuit_breaker
+from mailreef_automation.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Only the breaker module sees the fake clock
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def test_trips_after_threshold_and_recovers(clock):
+    tripped = threading.Event()
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60, on_trip=tripped.set)
+
+    # Closed: calls go out, failures below the threshold keep it closed
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(Exception("HTTP 503"))
+    assert breaker.state == CLOSED
+
+    # Threshold reached: open, fail fast, on_trip runs once
+    breaker.before_call()
+    breaker.record_failure(Exception("HTTP 503"))
+    assert breaker.state == OPEN
+    assert tripped.wait(timeout=2)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Reset timeout elapsed: half-open lets exactly one trial call through
+    clock.now += 60
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Trial succeeded: closed again, failure count reset
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    metrics = breaker.metrics()
+    assert metrics["trips"] == 1
+    assert metrics["consecutive_failures"] == 0
+    assert metrics["rejected_calls"] == 2
+
+
+def test_failed_trial_reopens_without_new_trip(clock):
+    trips = []
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, on_trip=lambda: trips.append(1))
+
+    breaker.record_failure(Exception("connect timeout"))
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure(Exception("connect timeout"))
+    assert breaker.state == OPEN # Re-opened, and the reset timeout starts over
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 29
+    assert breaker.state == OPEN
+    clock.now += 1
+    assert breaker.state == HALF_OPEN
+    # One trip per outage: re-opening from half-open does not count (or re-run diagnostics)
+    assert breaker.metrics()["trips"] == 1
+
+
+def test_success_resets_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,144 @@
+"""
+MailreefClient.iter_inbound: where a scan stops, duplicate handling across
+pages, and when the consumer's cursor moves (only after a scan that ran to its
+stop point or the end of the feed).
+
+No network: _fetch_inbound_page serves canned pages; cursors live in a temp SQLite file.
+Run with `python -m pytest test_inbound_cursor.py` or directly.
+"""
+
+import pytest
+
+from mailreef_automation.inbound_cursor import InboundCursorStore
+from mailreef_automation.inbox_registry import _account_key
+from mailreef_automation.mailreef_client import MailreefClient
+
+DISPLAY = 3
+
+
+def msg(n):
+    return {"id": f"m{n}", "ts": 1000.0 + n}
+
+
+def feed(newest, oldest=1):
+    """Messages newest..oldest, newest first, split into DISPLAY-sized pages."""
+    messages = [msg(n) for n in range(newest, oldest - 1, -1)]
+    return [messages[i:i + DISPLAY] for i in range(0, len(messages), DISPLAY)]
+
+
+class CannedClient(MailreefClient):
+    def __init__(self, pages, cursors):
+        super().__init__(api_key="test-key", base_url="http://mailreef.invalid")
+        self.pages = pages
+        self.fetched = []
+        self.inbound_cursors = cursors
+
+    def _fetch_inbound_page(self, page, display):
+        self.fetched.append(page)
+        data = self.pages[page - 1] if page <= len(self.pages) else []
+        if isinstance(data, Exception):
+            raise data
+        return {"data": data}
+
+
+@pytest.fixture
+def cursors(tmp_path):
+    return InboundCursorStore(str(tmp_path / "cursors.db"))
+
+
+def scan(client, **kwargs):
+    return [m["id"] for m in client.iter_inbound(display=DISPLAY, **kwargs)]
+
+
+def cursor(client, consumer="watcher"):
+    return client.inbound_cursors.load(_account_key(client), consumer)
+
+
+def save_cursor(client, n, consumer="watcher"):
+    client.inbound_cursors.save(_account_key(client), consumer, msg(n)["ts"], msg(n)["id"])
+
+
+def test_full_scan_moves_cursor_to_newest(cursors):
+    client = CannedClient(feed(7), cursors)
+    assert scan(client, consumer="watcher") == [f"m{n}" for n in range(7, 0, -1)]
+    assert cursor(client) == (msg(7)["ts"], "m7")
+
+
+def test_scan_stops_at_cursor_and_fetches_only_new_pages(cursors):
+    client = CannedClient(feed(20), cursors)
+    save_cursor(client, 16)
+    assert scan(client, consumer="watcher") == ["m20", "m19", "m18", "m17"]
+    assert client.fetched == [1, 2] # Page 2 holds the cursor: page 3 is never requested
+    assert cursor(client) == (msg(20)["ts"], "m20")
+
+
+def test_since_ts_and_stop_at_id(cursors):
+    client = CannedClient(feed(10), cursors)
+    assert scan(client, since_ts=msg(6)["ts"]) == ["m10", "m9", "m8", "m7"]
+    assert scan(client, stop_at_id="m8") == ["m10", "m9"]
+    assert cursor(client) is None # No consumer, nothing saved
+
+
+def test_duplicates_from_shifted_pages_are_yielded_once(cursors):
+    # m8 arrived between the two page requests, pushing m5 down onto page 2
+    pages = [[msg(7), msg(6), msg(5)], [msg(5), msg(4), msg(3)], [msg(2), msg(1)]]
+    client = CannedClient(pages, cursors)
+    assert scan(client, consumer="watcher") == ["m7", "m6", "m5", "m4", "m3", "m2", "m1"]
+
+
+def test_capped_scan_leaves_cursor(cursors):
+    client = CannedClient(feed(20), cursors)
+    save_cursor(client, 5)
+    assert scan(client, consumer="watcher", max_pages=2) == [f"m{n}" for n in range(20, 14, -1)]
+    assert client.fetched == [1, 2]
+    # Moving to m20 would skip m14..m6 for good
+    assert cursor(client) == (msg(5)["ts"], "m5")
+
+
+def test_capped_first_scan_saves_no_cursor(cursors):
+    client = CannedClient(feed(20), cursors)
+    scan(client, consumer="watcher", max_pages=2)
+    assert cursor(client) is None
+
+
+def test_early_break_leaves_cursor(cursors):
+    client = CannedClient(feed(10), cursors)
+    save_cursor(client, 2)
+    messages = client.iter_inbound(consumer="watcher", display=DISPLAY)
+    assert next(messages)["id"] == "m10"
+    messages.close() # Caller stopped consuming
+    assert cursor(client) == (msg(2)["ts"], "m2")
+
+
+def test_consumer_exception_leaves_cursor(cursors):
+    client = CannedClient(feed(10), cursors)
+    save_cursor(client, 2)
+    with pytest.raises(RuntimeError):
+        for m in client.iter_inbound(consumer="watcher", display=DISPLAY):
+            if m["id"] == "m6":
+                raise RuntimeError("sheet write failed")
+    assert cursor(client) == (msg(2)["ts"], "m2")
+
+
+def test_api_error_raises_and_leaves_cursor(cursors):
+    pages = feed(10)
+    pages[1] = Exception("Error fetching global inbound: 502 - Bad Gateway")
+    client = CannedClient(pages, cursors)
+    save_cursor(client, 2)
+    seen = []
+    with pytest.raises(Exception, match="502"):
+        for m in client.iter_inbound(consumer="watcher", display=DISPLAY):
+            seen.append(m["id"])
+    assert seen == ["m10", "m9", "m8"] # Never read as the end of the feed
+    assert cursor(client) == (msg(2)["ts"], "m2")
+
+
+def test_cursors_are_per_consumer(cursors):
+    client = CannedClient(feed(6), cursors)
+    save_cursor(client, 4, consumer="other")
+    assert scan(client, consumer="watcher") == [f"m{n}" for n in range(6, 0, -1)]
+    assert cursor(client, "other") == (msg(4)["ts"], "m4")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,177 @@
+"""
+Incremental lead-cache sync (GoogleSheetsClient._delta_sync): skip on an
+unchanged modifiedTime, re-download only changed and appended rows, leave rows
+with journaled writes alone, and raise on header edits or deleted rows so the
+caller falls back to a full sync.
+
+No Google API: an in-memory worksheet that answers A1 batch_get ranges.
+Run with `python -m pytest test_sheets_delta_sync.py` or directly.
+"""
+
+from datetime import datetime
+
+import pytest
+from gspread.utils import a1_range_to_grid_range
+
+import sheets_integration
+from mailreef_automation import lead_mirror, sheets_write_queue
+from sheets_integration import FULL_RESYNC_INTERVAL, GoogleSheetsClient
+
+HEADERS = ["email", "first_name", "status", "email_1_sent_at", "email_2_sent_at", "sender_email", "notes"]
+
+
+class FakeWorksheet:
+    """A1 reads trimmed like the Sheets API (no trailing blank rows/cells); records every batch_get range."""
+
+    def __init__(self, rows):
+        self.rows = [list(HEADERS)] + [list(row) for row in rows]
+        self.ranges = []
+
+    def _read(self, a1):
+        grid = a1_range_to_grid_range(a1)
+        rows = [row[grid.get("startColumnIndex", 0):grid.get("endColumnIndex", len(HEADERS))]
+                for row in self.rows[grid.get("startRowIndex", 0):grid.get("endRowIndex", len(self.rows))]]
+        rows = [self._trim(row) for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    @staticmethod
+    def _trim(row):
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        return row
+
+    def get(self, a1=None, pad_values=False):
+        return self._read(a1) if a1 else [list(row) for row in self.rows]
+
+    def batch_get(self, ranges, **kwargs):
+        self.ranges.extend(ranges)
+        return [self._read(a1) for a1 in ranges]
+
+    def downloaded_rows(self):
+        """Sheet rows fetched by row-bounded ranges (e.g. 'A3:F4'), ignoring column/header reads."""
+        rows = set()
+        for a1 in self.ranges:
+            grid = a1_range_to_grid_range(a1)
+            if "startRowIndex" in grid and "endRowIndex" in grid and grid["startRowIndex"] > 0:
+                rows.update(range(grid["startRowIndex"] + 1, grid["endRowIndex"] + 1))
+        return rows
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet):
+        self.sheet1 = worksheet
+        self.edits = 0
+
+    def touch(self):
+        """An edit bumps the Drive modifiedTime."""
+        self.edits += 1
+
+    def get_lastUpdateTime(self):
+        return f"2026-10-17T09:{self.edits:02d}:00Z"
+
+
+def lead(i, status="pending", first_name="Ann"):
+    return [f"lead{i}@school{i}.org", first_name, status, "", "", "", f"notes {i}"]
+
+
+@pytest.fixture
+def synced(tmp_path, monkeypatch):
+    """A client that has done its initial full sync of 5 leads (rows 2-6)."""
+    monkeypatch.setattr(sheets_write_queue, "DEFAULT_JOURNAL_PATH", str(tmp_path / "journal.db"))
+    monkeypatch.setattr(lead_mirror, "DEFAULT_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    monkeypatch.setattr(sheets_integration, "SHEETS_SYNC_MODE", "incremental")
+    worksheet = FakeWorksheet([lead(i) for i in range(5)])
+    spreadsheet = FakeSpreadsheet(worksheet)
+    client = GoogleSheetsClient(input_sheet_name="Leads", write_behind=True, client=object())
+    client.input_sheet = spreadsheet
+    client._write_queue.flush_interval = 3600
+    client._fetch_all_records()
+    worksheet.ranges.clear()
+    yield client, worksheet, spreadsheet
+    client._write_queue._stopped = True # Tests journal writes they never mean to flush
+
+
+def edit(spreadsheet, row, column, value):
+    spreadsheet.sheet1.rows[row - 1][HEADERS.index(column)] = value
+    spreadsheet.touch()
+
+
+def test_unchanged_modified_time_skips_the_download(synced):
+    client, worksheet, _ = synced
+    client._delta_sync(worksheet)
+    assert worksheet.ranges == []
+
+
+def test_only_changed_and_new_rows_are_downloaded(synced):
+    client, worksheet, spreadsheet = synced
+    edit(spreadsheet, 4, "status", "replied")
+    worksheet.rows.append(lead(5))
+    edit(spreadsheet, 7, "status", "pending")
+
+    client._delta_sync(worksheet)
+    assert worksheet.downloaded_rows() == {4, 7}
+    assert client._cache["lead2@school2.org"]["status"] == "replied"
+    assert client._cache["lead5@school5.org"]["_row"] == 7
+    assert [r["email"] for r in client._all_records_cache] == [f"lead{i}@school{i}.org" for i in range(6)]
+
+
+def test_edits_outside_the_fingerprint_wait_for_the_full_resync(synced):
+    client, worksheet, spreadsheet = synced
+    edit(spreadsheet, 3, "first_name", "Bea")
+
+    # Not a fingerprint column: the delta cannot see it
+    client._delta_sync(worksheet)
+    assert worksheet.downloaded_rows() == set()
+    assert client._cache["lead1@school1.org"]["first_name"] == "Ann"
+
+    # The periodic full resync does
+    client._last_all_records_fetch = datetime.min
+    client._last_full_sync = datetime.now() - FULL_RESYNC_INTERVAL
+    client._fetch_all_records()
+    assert client._cache["lead1@school1.org"]["first_name"] == "Bea"
+
+
+def test_rows_with_journaled_writes_are_not_redownloaded(synced):
+    client, worksheet, spreadsheet = synced
+    client._write_queue.enqueue(3, "lead1@school1.org", {"status": "email_1_sent"})
+    client._cache["lead1@school1.org"]["status"] = "email_1_sent" # What update_lead_status does
+    edit(spreadsheet, 3, "status", "pending") # The sheet has not caught up yet
+    edit(spreadsheet, 5, "status", "bounced")
+
+    client._delta_sync(worksheet)
+    assert worksheet.downloaded_rows() == {5}
+    assert client._cache["lead1@school1.org"]["status"] == "email_1_sent"
+
+
+def test_header_change_raises(synced):
+    client, worksheet, spreadsheet = synced
+    worksheet.rows[0][1] = "given_name"
+    spreadsheet.touch()
+    with pytest.raises(ValueError, match="header"):
+        client._delta_sync(worksheet)
+
+
+def test_deleted_rows_raise(synced):
+    client, worksheet, spreadsheet = synced
+    del worksheet.rows[-1]
+    spreadsheet.touch()
+    with pytest.raises(ValueError, match="shrank"):
+        client._delta_sync(worksheet)
+
+
+def test_failed_delta_falls_back_to_a_full_sync(synced):
+    client, worksheet, spreadsheet = synced
+    del worksheet.rows[2] # lead1 deleted: everyone below moves up a row
+    spreadsheet.touch()
+
+    client._last_all_records_fetch = datetime.min
+    records = client._fetch_all_records()
+    assert [r["email"] for r in records] == [f"lead{i}@school{i}.org" for i in (0, 2, 3, 4)]
+    assert client._cache["lead2@school2.org"]["_row"] == 3
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
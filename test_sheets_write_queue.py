@@ -0,0 +1,179 @@
+"""
+Write-behind journal for lead status writes: coalescing, version-exact deletes,
+replay after a restart, and re-resolving rows that moved before the flush.
+
+No Google API: a temp-path journal and an in-memory worksheet.
+Run with `python -m pytest test_sheets_write_queue.py` or directly.
+"""
+
+import pytest
+from gspread.utils import a1_range_to_grid_range
+
+from mailreef_automation import lead_mirror, sheets_write_queue
+from mailreef_automation.sheets_write_queue import WriteBehindQueue
+from sheets_integration import GoogleSheetsClient
+
+HEADERS = ["email", "first_name", "status", "sender_email"]
+
+
+def make_queue(tmp_path, flush_fn, key="Leads"):
+    # Long interval / high threshold: nothing flushes unless the test asks
+    return WriteBehindQueue(key, flush_fn, db_path=str(tmp_path / "journal.db"), flush_interval=3600, max_pending=10_000)
+
+
+def test_later_writes_to_a_cell_replace_earlier_ones(tmp_path):
+    flushed = []
+    queue = make_queue(tmp_path, flushed.extend)
+    queue.enqueue(5, "a@x.org", {"status": "email_1_sent", "sender_email": "s1@x.org"})
+    queue.enqueue(5, "a@x.org", {"status": "replied"})
+    assert queue.pending() == {5: {"status": "replied", "sender_email": "s1@x.org"}}
+
+    assert queue.flush() == 1
+    assert flushed == [(5, "a@x.org", {"status": "replied", "sender_email": "s1@x.org"})]
+    assert queue.pending() == {}
+    queue.close()
+
+
+def test_reenqueue_during_flush_survives_it(tmp_path):
+    flushed = []
+
+    def flush_fn(entries):
+        flushed.append(entries)
+        if len(flushed) == 1:
+            # A status change lands while the batch_update is in flight
+            queue.enqueue(5, "a@x.org", {"status": "replied"})
+
+    queue = make_queue(tmp_path, flush_fn)
+    queue.enqueue(5, "a@x.org", {"status": "email_1_sent"})
+    queue.enqueue(6, "b@x.org", {"status": "email_1_sent"})
+
+    assert queue.flush() == 2
+    # Only the versions that were written are gone
+    assert queue.pending() == {5: {"status": "replied"}}
+    assert queue.flush() == 1
+    assert flushed[1] == [(5, "a@x.org", {"status": "replied"})]
+    assert queue.pending() == {}
+    queue.close()
+
+
+def test_failed_flush_keeps_entries(tmp_path):
+    def flush_fn(entries):
+        raise RuntimeError("HTTP 503")
+
+    queue = make_queue(tmp_path, flush_fn)
+    queue.enqueue(5, "a@x.org", {"status": "email_1_sent"})
+    with pytest.raises(RuntimeError):
+        queue.flush()
+    assert queue.pending() == {5: {"status": "email_1_sent"}}
+    queue._stopped = True # Skip the final flush, it would fail again
+
+
+def test_restart_replays_pending_rows(tmp_path):
+    crashed = make_queue(tmp_path, lambda entries: None)
+    crashed.enqueue(5, "a@x.org", {"status": "email_1_sent"})
+    crashed.enqueue(9, "c@x.org", {"status": "bounced"})
+    crashed._stopped = True # Crash: no final flush
+
+    flushed = []
+    restarted = make_queue(tmp_path, flushed.extend)
+    assert restarted.pending_count() == 2
+    restarted.close() # Stops the replay thread and flushes what it recovered
+    assert sorted(flushed) == [(5, "a@x.org", {"status": "email_1_sent"}), (9, "c@x.org", {"status": "bounced"})]
+    assert restarted.pending_count() == 0
+
+
+def test_journals_are_per_sheet(tmp_path):
+    flushed = []
+    leads = make_queue(tmp_path, flushed.extend, key="Leads")
+    other = make_queue(tmp_path, lambda entries: None, key="Other")
+    other.enqueue(5, "z@x.org", {"status": "replied"})
+    leads.enqueue(5, "a@x.org", {"status": "email_1_sent"})
+    leads.flush()
+    assert flushed == [(5, "a@x.org", {"status": "email_1_sent"})]
+    assert other.pending() == {5: {"status": "replied"}}
+    leads.close()
+    other._stopped = True
+
+
+# ---------------------------------------------------------------- sheet side
+
+
+class FakeWorksheet:
+    """Just the calls _flush_status_writes makes: row_values, batch_get and batch_update."""
+
+    def __init__(self, emails):
+        self.rows = [list(HEADERS)] + [[email, "", "pending", ""] for email in emails]
+
+    def _grid(self, a1):
+        grid = a1_range_to_grid_range(a1)
+        return (grid.get("startRowIndex", 0), grid.get("endRowIndex", len(self.rows)),
+                grid.get("startColumnIndex", 0), grid.get("endColumnIndex", len(HEADERS)))
+
+    def row_values(self, row):
+        return list(self.rows[row - 1])
+
+    def batch_get(self, ranges, **kwargs):
+        out = []
+        for a1 in ranges:
+            r0, r1, c0, c1 = self._grid(a1)
+            out.append([row[c0:c1] for row in self.rows[r0:r1]])
+        return out
+
+    def batch_update(self, data, **kwargs):
+        for update in data:
+            r0, _, c0, _ = self._grid(update["range"])
+            self.rows[r0][c0] = update["values"][0][0]
+
+    def status(self, email):
+        return next(row[2] for row in self.rows[1:] if row[0] == email)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet):
+        self.sheet1 = worksheet
+
+
+@pytest.fixture
+def sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheets_write_queue, "DEFAULT_JOURNAL_PATH", str(tmp_path / "journal.db"))
+    monkeypatch.setattr(lead_mirror, "DEFAULT_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    worksheet = FakeWorksheet(["a@x.org", "b@x.org", "c@x.org"]) # rows 2, 3, 4
+    client = GoogleSheetsClient(input_sheet_name="Leads", write_behind=True, client=object())
+    client.input_sheet = FakeSpreadsheet(worksheet)
+    client._write_queue.flush_interval = 3600
+    yield client, worksheet
+    client._write_queue.close()
+
+
+def test_flush_writes_rows_that_still_hold_their_lead(sheets):
+    client, worksheet = sheets
+    client._write_queue.enqueue(3, "b@x.org", {"status": "email_1_sent", "sender_email": "s1@x.org"})
+    assert client.flush_writes() == 1
+    assert worksheet.rows[2] == ["b@x.org", "", "email_1_sent", "s1@x.org"]
+
+
+def test_moved_lead_is_written_to_its_new_row(sheets):
+    client, worksheet = sheets
+    client._write_queue.enqueue(3, "b@x.org", {"status": "replied"})
+    # A row inserted above: b@x.org is now on row 4, and row 3 holds someone else
+    worksheet.rows.insert(1, ["new@x.org", "", "pending", ""])
+
+    client.flush_writes()
+    assert worksheet.status("b@x.org") == "replied"
+    assert worksheet.status("a@x.org") == "pending" # Row 3 now: untouched
+    assert worksheet.status("new@x.org") == "pending"
+    assert client._write_queue.pending() == {}
+
+
+def test_deleted_lead_is_dropped(sheets):
+    client, worksheet = sheets
+    client._write_queue.enqueue(3, "b@x.org", {"status": "replied"})
+    del worksheet.rows[2] # b@x.org deleted; c@x.org moves up into row 3
+
+    client.flush_writes()
+    assert [row[2] for row in worksheet.rows[1:]] == ["pending", "pending"]
+    assert client._write_queue.pending() == {}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))